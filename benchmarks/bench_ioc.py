@@ -0,0 +1,66 @@
+"""
+Runtime of the index of coincidence search (enigma.analysis.ioc) on a seeded machine.
+English sample text is encrypted under one day's setting, then every rotor order and start
+position is searched. Reports the wall time, trials per second and the rank of the true setting.
+
+Usage:
+    python benchmarks/bench_ioc.py [--letters 400] [--date 1] [--workers 1] [--no-plugs]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from common import make_files
+from enigma.analysis import corpus, ioc
+from enigma.components.machine import Enigma
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--letters", type=int, default=400, help="Ciphertext length.")
+    parser.add_argument("--date", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1, help="0 means all cores.")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument(
+        "--no-plugs", action="store_true", help="Encrypt with the plugboard removed."
+    )
+    args: argparse.Namespace = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path: Path = Path(tmp_dir)
+        make_files(tmp_path)
+        config_path: Path = tmp_path.joinpath("config.csv")
+        machine = Enigma(config_path, tmp_path.joinpath("table.csv"), date=args.date)
+        truth: Dict[str, Any] = dict(machine.table)
+        if args.no_plugs:
+            machine = Enigma(config_path, entry=dict(truth, plugs={}))
+        plaintext: str = "".join(
+            chr(65 + i) for i in corpus.letters()[: args.letters].tolist()
+        )
+        ciphertext: str = machine.input(plaintext)
+
+        start: float = time.perf_counter()
+        results: List[Dict[str, Any]] = ioc.ioc_search(
+            ciphertext,
+            config_path,
+            rotor_slots=len(truth["rotors"]),
+            top_k=args.top_k,
+            workers=args.workers or None,
+        )
+        elapsed: float = time.perf_counter() - start
+
+    n_orders: int = 1
+    for i in range(len(truth["rotors"])):
+        n_orders *= len(machine.all_rotors) - i
+    trials: int = n_orders * machine.length ** len(truth["rotors"])
+    ranks: List[int] = [
+        i
+        for i, result in enumerate(results)
+        if result["rotors"] == truth["rotors"] and result["rings"] == truth["rings"]
+    ]
+    print(f"{args.letters} letters, {n_orders} orders, {trials:,} trials")
+    print(f"{'wall time':<24} {elapsed:>12.2f} s")
+    print(f"{'trials/sec':<24} {trials / elapsed:>12,.0f}")
+    print(f"{'rank of true setting':<24} {ranks[0] if ranks else 'not in top-k':>12}")
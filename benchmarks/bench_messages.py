@@ -0,0 +1,70 @@
+"""
+Throughput of encoding many short messages under one day setting, in messages/sec.
+Compares one Enigma per message (what request handlers do today), one reused machine with
+seek(0) between messages, and a single Enigma.input_many() call.
+
+Usage:
+    python benchmarks/bench_messages.py [--n-messages N] [--min-len 20] [--max-len 200]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+
+from common import make_files
+from enigma.components.machine import Enigma
+
+
+def make_messages(n_messages: int, min_len: int, max_len: int) -> List[str]:
+    rng: np.random.Generator = np.random.default_rng(0)
+    lengths: np.ndarray = rng.integers(min_len, max_len + 1, n_messages)
+    letters: bytes = rng.integers(65, 91, int(lengths.sum()), dtype=np.uint8).tobytes()
+    offsets: np.ndarray = np.cumsum(lengths) - lengths
+    return [letters[o : o + n].decode() for o, n in zip(offsets, lengths)]
+
+
+def rate(name: str, n_messages: int, run: Callable[[], None]):
+    start: float = time.perf_counter()
+    run()
+    elapsed: float = time.perf_counter() - start
+    print(f"{name:<28} {n_messages / elapsed:>14,.0f} messages/sec")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-messages", type=int, default=100_000)
+    parser.add_argument("--min-len", type=int, default=20)
+    parser.add_argument("--max-len", type=int, default=200)
+    args: argparse.Namespace = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path: Path = Path(tmp_dir)
+        make_files(tmp_path)
+        config_path: Path = tmp_path.joinpath("config.csv")
+        table_path: Path = tmp_path.joinpath("table.csv")
+        messages: List[str] = make_messages(args.n_messages, args.min_len, args.max_len)
+        # The per-message constructor path is slow; time it on a sample.
+        sample: List[str] = messages[: min(len(messages), 200)]
+
+        def new_machine_per_message():
+            for message in sample:
+                Enigma(config_path, table_path).input(message)
+
+        machine = Enigma(config_path, table_path)
+
+        def reused_machine():
+            for message in messages:
+                machine.seek(0)
+                machine.input(message)
+
+        def input_many():
+            machine.input_many(messages)
+
+        print(f"{len(messages):,} messages of {args.min_len}-{args.max_len} chars")
+        rate("Enigma() per message", len(sample), new_machine_per_message)
+        rate("reused machine + seek(0)", len(messages), reused_machine)
+        rate("Enigma.input_many()", len(messages), input_many)
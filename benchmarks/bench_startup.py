@@ -0,0 +1,90 @@
+"""
+Startup cost of a fresh interpreter:
+    . import time of enigma.components.machine, from python -X importtime;
+    . time to first ciphertext: process start to the first encoded message, wall clock.
+Each figure is the best of several runs. The slowest imports are listed to spot regressions,
+e.g. pandas creeping back onto the encryption path.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--top 10]
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from common import make_files, subprocess_env
+
+MODULE: str = "enigma.components.machine"
+
+
+def import_times(runs: int) -> Tuple[float, Dict[str, float]]:
+    """
+    Best cumulative import time of MODULE in seconds, and the best self time of every
+    module imported along the way.
+    """
+    best_total: float = float("inf")
+    self_times: Dict[str, float] = {}
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+            capture_output=True,
+            text=True,
+            env=subprocess_env(),
+            check=True,
+        )
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            fields: List[str] = line[len("import time:") :].split("|")
+            if not fields[0].strip().isdigit():
+                continue  # Header line.
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+            name: str = fields[2].strip()
+            self_times[name] = min(self_times.get(name, float("inf")), self_us / 1e6)
+            if name == MODULE:
+                best_total = min(best_total, cumulative_us / 1e6)
+    return best_total, self_times
+
+
+def first_ciphertext(runs: int, config_path: Path, table_path: Path) -> float:
+    """Best wall time from launching the interpreter to printing the first ciphertext."""
+    code: str = (
+        f"from {MODULE} import Enigma;"
+        f"print(Enigma({str(config_path)!r}, {str(table_path)!r}).input('HELLOWORLD'))"
+    )
+    best: float = float("inf")
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            env=subprocess_env(),
+            check=True,
+        )
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports shown.")
+    args: argparse.Namespace = parser.parse_args()
+
+    total, self_times = import_times(args.runs)
+    print(f"import {MODULE:<36} {total * 1e3:>8.1f} ms")
+    for name, seconds in sorted(self_times.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"    {name:<44} {seconds * 1e3:>8.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path: Path = Path(tmp_dir)
+        make_files(tmp_path)
+        first: float = first_ciphertext(
+            args.runs, tmp_path.joinpath("config.csv"), tmp_path.joinpath("table.csv")
+        )
+    print(f"{'time to first ciphertext':<43} {first * 1e3:>8.1f} ms")
@@ -0,0 +1,284 @@
+"""
+Benchmark suite with machine-readable results and a regression check against a baseline.
+Covers:
+    . Enigma.input throughput (chars/sec) from 10 chars up; Enigma.input_vectorized for larger
+      messages, and Enigma.encode_file for the largest, which are too big to hold as arrays;
+    . Enigma.__init__ (cold and with warm caches), load_config and load_tables latency, for csv
+      and binary files;
+    . Rotor.input and Enigma.rotate_rotors calls/sec;
+    . ConfigGen and CodeGen generations/sec;
+    . enigma.analysis.ioc search time per rotor order (all start positions).
+Every figure is the best of several runs.
+
+Results are written as JSON:
+    {"meta": {...}, "results": {name: {"value": v, "unit": u, "higher_is_better": b}}}
+With --baseline, each result is compared with the same entry of a previous results file and
+the script exits with status 1 if any is worse by more than --tolerance. It also exits with
+status 1, before running anything, if the baseline does not exist: timings are only comparable
+on one machine, so record the baseline where the check runs with `make bench-baseline`.
+
+Usage:
+    python benchmarks/bench_suite.py [--output results.json] [--baseline baseline.json]
+                                     [--tolerance 0.25] [--quick]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from common import make_files
+from enigma.analysis import corpus, ioc
+from enigma.components.cache import clear_caches
+from enigma.components.machine import Enigma
+from enigma.utils import binary_format
+from enigma.utils.code_gen import CodeGen
+from enigma.utils.config_gen import ConfigGen
+
+KB: int = 1 << 10
+MB: int = 1 << 20
+# Message sizes per method. The scalar path tops out where a run takes seconds.
+INPUT_SIZES: List[int] = [10, KB, 100 * KB]
+VECTORIZED_SIZES: List[int] = [10, KB, 100 * KB, MB, 10 * MB]
+FILE_SIZES: List[int] = [100 * MB]
+QUICK_LIMIT: int = MB
+
+Results = Dict[str, Dict[str, Any]]
+
+
+def best_time(run: Callable[[], Any], repeat: int = 7) -> float:
+    """Best seconds per call. Each run loops enough calls to take at least 0.2 s."""
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def record(results: Results, name: str, value: float, unit: str, higher: bool):
+    results[name] = {"value": value, "unit": unit, "higher_is_better": higher}
+    print(f"{name:<36} {value:>16,.6g} {unit}")
+
+
+def size_name(size: int) -> str:
+    for unit, factor in (("MB", MB), ("KB", KB)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return str(size)
+
+
+def bench_input(results: Results, config_path: Path, table_path: Path, limit: int):
+    """Throughput of encoding one message, by method and size."""
+    rng: np.random.Generator = np.random.default_rng(0)
+    machine = Enigma(config_path, table_path)
+
+    def message(size: int) -> str:
+        return rng.integers(65, 91, size, dtype=np.uint8).tobytes().decode()
+
+    for method, sizes in (
+        (machine.input, INPUT_SIZES),
+        (machine.input_vectorized, VECTORIZED_SIZES),
+    ):
+        for size in [s for s in sizes if s <= limit]:
+            text: str = message(size)
+
+            def run():
+                machine.reset()
+                method(text)
+
+            record(
+                results,
+                f"{method.__name__}/{size_name(size)}",
+                size / best_time(run, repeat=3),
+                "chars/s",
+                True,
+            )
+
+    for size in [s for s in FILE_SIZES if s <= limit]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path: Path = Path(tmp_dir).joinpath("message.txt")
+            # Written in pieces to keep memory flat.
+            with open(path, "wb") as f:
+                for _ in range(size // MB):
+                    f.write(rng.integers(65, 91, MB, dtype=np.uint8).tobytes())
+
+            def run():
+                machine.reset()
+                machine.encode_file(path)
+
+            record(
+                results,
+                f"encode_file/{size_name(size)}",
+                size / best_time(run, repeat=3),
+                "chars/s",
+                True,
+            )
+
+
+def bench_loading(results: Results, files: Dict[str, Dict[str, Path]]):
+    """Construction and loading latency for every file format."""
+    for fmt, paths in files.items():
+        config_path, table_path = paths["config"], paths["table"]
+
+        def cold():
+            clear_caches()
+            Enigma(config_path, table_path)
+
+        def warm():
+            Enigma(config_path, table_path)
+
+        for name, run in (
+            ("init_cold", cold),
+            ("init_warm", warm),
+            ("load_config", lambda: Enigma.load_config(config_path)),
+            ("load_tables", lambda: Enigma.load_tables(table_path)),
+        ):
+            record(results, f"{name}/{fmt}", best_time(run), "s", False)
+    clear_caches()
+
+
+def bench_rotors(results: Results, config_path: Path, table_path: Path):
+    """Calls per second of the scalar building blocks."""
+    machine = Enigma(config_path, table_path)
+    rotor = machine.rotors[-1]
+    record(
+        results,
+        "Rotor.input",
+        1 / best_time(lambda: rotor.input(5, reverse=False)),
+        "calls/s",
+        True,
+    )
+    record(
+        results,
+        "Enigma.rotate_rotors",
+        1 / best_time(machine.rotate_rotors),
+        "calls/s",
+        True,
+    )
+
+
+def bench_generators(results: Results):
+    """Generations per second, one seeded generator each."""
+    for gen in (ConfigGen, CodeGen):
+        with contextlib.redirect_stdout(io.StringIO()):
+            seconds: float = best_time(lambda: gen(seed=0), repeat=3)
+        record(results, gen.__name__, 1 / seconds, "gens/s", True)
+
+
+def bench_analysis(results: Results, config_path: Path, table_path: Path):
+    """Cryptanalysis cost on 400 letters of English."""
+    machine = Enigma(config_path, table_path)
+    ciphertext: str = machine.input(
+        "".join(chr(65 + i) for i in corpus.letters()[:400].tolist())
+    )
+    order: List[Tuple[int, ...]] = [tuple(machine.table["rotors"])]
+    record(
+        results,
+        "ioc_search/order",
+        best_time(lambda: ioc.ioc_search(ciphertext, config_path, orders=order), 3),
+        "s",
+        False,
+    )
+
+
+def compare(results: Results, baseline: Results, tolerance: float) -> List[str]:
+    """Names of results worse than their baseline by more than `tolerance`."""
+    regressions: List[str] = []
+    print(f"\n{'benchmark':<36} {'baseline':>14} {'current':>14} {'change':>8}")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        old: float = baseline[name]["value"]
+        new: float = current["value"]
+        # Above 1 means faster, whichever the direction of the unit.
+        speedup: float = new / old if current["higher_is_better"] else old / new
+        flag: str = ""
+        if speedup < 1 - tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<36} {old:>14,.6g} {new:>14,.6g} {speedup:>7.2f}x{flag}")
+    return regressions
+
+
+def run_suite(quick: bool = False) -> Results:
+    results: Results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path: Path = Path(tmp_dir)
+        make_files(tmp_path)
+        files: Dict[str, Dict[str, Path]] = {
+            "csv": {
+                "config": tmp_path.joinpath("config.csv"),
+                "table": tmp_path.joinpath("table.csv"),
+            },
+            "bin": {
+                "config": tmp_path.joinpath("config.bin"),
+                "table": tmp_path.joinpath("table.bin"),
+            },
+        }
+        for kind in ("config", "table"):
+            binary_format.convert_csv(files["csv"][kind], files["bin"][kind])
+
+        bench_input(
+            results,
+            files["csv"]["config"],
+            files["csv"]["table"],
+            limit=QUICK_LIMIT if quick else sys.maxsize,
+        )
+        bench_loading(results, files)
+        bench_rotors(results, files["csv"]["config"], files["csv"]["table"])
+        bench_analysis(results, files["csv"]["config"], files["csv"]["table"])
+    bench_generators(results)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Results JSON path.")
+    parser.add_argument(
+        "--baseline", type=Path, default=None, help="Results JSON to compare against."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown as a fraction of the baseline.",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help=f"Skip messages over {QUICK_LIMIT} chars."
+    )
+    args: argparse.Namespace = parser.parse_args()
+    if args.baseline is not None and not args.baseline.is_file():
+        # Comparing against nothing would pass every time, so a missing baseline is an error.
+        sys.exit(
+            f"No baseline at {args.baseline}. Record one with `make bench-baseline` first."
+        )
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": run_suite(quick=args.quick),
+    }
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Saved results to {args.output}.")
+
+    if args.baseline is not None:
+        baseline: Results = json.loads(args.baseline.read_text())["results"]
+        regressions: List[str] = compare(report["results"], baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regressions over {args.tolerance:.0%}.")
+            sys.exit(1)
+        print("No regressions.")
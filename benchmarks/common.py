@@ -0,0 +1,30 @@
+"""Helpers shared by benchmark scripts."""
+
+import contextlib
+import io
+import os
+from pathlib import Path
+from typing import Dict
+
+from enigma.utils.code_gen import CodeGen
+from enigma.utils.config_gen import ConfigGen
+
+REPO_ROOT: Path = Path(__file__).resolve().parent.parent
+
+
+def make_files(dest: Path):
+    """Generate a seeded config.csv and table.csv to benchmark against."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        ConfigGen(seed=0).export_csv(dest.joinpath("config.csv"))
+        code_gen = CodeGen(seed=0)
+        code_gen.build_csv()
+        code_gen.export_csv(dest.joinpath("table.csv"))
+
+
+def subprocess_env() -> Dict[str, str]:
+    """Environment for child interpreters that can import enigma from this checkout."""
+    env: Dict[str, str] = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(REPO_ROOT)] + [p for p in [env.get("PYTHONPATH")] if p]
+    )
+    return env
@@ -0,0 +1,220 @@
+"""
+Command line entry point: python -m enigma <command>, or enigma <command> once installed.
+Commands:
+    stream: Encode a file or stdin chunk by chunk with bounded memory.
+    file: Encode a file through memory maps, in place or into another file.
+    batch: Run JSON line jobs over a pool of processes, see enigma.jobs.
+    serve: Serve encode requests over TCP or a Unix socket, see enigma.server.
+Any command can run with --profile to print counters and timings to stderr when it ends, see
+enigma.components.instrumentation. With --workers, only the main process is measured.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import BinaryIO, Dict, List, TextIO
+
+from enigma.components import instrumentation
+from enigma.components.machine import Enigma
+
+
+def add_machine_args(parser: argparse.ArgumentParser, date: bool = True):
+    """Arguments shared by every command that loads a machine."""
+    parser.add_argument("--config", type=Path, default=None, help="Config csv path.")
+    parser.add_argument("--table", type=Path, default=None, help="Table csv path.")
+    if date:
+        parser.add_argument(
+            "--date", type=int, default=1, help="1-based date in table."
+        )
+
+
+def run_stream(args: argparse.Namespace):
+    """Encode input to output chunk by chunk. Non-letters pass through unchanged."""
+    machine = Enigma(config_path=args.config, table_path=args.table, date=args.date)
+    if args.offset:
+        machine.seek(args.offset)
+
+    src: BinaryIO = sys.stdin.buffer if args.input is None else open(args.input, "rb")
+    dest: BinaryIO = (
+        sys.stdout.buffer if args.output is None else open(args.output, "wb")
+    )
+    try:
+        for chunk in machine.stream_file(src, chunk_size=args.chunk_size):
+            dest.write(chunk)
+        dest.flush()
+    finally:
+        if args.input is not None:
+            src.close()
+        if args.output is not None:
+            dest.close()
+
+
+def run_file(args: argparse.Namespace):
+    """Encode a file via memory maps. Non-letters pass through unchanged."""
+    machine = Enigma(config_path=args.config, table_path=args.table, date=args.date)
+    machine.encode_file(
+        args.path,
+        dest=args.output,
+        chunk_size=args.chunk_size,
+        workers=args.workers or None,
+    )
+
+
+def run_batch(args: argparse.Namespace):
+    """Run JSON line jobs and print throughput and latency stats to stderr."""
+    # Imported here, as in run_serve(): other commands should not pay for them at startup.
+    from enigma import jobs
+
+    src: TextIO = sys.stdin if args.input is None else open(args.input)
+    dest: TextIO = sys.stdout if args.output is None else open(args.output, "w")
+    try:
+        stats: Dict[str, float] = jobs.run_batch(
+            src,
+            dest,
+            config_path=args.config,
+            table_path=args.table,
+            workers=args.workers or None,
+            window=args.window,
+        )
+    finally:
+        if args.input is not None:
+            src.close()
+        if args.output is not None:
+            dest.close()
+    jobs.print_stats(stats)
+
+
+def run_serve(args: argparse.Namespace):
+    """Serve until interrupted, then print latency stats to stderr."""
+    import asyncio
+
+    from enigma import server
+
+    try:
+        asyncio.run(
+            server.serve(
+                config_path=args.config,
+                table_path=args.table,
+                host=args.host,
+                port=args.port,
+                unix_path=args.unix,
+                batch_delay=args.batch_delay,
+                stats_interval=args.stats_interval,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m enigma",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--profile",
+        choices=instrumentation.PROFILE_MODES,
+        default=None,
+        help="Collect counters and timings; cprofile and trace also profile every call.",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=Path,
+        default=None,
+        help="pstats file for cprofile, Chrome trace JSON for trace.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    stream_parser = subparsers.add_parser(
+        "stream", help="Encode a file or stdin with bounded memory."
+    )
+    add_machine_args(stream_parser)
+    stream_parser.add_argument(
+        "-i", "--input", type=Path, default=None, help="Input file. Default stdin."
+    )
+    stream_parser.add_argument(
+        "-o", "--output", type=Path, default=None, help="Output file. Default stdout."
+    )
+    stream_parser.add_argument(
+        "--chunk-size", type=int, default=1 << 16, help="Bytes read per chunk."
+    )
+    stream_parser.add_argument(
+        "--offset",
+        type=int,
+        default=0,
+        help="Start as if this many letters were already processed.",
+    )
+    stream_parser.set_defaults(func=run_stream)
+
+    file_parser = subparsers.add_parser(
+        "file", help="Encode a file through memory maps."
+    )
+    add_machine_args(file_parser)
+    file_parser.add_argument("path", type=Path, help="File to encode.")
+    file_parser.add_argument(
+        "-o", "--output", type=Path, default=None, help="Output file. Default in place."
+    )
+    file_parser.add_argument(
+        "--chunk-size", type=int, default=1 << 20, help="Bytes mapped at a time."
+    )
+    file_parser.add_argument(
+        "--workers", type=int, default=1, help="Number of processes. 0 means all cores."
+    )
+    file_parser.set_defaults(func=run_file)
+
+    batch_parser = subparsers.add_parser(
+        "batch", help="Run JSON line jobs over a pool of processes."
+    )
+    add_machine_args(batch_parser, date=False)
+    batch_parser.add_argument(
+        "-i", "--input", type=Path, default=None, help="Jobs file. Default stdin."
+    )
+    batch_parser.add_argument(
+        "-o", "--output", type=Path, default=None, help="Results file. Default stdout."
+    )
+    batch_parser.add_argument(
+        "--workers", type=int, default=1, help="Number of processes. 0 means all cores."
+    )
+    batch_parser.add_argument(
+        "--window", type=int, default=4096, help="Jobs submitted to the pool at a time."
+    )
+    batch_parser.set_defaults(func=run_batch)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Serve encode requests over TCP or a Unix socket."
+    )
+    add_machine_args(serve_parser, date=False)
+    serve_parser.add_argument("--host", type=str, default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument(
+        "--unix", type=Path, default=None, help="Listen on this Unix socket instead."
+    )
+    serve_parser.add_argument(
+        "--batch-delay",
+        type=float,
+        default=0.0,
+        help="Seconds to wait for more requests of a date before encoding them.",
+    )
+    serve_parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=0.0,
+        help="Print latency stats every this many seconds. 0 means only on exit.",
+    )
+    serve_parser.set_defaults(func=run_serve)
+
+    args: argparse.Namespace = parser.parse_args(argv)
+    if args.profile is None:
+        args.func(args)
+        return
+    if args.profile == "trace" and args.profile_output is None:
+        parser.error("--profile trace needs --profile-output.")
+    with instrumentation.profile(args.profile, args.profile_output) as stats:
+        args.func(args)
+    print(json.dumps(stats.snapshot(), indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
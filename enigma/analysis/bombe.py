@@ -0,0 +1,307 @@
+"""
+Known-plaintext search for rotor order and start positions, after Turing and Welchman's Bombe.
+
+A crib is a guess of some plaintext. Since no letter encrypts to itself, it can only sit where no
+crib letter equals the ciphertext letter below it. Each placement gives a menu: a graph on letters
+with an edge p - c for every crib letter p above ciphertext letter c at step t. With a plugboard
+P and the plugless substitution S_t (an involution), c = P[S_t[P[p]]], so if p is plugged to u
+then c is plugged to S_t[u], and the other way round.
+
+For every start position, the machine keeps a boolean matrix M where M[a, u] means "a is plugged
+to u" follows from one hypothesis about the test letter, the best connected letter of the menu.
+Edges spread the hypothesis along the menu, and the diagonal board adds M[u, a] for every
+M[a, u]. If every plug of the test letter ends up implied, they contradict each other and the
+position is ruled out; positions where this does not happen are stops. Stops are then checked
+against each hypothesis in turn, and those leading to a consistent plugboard are reported.
+
+All start positions of a rotor order are tested at once, using its keystream table (see
+enigma.components.keystream), and ruled-out positions are dropped as propagation goes on. Rotor
+orders are spread over processes, and the search can end once enough stops are found.
+"""
+
+import itertools
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from enigma.analysis.ioc import candidate, cipher_indices
+from enigma.components.cache import CONFIG_CACHE
+from enigma.components.keystream import compile_table
+from enigma.components.machine import Enigma
+from enigma.components.rotors import Rotor, Reflector
+
+# Start positions are tested in blocks of about this many matrix cells.
+BLOCK_CELLS: int = 1 << 24
+
+
+def crib_offsets(cipher: np.ndarray, crib: np.ndarray) -> np.ndarray:
+    """Offsets in `cipher` where `crib` can sit, i.e. no crib letter is above the same letter."""
+    if crib.shape[0] > cipher.shape[0]:
+        return np.zeros(0, dtype=np.int64)
+    windows: np.ndarray = np.lib.stride_tricks.sliding_window_view(
+        cipher, crib.shape[0]
+    )
+    return np.flatnonzero((windows != crib[None, :]).all(axis=1))
+
+
+class Menu:
+    """Letter links of one crib placement, restricted to the component of the test letter."""
+
+    def __init__(self, cipher: np.ndarray, crib: np.ndarray, offset: int):
+        """
+        Args:
+            cipher: 0-based ciphertext indices.
+            crib: 0-based crib indices.
+            offset: Index in `cipher` of the first crib letter.
+        """
+        self.offset: int = offset
+        plain: List[int] = crib.tolist()
+        below: List[int] = cipher[offset : offset + crib.shape[0]].tolist()
+
+        # Connected components by union-find over the letters.
+        parent: Dict[int, int] = {}
+
+        def find(letter: int) -> int:
+            parent.setdefault(letter, letter)
+            while parent[letter] != letter:
+                parent[letter] = parent[parent[letter]]
+                letter = parent[letter]
+            return letter
+
+        for p, c in zip(plain, below):
+            parent[find(p)] = find(c)
+        edges_per_root: Dict[int, int] = {}
+        for p in plain:
+            edges_per_root[find(p)] = edges_per_root.get(find(p), 0) + 1
+        root: int = max(edges_per_root, key=edges_per_root.get)
+
+        keep: List[int] = [i for i, p in enumerate(plain) if find(p) == root]
+        self.first: np.ndarray = np.array([plain[i] for i in keep], dtype=np.int64)
+        self.second: np.ndarray = np.array([below[i] for i in keep], dtype=np.int64)
+        # Step of each edge, counted from the first ciphertext letter.
+        self.steps: np.ndarray = offset + np.array(keep, dtype=np.int64)
+        letters: np.ndarray = np.concatenate([self.first, self.second])
+        degrees: np.ndarray = np.bincount(letters)
+        self.test_letter: int = int(np.argmax(degrees))
+        self.n_letters: int = int(np.count_nonzero(degrees))
+        # Independent closed loops of the menu; more loops give fewer false stops.
+        self.loops: int = len(keep) - self.n_letters + 1
+
+
+def gather_indices(substitutions: np.ndarray) -> np.ndarray:
+    """
+    Flat indices for sweep(): entry [e, n * L + v] points at row n, column S[v] of an array
+    shaped (B, L), where S is the substitution of edge e at position n.
+    Args:
+        substitutions: Plugless substitution at every edge, shape (B, E, L).
+    """
+    n_positions, n_edges, length = substitutions.shape
+    rows: np.ndarray = np.arange(n_positions, dtype=np.intp)[None, :, None] * length
+    gathers: np.ndarray = np.add(substitutions.transpose(1, 0, 2), rows, order="C")
+    return gathers.reshape(n_edges, n_positions * length)
+
+
+def sweep(
+    state: np.ndarray, first: np.ndarray, second: np.ndarray, gathers: np.ndarray
+):
+    """
+    Propagate implications along every menu edge once, then through the diagonal board.
+    Args:
+        state: Implied plugs, shape (L, B, L): state[a, n, u] means a is plugged to u at
+            position n. Updated in place.
+        first: Letter at one end of every edge, shape (E,).
+        second: Letter at the other end of every edge, shape (E,).
+        gathers: From gather_indices(), shape (E, B * L).
+    """
+    shape: Tuple[int, int] = state.shape[1:]
+    for edge in range(first.shape[0]):
+        a: int = int(first[edge])
+        b: int = int(second[edge])
+        state[b] |= state[a].reshape(-1).take(gathers[edge]).reshape(shape)
+        state[a] |= state[b].reshape(-1).take(gathers[edge]).reshape(shape)
+    state |= state.transpose(2, 1, 0)
+
+
+def close(
+    state: np.ndarray, first: np.ndarray, second: np.ndarray, gathers: np.ndarray
+):
+    """Sweep until no new plug is implied."""
+    total: int = -1
+    while total != (total := int(np.count_nonzero(state))):
+        sweep(state, first, second, gathers)
+
+
+def scan_positions(
+    menu: Menu, table: np.ndarray, starts: np.ndarray
+) -> List[Tuple[int, Dict[int, int]]]:
+    """
+    Stops among the start counters `starts`, with the plugs (0-based, each pair once) implied
+    by every consistent hypothesis about the test letter.
+    Args:
+        table: Keystream table of one rotor order, row c is the substitution at counter c.
+    """
+    period, length = table.shape
+    x: int = menu.test_letter
+    steps: np.ndarray = (starts[:, None] + menu.steps[None, :] + 1) % period
+    substitutions: np.ndarray = table[steps]
+    gathers: np.ndarray = gather_indices(substitutions)
+    state: np.ndarray = np.zeros((length, starts.shape[0], length), dtype=bool)
+    state[x, :, 0] = True
+
+    # Propagate, dropping positions once every plug of the test letter is implied. Arrays are
+    # only compacted when enough positions are gone to pay for it.
+    total: int = -1
+    while starts.shape[0] and total != (total := int(np.count_nonzero(state))):
+        sweep(state, menu.first, menu.second, gathers)
+        alive: np.ndarray = ~state[x].all(axis=1)
+        if np.count_nonzero(alive) < alive.shape[0] // 2:
+            starts, substitutions = starts[alive], substitutions[alive]
+            state = np.ascontiguousarray(state[:, alive, :])
+            gathers = gather_indices(substitutions)
+            total = -1
+    alive = ~state[x].all(axis=1)
+    starts, substitutions = starts[alive], substitutions[alive]
+
+    # Try every hypothesis at each stop; keep those where each letter has at most one plug.
+    stops: List[Tuple[int, Dict[int, int]]] = []
+    if not starts.shape[0]:
+        return stops
+    n_stops: int = starts.shape[0]
+    hypotheses: np.ndarray = np.zeros((length, n_stops * length, length), dtype=bool)
+    hypotheses[x] = np.tile(np.eye(length, dtype=bool), (n_stops, 1))
+    close(
+        hypotheses,
+        menu.first,
+        menu.second,
+        gather_indices(np.repeat(substitutions, length, axis=0)),
+    )
+    consistent: np.ndarray = (hypotheses.sum(axis=2) <= 1).all(axis=0)
+    for i in np.flatnonzero(consistent).tolist():
+        rows, columns = np.nonzero(hypotheses[:, i, :])
+        plugs: Dict[int, int] = {
+            int(a): int(u) for a, u in zip(rows.tolist(), columns.tolist()) if a < u
+        }
+        stops.append((int(starts[i // length]), plugs))
+    return stops
+
+
+def scan_order(
+    order: Tuple[int, ...],
+    menus: List[Menu],
+    wirings: np.ndarray,
+    reflector: np.ndarray,
+) -> List[Tuple[int, int, Dict[int, int]]]:
+    """
+    (offset, start counter, plugs) of every stop of one rotor order. Runs in worker processes.
+    Args:
+        order: Rotor indices, left to right.
+        wirings: Rotor.arr of every rotor in the config, shape (n_rotors, 2, L).
+    """
+    length: int = reflector.shape[0]
+    table: np.ndarray = compile_table(
+        [wirings[i][0] for i in order],
+        [wirings[i][1] for i in order],
+        reflector,
+        np.arange(length),
+        length,
+    )
+    period: int = table.shape[0]
+    block: int = max(1, BLOCK_CELLS // (length * length))
+    stops: List[Tuple[int, int, Dict[int, int]]] = []
+    for menu in menus:
+        for first in range(0, period, block):
+            starts: np.ndarray = np.arange(first, min(first + block, period))
+            stops.extend(
+                (menu.offset, start, plugs)
+                for start, plugs in scan_positions(menu, table, starts)
+            )
+    return stops
+
+
+def bombe_search(
+    ciphertext: Union[str, bytes],
+    crib: Union[str, bytes],
+    config_path: Path = None,
+    rotor_slots: int = 3,
+    orders: Sequence[Tuple[int, ...]] = None,
+    offsets: Sequence[int] = None,
+    max_stops: int = None,
+    workers: int = 1,
+    progress: Callable[[int, int], None] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Find rotor orders and start positions under which a crib fits the ciphertext.
+    Args:
+        ciphertext: As encoded by the machine; symbols outside its alphabet are dropped.
+        crib: Guessed plaintext, in the same alphabet.
+        config_path: Machine config holding the rotor set. Default config if None.
+        rotor_slots: Number of rotors in use.
+        orders: Rotor orders to try, left to right. Every ordered choice of `rotor_slots`
+            rotors from the config if None.
+        offsets: Crib placements to try, as letter indices into the ciphertext. Every placement
+            allowed by the no-self-encryption rule if None.
+        max_stops: Stop searching further rotor orders once this many stops are found.
+        workers: Number of processes. None means all cores.
+        progress: Called as progress(orders done, orders in total) as each order finishes.
+    Returns:
+        Stops as table entries, so they can be passed to Enigma(entry=...). "plugs" holds the
+        plugs implied by the menu, "offset" the crib placement and "score" the number of
+        closed loops in its menu.
+    """
+    if config_path is None:
+        config_path = Path(__file__).parent.parent.joinpath("configs", "default.csv")
+    rotors: List[Rotor]
+    reflector: Reflector
+    rotors, reflector = CONFIG_CACHE.get(config_path, Enigma.load_config)
+    base: int = reflector.base
+    length: int = reflector.arr.shape[0]
+    if orders is None:
+        orders = list(itertools.permutations(range(len(rotors)), rotor_slots))
+    cipher: np.ndarray = cipher_indices(ciphertext, base, length)
+    crib_letters: np.ndarray = cipher_indices(crib, base, length)
+    assert crib_letters.shape[0] > 1, "Crib needs at least two letters."
+    allowed: np.ndarray = crib_offsets(cipher, crib_letters)
+    if offsets is not None:
+        allowed = allowed[np.isin(allowed, offsets)]
+    menus: List[Menu] = [
+        Menu(cipher, crib_letters, offset) for offset in allowed.tolist()
+    ]
+    wirings: np.ndarray = np.stack([rotor.arr for rotor in rotors])
+
+    args: Tuple[Any, ...] = (menus, wirings, reflector.arr)
+    loops: Dict[int, int] = {menu.offset: menu.loops for menu in menus}
+    results: List[Dict[str, Any]] = []
+
+    def collect(done: int, order: Tuple[int, ...], stops: List[Tuple]):
+        for offset, start, plugs in stops:
+            entry: Dict[str, Any] = candidate(
+                order, start, float(loops[offset]), base, length
+            )
+            entry["plugs"] = {base + a: base + u for a, u in plugs.items()}
+            entry["offset"] = offset
+            results.append(entry)
+        if progress is not None:
+            progress(done, len(orders))
+
+    def enough() -> bool:
+        return max_stops is not None and len(results) >= max_stops
+
+    if workers == 1:
+        for done, order in enumerate(orders, 1):
+            collect(done, order, scan_order(order, *args))
+            if enough():
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures: Dict[Future, Tuple[int, ...]] = {
+                executor.submit(scan_order, order, *args): order for order in orders
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                collect(done, futures[future], future.result())
+                if enough():
+                    # Leaving the with block would otherwise wait for every running order.
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+    return results
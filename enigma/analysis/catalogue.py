@@ -0,0 +1,396 @@
+"""
+Rejewski's characteristic catalogue as an on-disk index.
+
+Each message starts with its 3-letter message key, enciphered twice at the day's ground setting.
+With A_1 .. A_6 the substitutions at those six steps, a key letter x gives indicator letters
+c_j = A_j[x] and c_{j+3} = A_{j+3}[x], so a day's indicators reveal the products A_{j+3} A_j:
+c_j -> c_{j+3}. The plugboard only conjugates these products, so their cycle lengths, the
+characteristic, depend on the rotor order and ground setting alone. Looking the characteristic
+up in a catalogue of every order and position leaves a handful of candidates.
+
+Index layout, one directory:
+    meta.json    alphabet, rotor slots, period and rotor orders.
+    keys.npy     uint64 hash of the characteristic of every (order, position), sorted.
+    entries.npy  order index * period + start counter of each key.
+    buckets.npy  first index in keys.npy of every value of the top BUCKET_BITS bits of a key.
+    distinct.npy the distinct keys, sorted, and characteristics.npy the exact cycle counts of
+                 each (see characteristic_columns()). Building checks that no two
+                 characteristics share a key.
+A query reads one bucket range and binary searches it, with every array memory-mapped, then
+compares its cycle counts with those of the key, so a hash collision cannot give false hits.
+
+Usage:
+    python -m enigma.analysis.catalogue DEST [--config PATH] [--slots 3] [--workers 0]
+builds the catalogue of a config written by ConfigGen.
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from enigma.analysis.ioc import candidate, cipher_indices
+from enigma.components.cache import CONFIG_CACHE
+from enigma.components.keystream import compile_table
+from enigma.components.machine import Enigma
+from enigma.components.rotors import Rotor, Reflector
+
+BUCKET_BITS: int = 16
+# Start positions are processed in blocks of about this many cells per substitution.
+BLOCK_CELLS: int = 1 << 22
+# Seed of the random weights the cycle counts are hashed with. Changing it invalidates catalogues.
+HASH_SEED: int = 1932
+
+
+def cycle_counts(permutations: np.ndarray) -> np.ndarray:
+    """
+    Number of cycles of every length in each permutation.
+    Args:
+        permutations: Shape (..., L).
+    Returns:
+        Shape (..., L + 1): entry k counts the cycles of length k.
+    """
+    shape: Tuple[int, ...] = permutations.shape
+    length: int = shape[-1]
+    flat: np.ndarray = permutations.reshape(-1, length)
+    n: int = flat.shape[0]
+
+    # Length of the cycle through every element: the first k with p^k(i) == i.
+    identity: np.ndarray = np.arange(length)
+    lengths: np.ndarray = np.zeros(flat.shape, dtype=np.int64)
+    current: np.ndarray = flat
+    for k in range(1, length + 1):
+        lengths[(current == identity) & (lengths == 0)] = k
+        if lengths.all():
+            break
+        current = np.take_along_axis(flat, current, axis=1)
+
+    counts: np.ndarray = np.bincount(
+        (np.arange(n)[:, None] * (length + 1) + lengths).reshape(-1),
+        minlength=n * (length + 1),
+    ).reshape(n, length + 1)
+    # A cycle of length k holds k elements.
+    counts //= np.maximum(np.arange(length + 1), 1)
+    return counts.reshape(shape[:-1] + (length + 1,))
+
+
+def characteristic_columns(products: np.ndarray) -> np.ndarray:
+    """
+    The cycle counts of each triple of products side by side: equal rows, equal characteristics.
+    Args:
+        products: Shape (3, N, L).
+    Returns:
+        Shape (N, 3 * (L + 1)), uint16.
+    """
+    counts: np.ndarray = cycle_counts(products)
+    return counts.transpose(1, 0, 2).reshape(counts.shape[1], -1).astype(np.uint16)
+
+
+def hash_columns(columns: np.ndarray) -> np.ndarray:
+    """
+    64-bit key of each row of characteristic_columns(): a weighted sum with fixed random weights,
+    so distinct characteristics practically never collide.
+    """
+    return (columns.astype(np.uint64) * hash_weights(columns.shape[1])).sum(
+        axis=1, dtype=np.uint64
+    )
+
+
+def characteristic_keys(products: np.ndarray) -> np.ndarray:
+    """
+    hash_columns() of the characteristic of each triple of products.
+    Args:
+        products: Shape (3, N, L).
+    """
+    return hash_columns(characteristic_columns(products))
+
+
+def distinct_characteristics(
+    keys: np.ndarray, columns: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sorted distinct keys and the characteristic_columns() row of each. Asserts that every row of
+    a key is the same, i.e. that no two characteristics collide.
+    """
+    order: np.ndarray = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    columns = columns[order]
+    starts: np.ndarray = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    starts = starts[starts < keys.shape[0]]
+    first: np.ndarray = np.repeat(starts, np.diff(np.r_[starts, keys.shape[0]]))
+    assert (
+        columns == columns[first]
+    ).all(), f"Distinct characteristics share a key; change HASH_SEED ({HASH_SEED})."
+    return keys[starts], columns[starts]
+
+
+@functools.lru_cache(maxsize=None)
+def hash_weights(n: int) -> np.ndarray:
+    """The fixed random weights of characteristic_keys()."""
+    return np.random.default_rng(HASH_SEED).integers(
+        0, np.iinfo(np.uint64).max, n, dtype=np.uint64, endpoint=True
+    )
+
+
+def characteristic(products: np.ndarray) -> Tuple[Tuple[int, ...], ...]:
+    """Cycle lengths of each of the three products, longest first, e.g. for printing."""
+    counts: np.ndarray = cycle_counts(products)
+    return tuple(
+        tuple(k for k in range(counts.shape[-1] - 1, 0, -1) for _ in range(row[k]))
+        for row in counts.tolist()
+    )
+
+
+def order_keys(
+    order: Tuple[int, ...], wirings: np.ndarray, reflector: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Characteristic key at every start counter of one rotor order. Runs in worker processes.
+    Args:
+        order: Rotor indices, left to right.
+        wirings: Rotor.arr of every rotor in the config, shape (n_rotors, 2, L).
+    Returns:
+        The keys, and distinct_characteristics() of the order.
+    """
+    length: int = reflector.shape[0]
+    table: np.ndarray = compile_table(
+        [wirings[i][0] for i in order],
+        [wirings[i][1] for i in order],
+        reflector,
+        np.arange(length),
+        length,
+    )
+    period: int = table.shape[0]
+    keys: np.ndarray = np.empty(period, dtype=np.uint64)
+    distinct: List[Tuple[np.ndarray, np.ndarray]] = []
+    # A block of start counters at a time bounds temporary memory on large alphabets.
+    block: int = max(1, BLOCK_CELLS // length)
+    for first in range(0, period, block):
+        starts: np.ndarray = np.arange(first, min(first + block, period))
+        # Substitution at step j (1-based) from every start counter.
+        step: List[np.ndarray] = [table[(starts + j) % period] for j in range(7)]
+        products: np.ndarray = np.stack(
+            [np.take_along_axis(step[j + 3], step[j], axis=1) for j in range(1, 4)]
+        )
+        columns: np.ndarray = characteristic_columns(products)
+        keys[first : first + block] = hash_columns(columns)
+        distinct.append(distinct_characteristics(keys[first : first + block], columns))
+    return (keys,) + distinct_characteristics(
+        np.concatenate([block_keys for block_keys, _ in distinct]),
+        np.concatenate([block_columns for _, block_columns in distinct]),
+    )
+
+
+def build_catalogue(
+    dest: Path,
+    config_path: Path = None,
+    rotor_slots: int = 3,
+    orders: Sequence[Tuple[int, ...]] = None,
+    workers: int = 1,
+) -> "Catalogue":
+    """
+    Compute and save the catalogue of every rotor order and start position.
+    Args:
+        dest: Directory to write to. Created if needed.
+        config_path: Machine config holding the rotor set. Default config if None.
+        rotor_slots: Number of rotors in use.
+        orders: Rotor orders to include, left to right. Every ordered choice of `rotor_slots`
+            rotors from the config if None.
+        workers: Number of processes. None means all cores.
+    """
+    if config_path is None:
+        config_path = Path(__file__).parent.parent.joinpath("configs", "default.csv")
+    rotors: List[Rotor]
+    reflector: Reflector
+    rotors, reflector = CONFIG_CACHE.get(config_path, Enigma.load_config)
+    length: int = reflector.arr.shape[0]
+    if orders is None:
+        orders = list(itertools.permutations(range(len(rotors)), rotor_slots))
+    orders = [tuple(int(r) for r in order) for order in orders]
+    wirings: np.ndarray = np.stack([rotor.arr for rotor in rotors])
+    args: Tuple[Any, ...] = (
+        orders,
+        [wirings] * len(orders),
+        [reflector.arr] * len(orders),
+    )
+
+    if workers == 1:
+        results: List[Tuple[np.ndarray, ...]] = list(map(order_keys, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(order_keys, *args))
+    keys: np.ndarray = np.concatenate([result[0] for result in results])
+    distinct, characteristics = distinct_characteristics(
+        np.concatenate([result[1] for result in results]),
+        np.concatenate([result[2] for result in results]),
+    )
+
+    # Keys are in (order, start) order, so their index is already the entry.
+    entries: np.ndarray = np.argsort(keys, kind="stable")
+    keys = keys[entries]
+    prefixes: np.ndarray = (keys >> np.uint64(64 - BUCKET_BITS)).astype(np.int64)
+    buckets: np.ndarray = np.zeros((1 << BUCKET_BITS) + 1, dtype=np.int64)
+    buckets[1:] = np.cumsum(np.bincount(prefixes, minlength=1 << BUCKET_BITS))
+
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+    np.save(dest.joinpath("keys.npy"), keys)
+    np.save(
+        dest.joinpath("entries.npy"),
+        entries.astype(np.uint32 if entries.shape[0] < 1 << 32 else np.int64),
+    )
+    np.save(dest.joinpath("buckets.npy"), buckets)
+    np.save(dest.joinpath("distinct.npy"), distinct)
+    np.save(dest.joinpath("characteristics.npy"), characteristics)
+    with open(dest.joinpath("meta.json"), "w") as f:
+        json.dump(
+            {
+                "base": reflector.base,
+                "length": length,
+                "rotor_slots": rotor_slots,
+                "period": length**rotor_slots,
+                "orders": orders,
+            },
+            f,
+        )
+    return Catalogue(dest)
+
+
+class Catalogue:
+    """A catalogue built by build_catalogue(), memory-mapped for lookups."""
+
+    def __init__(self, path: Path):
+        self.path: Path = Path(path)
+        with open(self.path.joinpath("meta.json")) as f:
+            meta: Dict[str, Any] = json.load(f)
+        self.base: int = meta["base"]
+        self.length: int = meta["length"]
+        self.period: int = meta["period"]
+        self.orders: List[Tuple[int, ...]] = [tuple(order) for order in meta["orders"]]
+        self.keys: np.ndarray = np.load(self.path.joinpath("keys.npy"), mmap_mode="r")
+        self.entries: np.ndarray = np.load(
+            self.path.joinpath("entries.npy"), mmap_mode="r"
+        )
+        self.buckets: np.ndarray = np.load(
+            self.path.joinpath("buckets.npy"), mmap_mode="r"
+        )
+        self.distinct: np.ndarray = np.load(
+            self.path.joinpath("distinct.npy"), mmap_mode="r"
+        )
+        self.characteristics: np.ndarray = np.load(
+            self.path.joinpath("characteristics.npy"), mmap_mode="r"
+        )
+
+    def __len__(self) -> int:
+        return self.keys.shape[0]
+
+    def lookup(self, key: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Every position with characteristic key `key`.
+        Returns:
+            Index into self.orders and start counter of each position.
+        """
+        key = np.uint64(key)
+        prefix: int = int(key >> np.uint64(64 - BUCKET_BITS))
+        low: int = int(self.buckets[prefix])
+        high: int = int(self.buckets[prefix + 1])
+        bucket: np.ndarray = self.keys[low:high]
+        first: int = low + int(np.searchsorted(bucket, key, side="left"))
+        last: int = low + int(np.searchsorted(bucket, key, side="right"))
+        return np.divmod(self.entries[first:last].astype(np.int64), self.period)
+
+    def search(self, products: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions with the characteristic of the products recovered from a day's indicators.
+        Args:
+            products: Shape (3, L), as returned by indicator_products().
+        Returns:
+            Index into self.orders and start counter of each position, as self.lookup(). See
+            self.candidates() for table entries.
+        """
+        assert (
+            products is not None
+        ), "Indicators do not cover every letter yet: indicator_products() returned None."
+        products = np.asarray(products)
+        shape: Tuple[int, int] = (3, self.length)
+        assert (
+            products.shape == shape
+        ), f"Products of shape {products.shape}, not {shape}."
+        columns: np.ndarray = characteristic_columns(products[:, None, :])
+        key: np.uint64 = hash_columns(columns)[0]
+        # Every position of a key has the same characteristic, so one comparison confirms all.
+        i: int = int(np.searchsorted(self.distinct, key))
+        if (
+            i == self.distinct.shape[0]
+            or self.distinct[i] != key
+            or (self.characteristics[i] != columns[0]).any()
+        ):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return self.lookup(int(key))
+
+    def candidates(
+        self, order_indices: np.ndarray, starts: np.ndarray
+    ) -> List[Dict[str, Any]]:
+        """
+        Positions from self.search() as table entries, with the ground setting as "rings" and no
+        plugs, so they can be passed to Enigma(entry=...).
+        """
+        return [
+            candidate(self.orders[i], start, 0.0, self.base, self.length)
+            for i, start in zip(order_indices.tolist(), starts.tolist())
+        ]
+
+
+def encipher_indicators(
+    machine: Enigma, keys: Sequence[Union[str, bytes]]
+) -> List[Union[str, bytes]]:
+    """
+    Each message key, e.g. from machine.message_keys(), enciphered twice from the day's ground
+    setting, as sent by operators.
+    """
+    machine.reset()
+    return machine.input_many([key * 2 for key in keys])
+
+
+def indicator_products(
+    indicators: Sequence[Union[str, bytes]], base: int, length: int
+) -> np.ndarray:
+    """
+    The products A_4 A_1, A_5 A_2 and A_6 A_3 from enciphered doubled keys, as a (3, L) array.
+    None while the indicators do not yet cover every letter at each of the first three places.
+    """
+    codes: np.ndarray = np.stack(
+        [cipher_indices(indicator, base, length) for indicator in indicators]
+    )
+    assert codes.shape[1] == 6, "Indicators must be doubled 3-letter keys."
+    products: np.ndarray = np.full((3, length), -1, dtype=np.int64)
+    for j in range(3):
+        products[j, codes[:, j]] = codes[:, j + 3]
+    return None if (products < 0).any() else products
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("dest", type=Path, help="Output directory.")
+    parser.add_argument("--config", type=Path, default=None)
+    parser.add_argument("--slots", type=int, default=3, help="Rotors in use.")
+    parser.add_argument("--workers", type=int, default=1, help="0 means all cores.")
+    args: argparse.Namespace = parser.parse_args()
+
+    start: float = time.perf_counter()
+    catalogue: Catalogue = build_catalogue(
+        args.dest, args.config, args.slots, workers=args.workers or None
+    )
+    print(
+        f"Catalogued {len(catalogue):,} positions of {len(catalogue.orders)} rotor orders "
+        f"in {time.perf_counter() - start:.2f} s."
+    )
+    print(f"Saved to {args.dest}.")
@@ -0,0 +1,72 @@
+"""
+Embedded English sample text, used to build language statistics and test messages for
+cryptanalysis without depending on external files.
+"""
+
+import numpy as np
+
+TEXT: str = """
+The weather report for the northern sector arrived shortly after dawn and was passed to the
+signals office without delay. Light rain was expected during the morning, clearing later in the
+day, with a moderate wind from the west and good visibility along the coast. The harbour master
+asked that all ships remain at anchor until the tide turned, and the convoy commander agreed to
+delay departure until the early afternoon.
+
+In the operations room the officers studied the map and discussed the movement of supplies to the
+forward positions. The road through the valley had been repaired during the night, but the bridge
+near the old mill was still closed to heavy traffic. A column of trucks carrying fuel, food and
+ammunition would therefore take the longer route through the hills, which added nearly three hours
+to the journey. The engineers promised that the bridge would be open again before the end of the
+week, although nobody in the room seemed to believe them.
+
+Messages were written out by hand, counted, and handed to the operator, who set the machine
+according to the key sheet for the day. Each morning the rotors were chosen from the wooden box,
+placed in the order given on the sheet, and turned to their starting positions. The plugboard
+cables were then connected in pairs, and the operator checked every setting twice before sending
+the first message. A single mistake could make a whole day of traffic unreadable at the other
+end, and the receiving station would ask for everything to be sent again, which wasted time and
+gave the listening enemy more material to study.
+
+The general wanted to know whether the attack planned for the following morning could still go
+ahead. His staff reported that the infantry were ready, that the artillery had received enough
+shells, and that the air force would provide support if the clouds lifted. The only concern was
+the river crossing, where the current was stronger than usual after the heavy rain of the previous
+week. Scouts had found a shallow place further downstream, and the engineers were preparing boats
+and ropes to help the first companies across before the light came up.
+
+Later that evening a long report came in from the eastern station. It described the arrival of
+new units near the border, the construction of a field hospital, and the repair of the railway
+line between the two largest towns in the region. The report also mentioned that the enemy had
+changed their radio procedures, sending shorter messages at irregular times and using more
+stations than before. The intelligence officer read it carefully, marked several passages for
+further study, and sent a summary to headquarters with a request for more listening posts in the
+area.
+
+There is an old saying among signal clerks that the most dangerous message is the routine one.
+Nobody expects anything important in the daily weather report or the list of supplies, so these
+messages are sent without thought, always in the same form, at the same hour, with the same
+greetings and the same signatures. A patient analyst who collects enough of them can guess whole
+words and sentences before reading a single letter, and those guesses are often the key that
+opens everything else. The best operators knew this and varied their messages whenever they
+could, but most were tired, busy and bored, and the habits of a long war are hard to break.
+
+Teaching new recruits to use the machine took about two weeks. They learned how to read the key
+sheet, how to set the rotors and the plugboard, how to choose a message key, and how to count the
+letters of a message so that the receiving station could check nothing had been lost. They also
+learned what never to do: never send the same message twice with different settings, never use a
+message key made of the same letter repeated, never begin every message with the same words. Most
+of them forgot these rules within a month, and the instructors complained about it constantly.
+
+By the end of the month the supply situation had improved considerably. The new bridge was open,
+the railway was carrying trains again, and the stores near the front held enough food and fuel
+for several weeks of operations. The commanders met once more to review the plans, agreed on the
+final order of march, and sent their instructions to every unit in the sector. The messages went
+out that night, one after another, each one carefully enciphered and counted, while the rain
+began again outside the window and the wind rattled the old shutters of the signal office.
+"""
+
+
+def letters(text: str = TEXT) -> np.ndarray:
+    """Letters of `text` as 0-based indices A=0 .. Z=25, everything else dropped."""
+    codes: np.ndarray = np.frombuffer(text.upper().encode("ascii"), dtype=np.uint8)
+    return (codes[(codes >= 65) & (codes <= 90)] - 65).astype(np.int64)
@@ -0,0 +1,197 @@
+"""
+Ciphertext-only search for rotor order and start positions by index of coincidence.
+
+Following Gillogly's attack, the plugboard is ignored: every rotor order is tried at every start
+position with no plugs, and each trial decryption is scored by its index of coincidence, which is
+higher for language than for random letters. The right order and positions tend to score near
+the top even with a few plugs connected, and the plugboard can then be recovered separately.
+
+For each order, the substitutions at every counter value are computed once, as a keystream table
+(see enigma.components.keystream), so a trial decryption is a table lookup per letter. Trials
+are scored a block of start positions at a time, and orders are spread over processes.
+"""
+
+import heapq
+import itertools
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from enigma.components import engine
+from enigma.components.cache import CONFIG_CACHE
+from enigma.components.keystream import compile_table
+from enigma.components.machine import Enigma
+from enigma.components.rotors import Rotor, Reflector
+from enigma.utils.constants import ROTOR_NAMES
+
+# Trial decryptions are scored in blocks of start positions of about this many letters in total.
+BLOCK_LETTERS: int = 1 << 22
+
+
+def cipher_indices(ciphertext: Union[str, bytes], base: int, length: int) -> np.ndarray:
+    """
+    0-based indices of the symbols of `ciphertext` that are in the alphabet, as encoded by
+    Enigma.encode_buffer(): other symbols passed through without stepping the rotors, so they
+    are dropped. Lowercase letters count as uppercase on A-Z machines.
+    """
+    if isinstance(ciphertext, str):
+        ciphertext = ciphertext.encode("latin-1")
+    codes: np.ndarray = np.frombuffer(ciphertext, dtype=np.uint8)
+    if base == 65 and length == 26:
+        codes = np.where((codes >= 97) & (codes <= 122), codes & 0xDF, codes)
+    codes = codes[(codes >= base) & (codes < base + length)]
+    return codes.astype(np.int64) - base
+
+
+def index_of_coincidence(counts: np.ndarray) -> np.ndarray:
+    """Index of coincidence from symbol counts along the last axis."""
+    counts = counts.astype(np.int64)
+    n: np.ndarray = counts.sum(axis=-1)
+    return (counts * (counts - 1)).sum(axis=-1) / np.maximum(n * (n - 1), 1)
+
+
+def wrap_table(table: np.ndarray, n_letters: int) -> np.ndarray:
+    """
+    Keystream table flattened and extended cyclically by `n_letters + 1` rows, so decryptions of
+    `n_letters` letters from any start counter index it without wrapping.
+    Args:
+        table: Keystream table of one rotor order, row c is the substitution at counter c.
+    """
+    period, length = table.shape
+    return np.resize(table.reshape(-1), (period + n_letters + 1) * length)
+
+
+def score_starts(
+    cipher: np.ndarray, flat: np.ndarray, length: int, starts: np.ndarray
+) -> np.ndarray:
+    """
+    Index of coincidence of the plugless decryption from every counter value in `starts`.
+    Args:
+        cipher: 0-based ciphertext indices.
+        flat: wrap_table() of the order's keystream table for len(cipher) letters.
+    """
+    n_letters: int = cipher.shape[0]
+    # Table index of every letter from counter 0; other starts shift it by whole rows.
+    offsets: np.ndarray = np.arange(1, n_letters + 1) * length + cipher
+    plain: np.ndarray = flat[offsets[None, :] + starts[:, None] * length]
+    # Count symbols per start position with one bincount over (start, symbol) pairs.
+    rows: np.ndarray = np.arange(starts.shape[0])[:, None] * length
+    counts: np.ndarray = np.bincount(
+        (rows + plain).reshape(-1), minlength=starts.shape[0] * length
+    ).reshape(starts.shape[0], length)
+    return index_of_coincidence(counts)
+
+
+def search_order(
+    order: Tuple[int, ...],
+    cipher: np.ndarray,
+    wirings: np.ndarray,
+    reflector: np.ndarray,
+    top_k: int,
+) -> List[Tuple[float, int]]:
+    """
+    Best `top_k` (score, start counter) pairs for one rotor order. Runs in worker processes.
+    Args:
+        order: Rotor indices, left to right.
+        wirings: Rotor.arr of every rotor in the config, shape (n_rotors, 2, L).
+    """
+    length: int = reflector.shape[0]
+    table: np.ndarray = compile_table(
+        [wirings[i][0] for i in order],
+        [wirings[i][1] for i in order],
+        reflector,
+        np.arange(length),
+        length,
+    )
+    period: int = table.shape[0]
+    # Wrapped once per order, not per block.
+    flat: np.ndarray = wrap_table(table, cipher.shape[0])
+    del table
+    block: int = max(1, BLOCK_LETTERS // max(cipher.shape[0], 1))
+    best: List[Tuple[float, int]] = []
+    for first in range(0, period, block):
+        starts: np.ndarray = np.arange(first, min(first + block, period))
+        scores: np.ndarray = score_starts(cipher, flat, length, starts)
+        keep: np.ndarray = np.argsort(scores)[::-1][:top_k]
+        best = heapq.nlargest(
+            top_k,
+            best + [(float(scores[i]), int(starts[i])) for i in keep],
+        )
+    return best
+
+
+def candidate(
+    order: Tuple[int, ...], start: int, score: float, base: int, length: int
+) -> Dict[str, Any]:
+    """A search result in the table entry format, so it can be passed to Enigma(entry=...)."""
+    positions: np.ndarray = engine.odometer_positions(start, length, len(order))
+    return {
+        "rotors": list(order),
+        "rings": [base + int(position) for position in positions],
+        "plugs": {},
+        "indicators": [],
+        "score": score,
+        "names": " ".join(ROTOR_NAMES.get(r, str(r)) for r in order),
+    }
+
+
+def ioc_search(
+    ciphertext: Union[str, bytes],
+    config_path: Path = None,
+    rotor_slots: int = 3,
+    orders: Sequence[Tuple[int, ...]] = None,
+    top_k: int = 10,
+    workers: int = 1,
+    progress: Callable[[int, int], None] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Rank rotor orders and start positions for a ciphertext.
+    Args:
+        config_path: Machine config holding the rotor set. Default config if None.
+        rotor_slots: Number of rotors in use.
+        orders: Rotor orders to try, left to right. Every ordered choice of `rotor_slots`
+            rotors from the config if None, e.g. 60 for 5 rotors and 3 slots.
+        top_k: Number of results.
+        workers: Number of processes. None means all cores.
+        progress: Called as progress(orders done, orders in total) as each order finishes.
+    Returns:
+        Best `top_k` candidates, highest score first. Each is a table entry with no plugs, plus
+        "score" (index of coincidence) and "names" (rotor names).
+    """
+    if config_path is None:
+        config_path = Path(__file__).parent.parent.joinpath("configs", "default.csv")
+    rotors: List[Rotor]
+    reflector: Reflector
+    rotors, reflector = CONFIG_CACHE.get(config_path, Enigma.load_config)
+    length: int = reflector.arr.shape[0]
+    if orders is None:
+        orders = list(itertools.permutations(range(len(rotors)), rotor_slots))
+    cipher: np.ndarray = cipher_indices(ciphertext, reflector.base, length)
+    assert cipher.shape[0] > 1, "Ciphertext needs at least two letters."
+    wirings: np.ndarray = np.stack([rotor.arr for rotor in rotors])
+
+    args: Tuple[Any, ...] = (cipher, wirings, reflector.arr, top_k)
+    results: List[Tuple[float, Tuple[int, ...], int]] = []
+
+    def collect(done: int, order: Tuple[int, ...], best: List[Tuple[float, int]]):
+        results.extend((score, tuple(order), start) for score, start in best)
+        if progress is not None:
+            progress(done, len(orders))
+
+    if workers == 1:
+        for done, order in enumerate(orders, 1):
+            collect(done, order, search_order(order, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures: Dict[Future, Tuple[int, ...]] = {
+                executor.submit(search_order, order, *args): order for order in orders
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                collect(done, futures[future], future.result())
+
+    return [
+        candidate(order, start, score, reflector.base, length)
+        for score, order, start in heapq.nlargest(top_k, results)
+    ]
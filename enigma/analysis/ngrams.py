@@ -0,0 +1,71 @@
+"""
+N-gram language models for scoring candidate decryptions.
+A model is an n-dimensional array of log10 probabilities indexed by 0-based letters (A=0), so
+scoring a text is one gather over its sliding windows.
+"""
+
+import functools
+from typing import Tuple
+
+import numpy as np
+
+from enigma.analysis import corpus
+
+
+class NgramModel:
+    """Log10 probabilities of every n-gram over an alphabet."""
+
+    def __init__(self, log_probs: np.ndarray):
+        """
+        Args:
+            log_probs: Array of shape (L,) * n, where entry [a, b, ...] is the log10
+                probability of the n-gram a b ....
+        """
+        self.n: int = log_probs.ndim
+        self.length: int = log_probs.shape[0]
+        self.table: np.ndarray = np.ascontiguousarray(log_probs, dtype=np.float64)
+        # Flat view, indexed by the n-gram read as a base-L number.
+        self.flat: np.ndarray = self.table.reshape(-1)
+        self.weights: np.ndarray = self.length ** np.arange(self.n - 1, -1, -1)
+
+    @classmethod
+    def from_corpus(
+        cls, text: str = corpus.TEXT, n: int = 3, smoothing: float = 0.5
+    ) -> "NgramModel":
+        """
+        Count n-grams of the letters of `text`, ignoring everything else.
+        Args:
+            smoothing: Added to every count, so unseen n-grams get a finite score.
+        """
+        letters: np.ndarray = corpus.letters(text)
+        assert letters.shape[0] >= n, "Corpus is shorter than one n-gram."
+        windows: np.ndarray = np.lib.stride_tricks.sliding_window_view(letters, n)
+        counts: np.ndarray = np.bincount(
+            windows @ (26 ** np.arange(n - 1, -1, -1)), minlength=26**n
+        ).astype(np.float64)
+        counts += smoothing
+        return cls(np.log10(counts / counts.sum()).reshape((26,) * n))
+
+    def codes(self, indices: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """Flat table index of the n-gram starting at each of `starts`."""
+        codes: np.ndarray = np.zeros(starts.shape[0], dtype=np.int64)
+        for k in range(self.n):
+            codes = codes * self.length + indices[starts + k]
+        return codes
+
+    def score(self, indices: np.ndarray) -> float:
+        """Sum of log probabilities of every n-gram of a text of 0-based letters."""
+        if indices.shape[0] < self.n:
+            return 0.0
+        windows: np.ndarray = np.lib.stride_tricks.sliding_window_view(indices, self.n)
+        return float(self.flat[windows @ self.weights].sum())
+
+    def window_score(self, indices: np.ndarray, starts: np.ndarray) -> float:
+        """Sum of log probabilities of the n-grams starting at `starts` only."""
+        return float(self.flat[self.codes(indices, starts)].sum())
+
+
+@functools.lru_cache(maxsize=None)
+def default_models() -> Tuple[NgramModel, NgramModel]:
+    """Bigram and trigram models of the embedded corpus, built once per process."""
+    return NgramModel.from_corpus(n=2), NgramModel.from_corpus(n=3)
@@ -0,0 +1,268 @@
+"""
+Plugboard recovery by hill climbing, once rotor order and start positions are known (e.g. from
+enigma.analysis.ioc).
+
+Without plugs, the machine applies a known substitution S_t at every step t, so with a plugboard P
+a ciphertext letter c decrypts to P[S_t[P[c]]]. Starting from some plugboard, the climber tries
+every change to the plugs of a pair of letters and keeps those that raise the n-gram score of the
+decryption, first with bigrams and then with trigrams, until no change helps. A change only
+touches positions where the ciphertext letter or the middle letter S_t[P[c]] is one of the
+re-plugged letters, so only those positions are decrypted again and only the n-grams covering
+them are rescored. Climbs from several random starting plugboards run in parallel.
+"""
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from enigma.analysis.ioc import cipher_indices
+from enigma.analysis.ngrams import NgramModel, default_models
+from enigma.components import engine
+from enigma.components.machine import Enigma
+
+
+def positions_by_letter(letters: np.ndarray, length: int) -> List[np.ndarray]:
+    """Sorted positions of every letter in a text of 0-based letters."""
+    order: np.ndarray = np.argsort(letters, kind="stable")
+    bounds: np.ndarray = np.zeros(length + 1, dtype=np.int64)
+    bounds[1:] = np.cumsum(np.bincount(letters, minlength=length))
+    return [order[bounds[k] : bounds[k + 1]] for k in range(length)]
+
+
+class Decryption:
+    """
+    Plaintext under a plugboard, updated incrementally as plugs change.
+    Positions are indexed by ciphertext letter and by middle letter, so a trial only touches the
+    positions and n-grams its re-plugged letters reach, not the whole text.
+    """
+
+    def __init__(
+        self,
+        substitutions: np.ndarray,
+        cipher: np.ndarray,
+        plugboard: np.ndarray,
+        model: NgramModel,
+    ):
+        """
+        Args:
+            substitutions: Plugless substitution at every step, shape (T, L).
+            cipher: 0-based ciphertext indices, shape (T,).
+            plugboard: Involution of 0-based indices.
+        """
+        length: int = substitutions.shape[1]
+        self.substitutions: np.ndarray = substitutions
+        self.cipher: np.ndarray = cipher
+        self.model: NgramModel = model
+        self.plugboard: np.ndarray = plugboard.copy()
+        self.middle: np.ndarray = substitutions[
+            np.arange(cipher.shape[0]), plugboard[cipher]
+        ]
+        self.plain: np.ndarray = plugboard[self.middle]
+        self.score: float = model.score(self.plain)
+        # Positions of each ciphertext letter, fixed, and of each middle letter, kept up to
+        # date by self.apply().
+        self.cipher_positions: List[np.ndarray] = positions_by_letter(cipher, length)
+        self.middle_positions: List[np.ndarray] = positions_by_letter(
+            self.middle, length
+        )
+        # Scratch index of changed positions during self.try_plugboard(), -1 elsewhere.
+        self.slots: np.ndarray = np.full(cipher.shape[0], -1, dtype=np.int64)
+
+    def try_plugboard(
+        self, plugboard: np.ndarray, changed: np.ndarray
+    ) -> Tuple[float, Tuple[np.ndarray, ...]]:
+        """
+        Score change if the plugboard became `plugboard`, which differs from the current one
+        only at letters marked in the boolean array `changed`.
+        Returns:
+            The score change, and the update to pass to self.apply().
+        """
+        letters: List[int] = np.flatnonzero(changed).tolist()
+        positions: np.ndarray = np.sort(
+            np.concatenate(
+                [self.cipher_positions[k] for k in letters]
+                + [self.middle_positions[k] for k in letters]
+            )
+        )
+        # A position can be listed under both its ciphertext and its middle letter.
+        first: np.ndarray = np.ones(positions.shape[0], dtype=bool)
+        first[1:] = positions[1:] != positions[:-1]
+        positions = positions[first]
+        middle: np.ndarray = self.substitutions[
+            positions, plugboard[self.cipher[positions]]
+        ]
+        plain: np.ndarray = plugboard[middle]
+
+        # Every n-gram that covers a changed position. A start counts for the first position it
+        # covers only, i.e. when it is after the previous changed position, so none repeats.
+        n: int = self.model.n
+        previous: np.ndarray = np.empty_like(positions)
+        previous[:1] = -1
+        previous[1:] = positions[:-1]
+        starts: np.ndarray = positions[:, None] - np.arange(n)[None, :]
+        starts = starts[
+            (starts > previous[:, None])
+            & (starts >= 0)
+            & (starts <= self.plain.shape[0] - n)
+        ]
+
+        # The letters of those n-grams side by side in a local buffer, as they are and with the
+        # changed positions replaced. self.slots maps a position to its index in `positions`
+        # while they are marked, and is cleared again right after.
+        covered: np.ndarray = (starts[:, None] + np.arange(n)[None, :]).reshape(-1)
+        self.slots[positions] = np.arange(positions.shape[0])
+        slots: np.ndarray = self.slots[covered]
+        self.slots[positions] = -1
+        old: np.ndarray = self.plain[covered]
+        new: np.ndarray = np.where(slots >= 0, plain[slots], old)
+        windows: np.ndarray = np.arange(0, covered.shape[0], n)
+        delta: float = self.model.window_score(new, windows) - self.model.window_score(
+            old, windows
+        )
+        return delta, (plugboard, positions, middle, plain)
+
+    def apply(self, delta: float, update: Tuple[np.ndarray, ...]):
+        plugboard, positions, middle, plain = update
+        moved: np.ndarray = self.middle[positions] != middle
+        old_letters: np.ndarray = self.middle[positions[moved]]
+        self.plugboard = plugboard
+        self.middle[positions] = middle
+        self.plain[positions] = plain
+        self.score += delta
+
+        # Move positions whose middle letter changed to their new letter's list.
+        for k in set(old_letters.tolist()) | set(middle[moved].tolist()):
+            kept: np.ndarray = self.middle_positions[k]
+            self.middle_positions[k] = np.sort(
+                np.concatenate(
+                    [kept[self.middle[kept] == k], positions[moved][middle[moved] == k]]
+                )
+            )
+
+
+def pair_changes(
+    plugboard: np.ndarray, i: int, j: int, max_plugs: int
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Plugboards reachable by re-plugging letters i and j, with the letters that change:
+        . i and j connected: disconnect them;
+        . otherwise: connect i to j, releasing their partners, which are also tried connected
+          to each other.
+    """
+    length: int = plugboard.shape[0]
+    changed: np.ndarray = np.zeros(length, dtype=bool)
+    if plugboard[i] == j:
+        new: np.ndarray = plugboard.copy()
+        new[i], new[j] = i, j
+        changed[[i, j]] = True
+        return [(new, changed)]
+
+    k: int = int(plugboard[i])
+    m: int = int(plugboard[j])
+    changed[[i, j, k, m]] = True
+    connected: np.ndarray = plugboard.copy()
+    connected[[k, m]] = [k, m]
+    connected[i], connected[j] = j, i
+    changes: List[Tuple[np.ndarray, np.ndarray]] = []
+    if np.count_nonzero(connected != np.arange(length)) // 2 <= max_plugs:
+        changes.append((connected, changed))
+    if k != i and m != j:
+        swapped: np.ndarray = connected.copy()
+        swapped[k], swapped[m] = m, k
+        changes.append((swapped, changed))
+    return changes
+
+
+def hill_climb(
+    substitutions: np.ndarray,
+    cipher: np.ndarray,
+    max_plugs: int,
+    initial_plugs: int,
+    seed: Union[int, np.random.SeedSequence],
+) -> Tuple[np.ndarray, float]:
+    """
+    One climb from a random plugboard of `initial_plugs` pairs. Runs in worker processes.
+    Returns:
+        The plugboard as an index array, and its trigram score.
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    length: int = substitutions.shape[1]
+    plugboard: np.ndarray = np.arange(length)
+    letters: np.ndarray = rng.permutation(length)
+    for a, b in letters[: 2 * initial_plugs].reshape(-1, 2):
+        plugboard[a], plugboard[b] = b, a
+    pairs: List[Tuple[int, int]] = list(itertools.combinations(range(length), 2))
+
+    for model in default_models():
+        state = Decryption(substitutions, cipher, plugboard, model)
+        improved: bool = True
+        while improved:
+            improved = False
+            for pair_i in rng.permutation(len(pairs)):
+                i, j = pairs[pair_i]
+                for new, changed in pair_changes(state.plugboard, i, j, max_plugs):
+                    delta, update = state.try_plugboard(new, changed)
+                    if delta > 1e-9:
+                        state.apply(delta, update)
+                        improved = True
+                        break
+        plugboard = state.plugboard
+    return plugboard, state.score
+
+
+def solve_plugboard(
+    machine: Enigma,
+    ciphertext: Union[str, bytes],
+    max_plugs: int = 13,
+    restarts: int = 8,
+    workers: int = 1,
+    seed: int = None,
+) -> Tuple[Dict[int, int], float]:
+    """
+    Recover the plugboard of a machine whose rotors and positions are already right.
+    The machine's own plugs are ignored; decryption starts from its current rotor positions.
+    Args:
+        max_plugs: Most plug pairs to consider, e.g. 6 for CodeGen defaults.
+        restarts: Number of climbs. The first starts without plugs, the others from random
+            plugboards of up to `max_plugs` pairs.
+        workers: Number of processes. None means all cores.
+        seed: Seed of the random starting plugboards and search order.
+    Returns:
+        Plugs as in a table entry (each pair once, as symbol codes), and the trigram score of
+        the decryption.
+    """
+    assert machine.alpha_only, "Language models only cover the A-Z alphabet."
+    cipher: np.ndarray = cipher_indices(ciphertext, machine.base, machine.length)
+    substitutions: np.ndarray = engine.step_permutations(
+        engine.odometer_value(machine.snapshot(), machine.length),
+        cipher.shape[0],
+        [rotor.arr[0] for rotor in machine.rotors],
+        [rotor.arr[1] for rotor in machine.rotors],
+        machine.reflector.arr,
+        np.arange(machine.length),
+        machine.length,
+    )
+
+    seeds: List[np.random.SeedSequence] = np.random.SeedSequence(seed).spawn(restarts)
+    starts: List[int] = [0] + [
+        int(np.random.default_rng(s).integers(0, max_plugs + 1)) for s in seeds[1:]
+    ]
+    args: List[Tuple] = [
+        (substitutions, cipher, max_plugs, initial, s)
+        for initial, s in zip(starts, seeds)
+    ]
+    if workers == 1:
+        results: List[Tuple[np.ndarray, float]] = [hill_climb(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(hill_climb, *zip(*args)))
+
+    plugboard, score = max(results, key=lambda result: result[1])
+    plugs: Dict[int, int] = {
+        machine.base + i: machine.base + int(p)
+        for i, p in enumerate(plugboard.tolist())
+        if i < p
+    }
+    return plugs, score
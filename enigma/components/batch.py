@@ -0,0 +1,118 @@
+"""
+Configuration-batched machine.
+Holds many settings over one rotor set (e.g. every day of a table) as stacked arrays, and runs all
+of them over the same message in one vectorized pass.
+"""
+
+from typing import Any, Dict, List, Mapping, Union
+from pathlib import Path
+
+import numpy as np
+
+from enigma.components import engine
+from enigma.components.cache import CONFIG_CACHE, TABLE_CACHE
+from enigma.components.machine import Enigma
+from enigma.components.rotors import Rotor, Reflector
+
+
+class BatchEnigma:
+    """N Enigma settings advanced together."""
+
+    def __init__(
+        self,
+        config_path: Path = None,
+        table_path: Path = None,
+        dates: List[int] = None,
+        block_size: int = 256,
+    ):
+        """
+        Load configuration file and table once, and stack the requested dates.
+        Args:
+            dates: 1-based dates to load. None means every date in the table.
+            block_size: Number of settings processed at a time; bounds temporary memory.
+        """
+        if config_path is None:
+            config_path = Path(__file__).parent.parent.joinpath(
+                "configs", "default.csv"
+            )
+        if table_path is None:
+            table_path = Path(__file__).parent.parent.joinpath("tables", "default.csv")
+
+        all_rotors: List[Rotor]
+        reflector: Reflector
+        all_rotors, reflector = CONFIG_CACHE.get(config_path, Enigma.load_config)
+        tables: Mapping[int, Dict[str, Any]] = TABLE_CACHE.get(
+            table_path, Enigma.load_tables
+        )
+        if dates is None:
+            dates = sorted(tables.keys())
+        for date in dates:
+            assert date in tables, f"Date {date} not found in {table_path}."
+
+        self.dates: List[int] = list(dates)
+        self.block_size: int = block_size
+        self.base: int = reflector.base
+        self.length: int = reflector.arr.shape[0]
+
+        # Stacked settings, one row per date.
+        wirings: np.ndarray = np.stack([rotor.arr for rotor in all_rotors])
+        rotor_ids: np.ndarray = np.array([tables[d]["rotors"] for d in self.dates])
+        self.forward: np.ndarray = wirings[rotor_ids, 0]  # (N, n_rotors, length)
+        self.backward: np.ndarray = wirings[rotor_ids, 1]  # (N, n_rotors, length)
+        self.reflector: np.ndarray = reflector.arr
+        self.plugboards: np.ndarray = np.stack(
+            [
+                engine.plugboard_array(tables[d]["plugs"], self.base, self.length)
+                for d in self.dates
+            ]
+        )  # (N, length)
+        rings: np.ndarray = (
+            np.array([tables[d]["rings"] for d in self.dates], dtype=np.int64)
+            - self.base
+        )
+        self.starts: np.ndarray = np.array(
+            [engine.odometer_value(ring, self.length) for ring in rings],
+            dtype=np.int64,
+        )  # Counter value of each setting's initial positions.
+
+    def input(self, input_str: Union[str, bytes, bytearray, memoryview]) -> np.ndarray:
+        """
+        Encode one message under every setting, each from its initial positions.
+        Returns symbol codes of shape (N, len(input_str)); row i belongs to self.dates[i].
+        """
+        indices: np.ndarray = engine.to_indices(input_str, self.base, self.length)
+        n_settings: int = len(self.dates)
+        n_rotors: int = self.forward.shape[1]
+        output: np.ndarray = np.empty((n_settings, indices.shape[0]), dtype=np.uint8)
+
+        steps: np.ndarray = np.arange(1, indices.shape[0] + 1, dtype=np.int64)
+        for i in range(0, n_settings, self.block_size):
+            block: slice = slice(i, i + self.block_size)
+            positions: np.ndarray = engine.odometer_positions(
+                self.starts[block, None] + steps, self.length, n_rotors
+            )
+            block_indices: np.ndarray = np.broadcast_to(
+                indices, (positions.shape[1], indices.shape[0])
+            )
+            output[block] = (
+                engine.encode_batched(
+                    block_indices,
+                    positions,
+                    self.forward[block],
+                    self.backward[block],
+                    self.reflector,
+                    self.plugboards[block],
+                    self.length,
+                )
+                + self.base
+            )
+        return output
+
+    def input_strings(
+        self, input_str: Union[str, bytes, bytearray, memoryview]
+    ) -> List[Union[str, bytes]]:
+        """Same as self.input(), converted to one string (or bytes) per setting."""
+        output: np.ndarray = self.input(input_str)
+        if isinstance(input_str, str):
+            return [row.tobytes().decode("latin-1") for row in output]
+        return [row.tobytes() for row in output]
@@ -0,0 +1,128 @@
+"""
+Process-wide cache of parsed configs and tables.
+Entries are keyed by resolved path and checked against the file's mtime and size on every hit,
+so edited files are reloaded. The least recently used entry is evicted when a cache is full.
+Also holds PermutationCache, each machine's cache of substitutions from message key positions.
+"""
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+
+
+class LoaderCache:
+    """Bounded LRU cache of parsed files."""
+
+    def __init__(self, max_size: int = 16):
+        """
+        Args:
+            max_size: Maximum number of files kept.
+        """
+        assert max_size > 0
+        self.max_size: int = max_size
+        # Resolved path -> (mtime_ns, size, parsed value).
+        self.entries: "OrderedDict[str, Tuple[int, int, Any]]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, path: Path, loader: Callable[[Path], Any]) -> Any:
+        """Return the parsed content of `path`, calling `loader(path)` if absent or stale."""
+        path = Path(path)
+        if not path.is_file():
+            return loader(path)  # Let the loader report the problem.
+        key: str = str(path.resolve())
+        stat: os.stat_result = os.stat(key)
+
+        entry: Tuple[int, int, Any] = self.entries.get(key)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[2]
+
+        self.misses += 1
+        value: Any = loader(path)
+        self.entries[key] = (stat.st_mtime_ns, stat.st_size, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+class PermutationCache:
+    """
+    Bounded LRU cache of the substitutions applied from a start position, keyed by odometer
+    counter, so messages sent under the same message key are not recomputed.
+    """
+
+    def __init__(self, max_size: int = 256, max_steps: int = 1 << 11):
+        """
+        Args:
+            max_size: Maximum number of start positions kept.
+            max_steps: Longest sequence kept; longer messages are not cached.
+        """
+        assert max_size > 0 and max_steps > 0
+        self.max_size: int = max_size
+        self.max_steps: int = max_steps
+        # Start counter -> substitutions of the following steps, shape (n_steps, L).
+        self.entries: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def get(
+        self, start: int, n_steps: int, compute: Callable[[int, int], np.ndarray]
+    ) -> np.ndarray:
+        """
+        First `n_steps` substitutions from counter `start`, calling compute(start, n_steps) if
+        absent or shorter than needed.
+        """
+        assert n_steps <= self.max_steps, f"Cannot cache {n_steps} steps."
+        entry: np.ndarray = self.entries.get(start)
+        if entry is not None and entry.shape[0] >= n_steps:
+            self.hits += 1
+            self.entries.move_to_end(start)
+            return entry[:n_steps]
+
+        self.misses += 1
+        entry = compute(start, n_steps)
+        self.entries[start] = entry
+        self.entries.move_to_end(start)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+CONFIG_CACHE: LoaderCache = LoaderCache()
+TABLE_CACHE: LoaderCache = LoaderCache()
+
+
+def clear_caches():
+    """Drop every cached config and table."""
+    CONFIG_CACHE.clear()
+    TABLE_CACHE.clear()
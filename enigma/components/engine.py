@@ -0,0 +1,409 @@
+"""
+Vectorized cipher engine.
+Rotor stepping is pure odometer arithmetic: with n rotors of length L, the rotor positions read
+from left to right are the base-L digits of a single counter that goes up by one per character.
+Functions here compute the positions for a whole message at once and push every character through
+the plugboard, rotors and reflector with NumPy gathers.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+# Bytes encoded per vectorized call by the passthrough encoders; bounds temporary memory.
+BLOCK_SIZE: int = 1 << 16
+
+
+def to_indices(
+    message: Union[str, bytes, bytearray, memoryview], base: int, length: int
+) -> np.ndarray:
+    """
+    Validate a message and convert it to 0-based symbol indices, as uint8.
+    Strings on an A-Z alphabet are uppercased first. Bytes-like input on an alphabet starting at
+    code 0 is viewed without copying; other alphabets take one uint8 copy to subtract the base.
+    """
+    if isinstance(message, str):
+        if base == 65 and length == 26:
+            message = message.upper()
+            assert message.isalpha(), f"Only alpha strings accepted. Got {message}."
+        message_arr: np.ndarray = np.frombuffer(
+            message.encode("latin-1"), dtype=np.uint8
+        )
+    else:
+        message_arr = np.frombuffer(message, dtype=np.uint8)
+    # Symbols below the base wrap around past the alphabet, so one comparison checks both ends.
+    indices: np.ndarray = message_arr if base == 0 else message_arr - np.uint8(base)
+    assert (
+        indices < length
+    ).all(), "Message contains symbols outside the machine alphabet."
+    return indices
+
+
+def alphabet_indices(
+    buffer: np.ndarray, base: int, length: int, fold_case: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Passthrough rule over a uint8 array of bytes: find the bytes inside the alphabet.
+    Args:
+        fold_case: Uppercase ASCII letters first, as on A-Z machines.
+    Returns:
+        Boolean mask of the bytes inside the alphabet, and their 0-based uint8 indices.
+    """
+    symbols: np.ndarray = buffer
+    if fold_case:
+        is_lower: np.ndarray = (buffer >= 97) & (buffer <= 122)
+        symbols = np.where(is_lower, buffer & 0xDF, buffer)  # To uppercase.
+    # As in to_indices(), symbols below the base wrap around past the alphabet.
+    indices: np.ndarray = symbols - np.uint8(base)
+    in_alphabet: np.ndarray = indices < length
+    return in_alphabet, indices[in_alphabet]
+
+
+def from_indices(
+    indices: np.ndarray, base: int, like: Union[str, bytes, bytearray, memoryview]
+) -> Union[str, bytes]:
+    """Convert 0-based symbol indices back to a string or bytes, matching `like`."""
+    output: bytes = (indices + base).astype(np.uint8, copy=False).tobytes()
+    return output.decode("latin-1") if isinstance(like, str) else output
+
+
+def plugboard_array(plugs: Dict[int, int], base: int, length: int) -> np.ndarray:
+    """
+    Plugboard as an index array; unplugged characters map to themselves.
+    `plugs` holds symbol codes and may list each pair in one or both directions.
+    """
+    plugboard: np.ndarray = np.arange(length, dtype=np.int64)
+    for p1, p2 in plugs.items():
+        plugboard[p1 - base] = p2 - base
+        plugboard[p2 - base] = p1 - base
+    return plugboard
+
+
+def odometer_value(positions: Sequence[int], length: int) -> int:
+    """Convert rotor positions (left to right) into a single counter value."""
+    value: int = 0
+    for position in positions:
+        value = value * length + int(position)
+    return value
+
+
+def odometer_positions(values: np.ndarray, length: int, n_rotors: int) -> np.ndarray:
+    """
+    Convert counter values into rotor positions.
+    Returns an array of shape (n_rotors, *values.shape), rotors ordered from left to right.
+    """
+    values = np.asarray(values, dtype=np.int64) % (length**n_rotors)
+    positions: np.ndarray = np.empty((n_rotors,) + values.shape, dtype=np.int64)
+    for rotor_i in range(n_rotors - 1, -1, -1):
+        positions[rotor_i] = values % length
+        values = values // length
+    return positions
+
+
+def rotor_pass(
+    indices: np.ndarray, wiring: np.ndarray, positions: np.ndarray, length: int
+) -> np.ndarray:
+    """Vectorized Rotor.input(): same formula, applied to every character at once."""
+    return (
+        wiring[(indices - positions) % length].astype(np.int64) + positions
+    ) % length
+
+
+def encode_indices(
+    indices: np.ndarray,
+    positions: np.ndarray,
+    forward: List[np.ndarray],
+    backward: List[np.ndarray],
+    reflector: np.ndarray,
+    plugboard: np.ndarray,
+    length: int,
+) -> np.ndarray:
+    """
+    Core function. Encode symbol indices with rotors at given positions.
+    Args:
+        indices: Symbol indices (0-based), any shape.
+        positions: Rotor positions of shape (n_rotors, *indices.shape), left to right.
+        forward: Right-to-left wiring for each rotor, left to right (Rotor.arr[0]).
+        backward: Left-to-right wiring for each rotor, left to right (Rotor.arr[1]).
+        reflector: Reflector wiring as an index array.
+        plugboard: Plugboard as an index array; identity where no plug is connected.
+        length: Number of symbols on each rotor.
+    """
+    signal: np.ndarray = plugboard[indices]
+    # From right to left.
+    for rotor_i in range(len(forward) - 1, -1, -1):
+        signal = rotor_pass(signal, forward[rotor_i], positions[rotor_i], length)
+    # Reflector.
+    signal = reflector[signal]
+    # From left to right.
+    for rotor_i in range(len(backward)):
+        signal = rotor_pass(signal, backward[rotor_i], positions[rotor_i], length)
+    return plugboard[signal]
+
+
+def encode_batched(
+    indices: np.ndarray,
+    positions: np.ndarray,
+    forward: np.ndarray,
+    backward: np.ndarray,
+    reflector: np.ndarray,
+    plugboards: np.ndarray,
+    length: int,
+) -> np.ndarray:
+    """
+    Like encode_indices(), with a different set of rotors and plugs for each row.
+    Args:
+        indices: Symbol indices of shape (N, T).
+        positions: Rotor positions of shape (n_rotors, N, T), left to right.
+        forward: Right-to-left wirings of shape (N, n_rotors, length).
+        backward: Left-to-right wirings of shape (N, n_rotors, length).
+        reflector: Reflector wiring shared by all rows.
+        plugboards: Plugboards of shape (N, length).
+    """
+
+    def rotor_pass_batched(
+        signal: np.ndarray, wirings: np.ndarray, rotor_positions: np.ndarray
+    ) -> np.ndarray:
+        shifted: np.ndarray = (signal - rotor_positions) % length
+        return (
+            np.take_along_axis(wirings, shifted, axis=1).astype(np.int64)
+            + rotor_positions
+        ) % length
+
+    signal: np.ndarray = np.take_along_axis(plugboards, indices, axis=1)
+    # From right to left.
+    for rotor_i in range(forward.shape[1] - 1, -1, -1):
+        signal = rotor_pass_batched(signal, forward[:, rotor_i], positions[rotor_i])
+    # Reflector.
+    signal = reflector[signal]
+    # From left to right.
+    for rotor_i in range(backward.shape[1]):
+        signal = rotor_pass_batched(signal, backward[:, rotor_i], positions[rotor_i])
+    return np.take_along_axis(plugboards, signal, axis=1)
+
+
+def encode_from(
+    indices: np.ndarray,
+    start: int,
+    forward: List[np.ndarray],
+    backward: List[np.ndarray],
+    reflector: np.ndarray,
+    plugboard: np.ndarray,
+    length: int,
+) -> np.ndarray:
+    """
+    Encode a 1-D array of symbol indices, starting from counter value `start`.
+    Rotors step before each character, so the i-th character sees counter start + i + 1.
+    """
+    steps: np.ndarray = np.arange(1, indices.shape[0] + 1, dtype=np.int64) + start
+    positions: np.ndarray = odometer_positions(steps, length, len(forward))
+    return encode_indices(
+        indices, positions, forward, backward, reflector, plugboard, length
+    )
+
+
+def step_permutations(
+    start: int,
+    n_steps: int,
+    forward: List[np.ndarray],
+    backward: List[np.ndarray],
+    reflector: np.ndarray,
+    plugboard: np.ndarray,
+    length: int,
+) -> np.ndarray:
+    """
+    Substitutions applied to the first `n_steps` characters encoded from counter value `start`.
+    Row i maps every input index to its output at the i-th character.
+    """
+    steps: np.ndarray = np.arange(1, n_steps + 1, dtype=np.int64) + start
+    positions: np.ndarray = odometer_positions(steps[:, None], length, len(forward))
+    indices: np.ndarray = np.broadcast_to(
+        np.arange(length, dtype=np.int64), (n_steps, length)
+    )
+    return encode_indices(
+        indices, positions, forward, backward, reflector, plugboard, length
+    )
+
+
+def count_symbols(buffer: np.ndarray, base: int, length: int, fold_case: bool) -> int:
+    """Number of bytes of a uint8 array inside the alphabet, as in alphabet_indices()."""
+    return sum(
+        int(
+            np.count_nonzero(
+                alphabet_indices(buffer[i : i + BLOCK_SIZE], base, length, fold_case)[0]
+            )
+        )
+        for i in range(0, buffer.shape[0], BLOCK_SIZE)
+    )
+
+
+def encode_range(
+    src: Path,
+    dest: Path,
+    offset: int,
+    size: int,
+    start: int,
+    forward: List[np.ndarray],
+    backward: List[np.ndarray],
+    reflector: np.ndarray,
+    plugboard: np.ndarray,
+    length: int,
+    base: int,
+    fold_case: bool,
+):
+    """
+    Encode bytes offset .. offset + size - 1 of file `src` into the same range of `dest`, from
+    counter value `start`, with the passthrough rule of alphabet_indices(). Only this range of
+    each file is mapped, and it is encoded BLOCK_SIZE bytes at a time.
+    """
+    src_map: np.memmap = np.memmap(
+        src, dtype=np.uint8, mode="r", offset=offset, shape=(size,)
+    )
+    dest_map: np.memmap = np.memmap(
+        dest, dtype=np.uint8, mode="r+", offset=offset, shape=(size,)
+    )
+    for i in range(0, size, BLOCK_SIZE):
+        block: np.ndarray = np.array(src_map[i : i + BLOCK_SIZE])
+        in_alphabet, indices = alphabet_indices(block, base, length, fold_case)
+        block[in_alphabet] = (
+            encode_from(indices, start, forward, backward, reflector, plugboard, length)
+            + base
+        )
+        dest_map[i : i + BLOCK_SIZE] = block
+        start += indices.shape[0]
+    dest_map.flush()
+    del src_map, dest_map
+
+
+# Arguments of encode_range() shared by every task of a worker, set by _init_worker().
+_worker_args: Tuple[Any, ...] = None
+
+
+def _init_worker(*args: Any):
+    global _worker_args
+    _worker_args = args
+
+
+def _encode_range_task(offset: int, size: int, start: int):
+    """Worker for encode_mapped(). Tasks carry only their range and start counter."""
+    src, dest, *wiring = _worker_args
+    encode_range(src, dest, offset, size, start, *wiring)
+
+
+def encode_mapped(
+    src: Path,
+    dest: Path,
+    start: int,
+    forward: List[np.ndarray],
+    backward: List[np.ndarray],
+    reflector: np.ndarray,
+    plugboard: np.ndarray,
+    length: int,
+    base: int = 0,
+    fold_case: bool = False,
+    workers: int = None,
+    chunk_size: int = 1 << 20,
+) -> int:
+    """
+    Encode file `src` into `dest`, which must be at least as long and may be `src` itself, from
+    counter value `start`, with the passthrough rule of alphabet_indices().
+    The file is split into chunks encoded independently in a process pool. Workers receive the
+    paths and wiring once, then only the offset, size and start counter of each chunk; they map
+    their own chunk of both files, so no data is pickled and each process uses a few MiB.
+    Args:
+        workers: Number of processes. None means all cores.
+        chunk_size: Bytes per task.
+    Returns:
+        Number of symbols encoded, i.e. how many steps the rotors took.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    size: int = os.path.getsize(src)
+    offsets: List[int] = list(range(0, size, chunk_size))
+    sizes: List[int] = [min(chunk_size, size - offset) for offset in offsets]
+    # Passthrough bytes do not step the rotors, so each chunk starts after the symbols before it.
+    starts: List[int] = []
+    n_symbols: int = 0
+    for offset, chunk in zip(offsets, sizes):
+        starts.append(start + n_symbols)
+        chunk_map: np.memmap = np.memmap(
+            src, dtype=np.uint8, mode="r", offset=offset, shape=(chunk,)
+        )
+        n_symbols += count_symbols(chunk_map, base, length, fold_case)
+        del chunk_map
+
+    wiring: Tuple[Any, ...] = (
+        forward,
+        backward,
+        reflector,
+        plugboard,
+        length,
+        base,
+        fold_case,
+    )
+    if workers <= 1 or len(offsets) <= 1:
+        for task in zip(offsets, sizes, starts):
+            encode_range(src, dest, *task, *wiring)
+        return n_symbols
+
+    # Imported here: process pools are costly to import and most runs never need one.
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(offsets)),
+        initializer=_init_worker,
+        initargs=(str(src), str(dest)) + wiring,
+    ) as executor:
+        # Consumed for exceptions; workers write their output themselves.
+        list(executor.map(_encode_range_task, offsets, sizes, starts))
+    return n_symbols
+
+
+def encode_parallel(
+    indices: np.ndarray,
+    start: int,
+    forward: List[np.ndarray],
+    backward: List[np.ndarray],
+    reflector: np.ndarray,
+    plugboard: np.ndarray,
+    length: int,
+    workers: int = None,
+    chunk_size: int = 1 << 22,
+) -> np.ndarray:
+    """
+    Same as encode_from(), but the message is split into chunks that are encoded independently
+    in a process pool, see encode_mapped(). Each chunk starts from its own counter value, so no
+    state is shared. The indices are written to a temporary file once, and the output is read
+    back from the file the workers write into.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    n_chunks: int = -(-indices.shape[0] // chunk_size)
+    if workers <= 1 or n_chunks <= 1:
+        return encode_from(
+            indices, start, forward, backward, reflector, plugboard, length
+        )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        src: Path = Path(tmp_dir).joinpath("input")
+        dest: Path = Path(tmp_dir).joinpath("output")
+        np.asarray(indices, dtype=np.uint8).tofile(src)
+        with open(dest, "wb") as f:
+            f.truncate(indices.shape[0])
+        # Indices are all inside an alphabet starting at 0, so every byte is encoded.
+        encode_mapped(
+            src,
+            dest,
+            start,
+            forward,
+            backward,
+            reflector,
+            plugboard,
+            length,
+            workers=workers,
+            chunk_size=chunk_size,
+        )
+        return np.fromfile(dest, dtype=np.uint8)
@@ -0,0 +1,289 @@
+"""
+Optional instrumentation of Enigma: counters and cumulative timings.
+
+Nothing is measured until enable() is called, which swaps counting and timing wrappers onto the
+Enigma class; disable() puts the original methods back. While disabled, machines run exactly the
+original code, so there is no cost at all.
+
+Counters:
+    . chars: characters encoded, by any input method;
+    . rotor_steps: times each rotor moved, indexed from the rightmost (fastest) rotor;
+    . carries: times each rotor wrapped around and stepped its left neighbour, same indexing.
+Steps and carries are counted from Enigma.rotate_rotors() on the scalar path and derived from
+the odometer counter on vectorized paths, so both give the same figures. Paths that encode in
+worker processes (input_parallel, encode_file with workers) are counted by the calling process.
+Timings: calls and cumulative seconds of load_config, load_table, adjust_machine, input,
+input_vectorized, input_many and encode_message. load_config only runs on config cache misses;
+load_table runs for every machine built from a table, but only parses it on table cache misses.
+Message key cache hits and misses are in each machine's key_cache.stats().
+
+Stats are process-wide and not thread safe. Worker processes collect no stats of their own.
+
+Usage:
+    with instrumentation.profile(mode="trace", dest="trace.json") as stats:
+        Enigma().input("HELLOWORLD")
+    print(stats.snapshot())
+"""
+
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from enigma.components import engine
+from enigma.components.machine import Enigma
+
+TIMED: Tuple[str, ...] = (
+    "load_config",
+    "load_table",
+    "adjust_machine",
+    "input",
+    "input_vectorized",
+    "input_many",
+    "encode_message",
+)
+PROFILE_MODES: Tuple[str, ...] = ("stats", "cprofile", "trace")
+
+
+class Stats:
+    """Counters and timings collected while instrumentation is enabled."""
+
+    def __init__(self):
+        self.chars: int = 0
+        self.rotor_steps: List[int] = []
+        self.carries: List[int] = []
+        self.calls: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+        # Chrome trace events, only collected inside profile(mode="trace").
+        self.events: List[Dict[str, Any]] = None
+
+    def reset(self):
+        self.__init__()
+
+    def _grow(self, n_rotors: int):
+        for counter in (self.rotor_steps, self.carries):
+            counter.extend([0] * (n_rotors - len(counter)))
+
+    def step(self, positions: Tuple[int, ...]):
+        """Count one scalar step, given rotor positions after it, left to right."""
+        self._grow(len(positions))
+        for slot, position in enumerate(reversed(positions)):
+            self.rotor_steps[slot] += 1
+            if position != 0:  # Did not wrap around, so no carry.
+                break
+            self.carries[slot] += 1
+
+    def advance(self, start: int, n_steps: np.ndarray, length: int, n_rotors: int):
+        """
+        Count steps of the odometer from counter value `start`, once for each entry of
+        `n_steps`, as for independent messages starting at the same positions.
+        """
+        self._grow(n_rotors)
+        n_steps = np.asarray(n_steps, dtype=np.int64)
+        for slot in range(n_rotors):
+            # The rotor in this slot moves each time the counter crosses a multiple of L^slot.
+            for counter, unit in (
+                (self.rotor_steps, length**slot),
+                (self.carries, length ** (slot + 1)),
+            ):
+                counter[slot] += int(((start + n_steps) // unit - start // unit).sum())
+
+    def add_time(self, name: str, start: float, end: float):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.seconds[name] = self.seconds.get(name, 0.0) + end - start
+        if self.events is not None:
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of every counter and timing, as plain data."""
+        return {
+            "enabled": is_enabled(),
+            "chars": self.chars,
+            "rotor_steps": list(self.rotor_steps),
+            "carries": list(self.carries),
+            "timings": {
+                name: {"calls": self.calls[name], "seconds": self.seconds[name]}
+                for name in self.calls
+            },
+        }
+
+
+STATS: Stats = Stats()
+# Original Enigma attributes, saved while instrumentation is enabled.
+_originals: Dict[str, Any] = {}
+
+
+def timed(name: str, func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start: float = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            STATS.add_time(name, start, time.perf_counter())
+
+    return wrapper
+
+
+def _wrappers() -> Dict[str, Any]:
+    """Instrumented replacements for Enigma attributes, built on the saved originals."""
+    rotate_rotors: Callable = _originals["rotate_rotors"]
+    encode_indices: Callable = _originals["encode_indices"]
+    input_many: Callable = _originals["input_many"]
+    message_permutations: Callable = _originals["message_permutations"]
+    scalar_input: Callable = _originals["input"]
+    encode_mapped: Callable = _originals["encode_mapped"]
+
+    def counted_rotate_rotors(self: Enigma):
+        rotate_rotors(self)
+        STATS.step(self.snapshot())
+
+    def counted_input(self: Enigma, input_str):
+        STATS.chars += len(input_str)
+        return scalar_input(self, input_str)
+
+    def counted_encode_indices(self: Enigma, indices: np.ndarray, *args, **kwargs):
+        start: int = engine.odometer_value(self.snapshot(), self.length)
+        output: np.ndarray = encode_indices(self, indices, *args, **kwargs)
+        STATS.chars += indices.shape[0]
+        STATS.advance(start, [indices.shape[0]], self.length, len(self.rotors))
+        return output
+
+    def counted_encode_mapped(self: Enigma, *args, **kwargs) -> int:
+        start: int = engine.odometer_value(self.snapshot(), self.length)
+        n_symbols: int = encode_mapped(self, *args, **kwargs)
+        STATS.chars += n_symbols
+        STATS.advance(start, [n_symbols], self.length, len(self.rotors))
+        return n_symbols
+
+    def counted_input_many(self: Enigma, messages):
+        lengths: List[int] = [len(message) for message in messages]
+        STATS.chars += sum(lengths)
+        STATS.advance(
+            engine.odometer_value(self.snapshot(), self.length),
+            lengths,
+            self.length,
+            len(self.rotors),
+        )
+        return input_many(self, messages)
+
+    def counted_message_permutations(self: Enigma, n_steps: int):
+        STATS.chars += n_steps
+        STATS.advance(
+            engine.odometer_value(self.snapshot(), self.length),
+            [n_steps],
+            self.length,
+            len(self.rotors),
+        )
+        return message_permutations(self, n_steps)
+
+    wrappers: Dict[str, Any] = {
+        "rotate_rotors": counted_rotate_rotors,
+        "encode_indices": counted_encode_indices,
+        "encode_mapped": counted_encode_mapped,
+        "input": counted_input,
+        "input_many": counted_input_many,
+        "message_permutations": counted_message_permutations,
+    }
+    for name in TIMED:
+        original: Any = wrappers.get(name, _originals[name])
+        if isinstance(original, staticmethod):
+            wrappers[name] = staticmethod(timed(name, original.__func__))
+        else:
+            wrappers[name] = timed(name, original)
+    return wrappers
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def enable():
+    """Start collecting stats in this process. Does nothing if already enabled."""
+    if is_enabled():
+        return
+    names: Tuple[str, ...] = TIMED + (
+        "rotate_rotors",
+        "encode_indices",
+        "encode_mapped",
+        "message_permutations",
+    )
+    _originals.update({name: Enigma.__dict__[name] for name in names})
+    for name, wrapper in _wrappers().items():
+        setattr(Enigma, name, wrapper)
+
+
+def disable():
+    """Put the original Enigma methods back. Collected stats are kept."""
+    for name, original in _originals.items():
+        setattr(Enigma, name, original)
+    _originals.clear()
+
+
+def stats() -> Dict[str, Any]:
+    """Snapshot of the process-wide stats."""
+    return STATS.snapshot()
+
+
+def reset():
+    """Zero every counter and timing."""
+    STATS.reset()
+
+
+@contextlib.contextmanager
+def profile(mode: str = "stats", dest: Path = None) -> Iterator[Stats]:
+    """
+    Collect stats over a block of code.
+    Args:
+        mode: "stats" only collects counters and timings;
+            "cprofile" also runs cProfile, saving pstats data to `dest`, or printing the top
+            functions to stderr if `dest` is None;
+            "trace" also records every timed call, saved to `dest` as Chrome trace JSON
+            (open in chrome://tracing or Perfetto).
+    """
+    assert (
+        mode in PROFILE_MODES
+    ), f"Unknown mode {mode!r}, expected one of {PROFILE_MODES}."
+    assert mode != "trace" or dest is not None, "Trace mode needs a destination file."
+    was_enabled: bool = is_enabled()
+    enable()
+    profiler: cProfile.Profile = cProfile.Profile() if mode == "cprofile" else None
+    if mode == "trace":
+        STATS.events = []
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield STATS
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            if dest is None:
+                pstats.Stats(profiler, stream=sys.stderr).sort_stats(
+                    "cumulative"
+                ).print_stats(25)
+            else:
+                profiler.dump_stats(str(dest))
+        if mode == "trace":
+            with open(dest, "w") as f:
+                json.dump({"traceEvents": STATS.events}, f)
+            STATS.events = None
+        if not was_enabled:
+            disable()
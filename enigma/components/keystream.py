@@ -0,0 +1,139 @@
+"""
+Full-period keystream tables.
+With n rotors of length L the machine repeats after L**n steps, so a fixed set of wirings and
+plugs is fully described by one (L**n, L) table: the substitution applied at every counter value.
+Tables are compiled once and cached in a user cache directory as .npy files that are
+memory-mapped on load.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from enigma.components import engine
+
+
+def compile_table(
+    forward: List[np.ndarray],
+    backward: List[np.ndarray],
+    reflector: np.ndarray,
+    plugboard: np.ndarray,
+    length: int,
+) -> np.ndarray:
+    """Compute the substitution for every counter value. Row i holds the output for each input."""
+    # Counter value i is (slow positions, fast position) = divmod(i, L). Everything left of the
+    # fast rotor is composed once per slow position, then the fast rotor and plugs are applied
+    # around it for every fast position.
+    n_slow: int = len(forward) - 1
+    slow_positions: np.ndarray = engine.odometer_positions(
+        np.arange(length**n_slow, dtype=np.int64)[:, None], length, n_slow
+    )
+    inner: np.ndarray = engine.encode_indices(
+        np.broadcast_to(np.arange(length, dtype=np.int64), (length**n_slow, length)),
+        slow_positions,
+        forward[:-1],
+        backward[:-1],
+        reflector,
+        np.arange(length),
+        length,
+    )
+
+    # Fast rotor at every position: row f maps an index as Rotor.input() does at position f.
+    fast: np.ndarray = np.arange(length)[:, None]
+    symbols: np.ndarray = np.arange(length)[None, :]
+    fast_forward: np.ndarray = engine.rotor_pass(symbols, forward[-1], fast, length)
+    fast_backward: np.ndarray = engine.rotor_pass(symbols, backward[-1], fast, length)
+
+    entry: np.ndarray = fast_forward[:, plugboard]
+    table: np.ndarray = np.empty((length**n_slow, length, length), dtype=np.uint8)
+    # A block of slow positions at a time bounds temporary memory on large alphabets.
+    block: int = max(1, (1 << 22) // (length * length))
+    for first in range(0, length**n_slow, block):
+        signal: np.ndarray = inner[first : first + block][:, entry]
+        table[first : first + block] = plugboard[fast_backward[fast, signal]]
+    return table.reshape(-1, length)
+
+
+def table_key(
+    forward: List[np.ndarray],
+    reflector: np.ndarray,
+    plugboard: np.ndarray,
+    length: int,
+) -> str:
+    """
+    Hash of everything that determines a table. Rows are indexed by absolute counter value,
+    so ring settings only pick the starting row and are not part of the key.
+    """
+    digest = hashlib.sha256()
+    digest.update(np.int64(length).tobytes())
+    for wiring in forward:
+        digest.update(np.asarray(wiring, dtype=np.uint8).tobytes())
+    digest.update(np.asarray(reflector, dtype=np.uint8).tobytes())
+    digest.update(np.asarray(plugboard, dtype=np.uint8).tobytes())
+    return digest.hexdigest()[:32]
+
+
+def default_cache_dir() -> Path:
+    """$XDG_CACHE_HOME/enigma/keystreams, or ~/.cache/enigma/keystreams if it is not set."""
+    cache_home: str = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(cache_home).joinpath("enigma", "keystreams")
+
+
+class KeystreamTable:
+    """A compiled keystream table, memory-mapped from the on-disk cache."""
+
+    def __init__(
+        self,
+        forward: List[np.ndarray],
+        backward: List[np.ndarray],
+        reflector: np.ndarray,
+        plugboard: np.ndarray,
+        length: int,
+        cache_dir: Path = None,
+    ):
+        """
+        Load the table from cache, compiling and saving it first if needed. If the cache
+        directory cannot be written, the compiled table is kept in memory instead.
+        Args:
+            cache_dir: Where tables are kept. None means default_cache_dir().
+        """
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        cache_dir = Path(cache_dir)
+
+        self.length: int = length
+        self.period: int = length ** len(forward)
+        self.path: Path = cache_dir.joinpath(
+            f"{table_key(forward, reflector, plugboard, length)}.npy"
+        )
+
+        if self.path.is_file():
+            self.table: np.ndarray = np.load(self.path, mmap_mode="r")
+        else:
+            self.table = compile_table(forward, backward, reflector, plugboard, length)
+            # Write to a temporary file first so concurrent readers never see a partial table.
+            tmp_path: Path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            try:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    np.save(f, self.table)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+        assert self.table.shape == (
+            self.period,
+            length,
+        ), f"Cached table at {self.path} has unexpected shape {self.table.shape}."
+
+    def encode_from(self, indices: np.ndarray, start: int) -> np.ndarray:
+        """Encode symbol indices starting from counter value `start`. One lookup per character."""
+        steps: np.ndarray = (
+            np.arange(1, indices.shape[0] + 1, dtype=np.int64) + start
+        ) % self.period
+        return self.table.reshape(-1)[steps * self.length + indices]
@@ -1,14 +1,33 @@
 """Machine main emulation module."""
 
-from typing import Any, Dict, List, Tuple
+import copy
+import csv
+import os
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    TextIO,
+    Tuple,
+    Union,
+)
 from pathlib import Path
 
-import pandas as pd
 import numpy as np
 
-from enigma.components.rotors import Rotor, Reflector
+from enigma.components import engine
+from enigma.components.cache import CONFIG_CACHE, TABLE_CACHE, PermutationCache
+from enigma.components.keystream import KeystreamTable
+from enigma.components.rotors import Rotor, Reflector, parse_literal
+from enigma.utils import binary_format
 from enigma.utils.constants import ROTOR_NAMES
 
+IDENTITY: bytes = bytes(range(256))
+
 
 class Enigma:
     """Enigma M3 emulator."""
@@ -19,10 +38,15 @@ class Enigma:
         table_path: Path = None,
         date: int = 1,
         print_cfg: bool = False,
+        entry: Dict[str, Any] = None,
     ):
         """
         Load configuration file and table.
         NOTE: argument date is 1-based.
+        Args:
+            entry: Table entry ("rotors", "rings", "plugs" and "indicators", as returned by
+                self.load_tables()) to use instead of the table's entry for `date`, e.g. a
+                candidate setting found by enigma.analysis. No table is loaded then.
         """
         if config_path is None:
             config_path = Path(__file__).parent.parent.joinpath(
@@ -36,11 +60,27 @@ class Enigma:
         self.rotors: List[Rotor]  # Rotors in use.
         self.all_rotors: List[Rotor]
         self.reflector: Reflector
-        self.all_rotors, self.reflector = self.load_config(config_path)
-        self.table: Dict[str, Any] = self.load_table(table_path)
+        cached_rotors: List[Rotor]
+        cached_rotors, self.reflector = CONFIG_CACHE.get(config_path, self.load_config)
+        # Rotors hold their own positions, so every machine gets its own copies.
+        self.all_rotors = [copy.copy(rotor) for rotor in cached_rotors]
+        # Alphabet: symbol codes base .. base + length - 1, e.g. 65 .. 90 for A-Z.
+        self.base: int = self.reflector.base
+        self.length: int = self.reflector.arr.shape[0]
+        for rotor in self.all_rotors:
+            assert (
+                rotor.base == self.base and rotor.length == self.length
+            ), "Rotors and reflector must share one alphabet."
+        self.table: Dict[str, Any] = (
+            self.load_table(table_path) if entry is None else entry
+        )
         self.plugs: Dict[
             int, int
         ] = None  # Will be configured in self.adjust_machine().
+        self.keystream: KeystreamTable = None  # Set by self.compile_keystream().
+        self.initial_positions: Tuple[int, ...] = None  # Rotor positions of the day.
+        # Substitutions from message key positions, see self.message_permutations().
+        self.key_cache: PermutationCache = PermutationCache()
 
         # Apply table settings to machine. Reduces number of rotors.
         self.adjust_machine()
@@ -56,7 +96,8 @@ class Enigma:
             self.rotors.append(self.all_rotors[rotor_index])
         # Rotate rotors to requested positions.
         for rotor, position in zip(self.rotors, self.table["rings"]):
-            rotor.tune(position - 65)
+            rotor.tune(position - self.base)
+        self.initial_positions = self.snapshot()
         # Add plugs.
         assert self.plugs is None
         self.plugs = {}
@@ -65,16 +106,19 @@ class Enigma:
             self.plugs[p1] = p2
             self.plugs[p2] = p1
 
-    def load_config(self, config_path: Path) -> Tuple[List[Rotor], Reflector]:
+    @staticmethod
+    def load_config(config_path: Path) -> Tuple[List[Rotor], Reflector]:
         config_path = Path(config_path)
         assert config_path.is_file(), f"Config at {config_path} not found."
-        config_df: pd.DataFrame = pd.read_csv(config_path)
+        if binary_format.read_magic(config_path) == binary_format.CONFIG_MAGIC:
+            return binary_format.read_config(config_path)
+        with open(config_path, newline="") as f:
+            components: List[Dict[str, str]] = list(csv.DictReader(f))
 
         rotors: List[Rotor] = []
         reflector: Reflector = None
 
-        for row_i in range(config_df.shape[0]):
-            component: Dict[str, Any] = config_df.iloc[row_i]
+        for component in components:
             if component["type"] == "rotor":
                 rotor: Rotor = Rotor(component["wiring"])
                 rotors.append(rotor)
@@ -91,17 +135,35 @@ class Enigma:
         return rotors, reflector
 
     def load_table(self, table_path: Path) -> Dict[str, Any]:
+        tables: Mapping[int, Dict[str, Any]] = TABLE_CACHE.get(
+            table_path, self.load_tables
+        )
+        assert self.date in tables, f"Date {self.date} not found in {table_path}."
+        return tables[self.date]
+
+    @staticmethod
+    def load_tables(table_path: Path) -> Mapping[int, Dict[str, Any]]:
+        """
+        Load every entry of a table, keyed by 1-based date.
+        Binary tables are memory-mapped and only decode the dates that are accessed.
+        """
         table_path = Path(table_path)
         assert table_path.is_file(), f"Table at {table_path} not found."
-        table: Dict[str, Any] = {}
-
-        table_df: pd.DataFrame = pd.read_csv(table_path)
-        date: int = table_df.shape[0] - self.date
-        table["rotors"] = eval(table_df.iloc[date]["rotors"])
-        table["rings"] = eval(table_df.iloc[date]["rings"])
-        table["plugs"] = eval(table_df.iloc[date]["plugs"])
-        table["indicators"] = eval(table_df.iloc[date]["indicators"])
-        return table
+        if binary_format.read_magic(table_path) == binary_format.TABLE_MAGIC:
+            return binary_format.TableFile(table_path)
+        tables: Dict[int, Dict[str, Any]] = {}
+
+        with open(table_path, newline="") as f:
+            rows: List[Dict[str, str]] = list(csv.DictReader(f))
+        for row_i, row in enumerate(rows):
+            table: Dict[str, Any] = {}
+            table["rotors"] = parse_literal(row["rotors"])
+            table["rings"] = parse_literal(row["rings"])
+            table["plugs"] = parse_literal(row["plugs"])
+            table["indicators"] = parse_literal(row["indicators"])
+            # Rows are stored from the last date to the first.
+            tables[len(rows) - row_i] = table
+        return tables
 
     def print_cfg(self):
         """Print configs."""
@@ -115,7 +177,7 @@ class Enigma:
 
         align_desc: str = "ROTOR INITIAL POSITIONS"
         align_msg: str = " ".join(
-            ["{:02d}".format(r + 1 - 65) for r in self.table["rings"]]
+            ["{:02d}".format(r + 1 - self.base) for r in self.table["rings"]]
         )
 
         plug_desc: str = "PLUGS"
@@ -173,49 +235,532 @@ class Enigma:
 
     def rotate_rotors(self):
         # Rotate all rotors in use. From right to left.
-        carry: bool = True
-        for rotor in self.rotors[::-1]:
-            if carry:
-                carry = rotor.rotate()
-            else:
+        for rotor in reversed(self.rotors):
+            if not rotor.rotate():
                 break
 
-    def input(self, input_str: str) -> str:
-        output_str: str = ""
-        input_str = input_str.upper()
-        assert input_str.isalpha(), f"Only alpha strings accepted. Got {input_str}."
-        for input_char in input_str:
+    def inner_table(self) -> bytes:
+        """
+        Substitution through every rotor left of the rightmost one, the reflector and back, at
+        current positions, as a translation table over 0-based indices.
+        """
+        table: bytes = IDENTITY
+        for rotor in self.rotors[-2::-1]:
+            table = table.translate(rotor.row(reverse=False))
+        table = table.translate(self.reflector.table)
+        for rotor in self.rotors[:-1]:
+            table = table.translate(rotor.row(reverse=True))
+        return table
+
+    def reset(self):
+        """Return rotors to the day's initial positions."""
+        self.restore(self.initial_positions)
+
+    def clone(self) -> "Enigma":
+        """Copy this machine, including rotor positions, without reloading any file."""
+        machine: Enigma = copy.copy(self)
+        machine.all_rotors = [copy.copy(rotor) for rotor in self.all_rotors]
+        machine.rotors = [machine.all_rotors[i] for i in self.table["rotors"]]
+        machine.plugs = dict(self.plugs)
+        return machine
+
+    def snapshot(self) -> Tuple[int, ...]:
+        """Current positions of rotors in use, from left to right."""
+        return tuple(rotor.current for rotor in self.rotors)
+
+    def restore(self, state: Tuple[int, ...]):
+        """Put rotors back to positions returned by self.snapshot()."""
+        assert len(state) == len(
+            self.rotors
+        ), f"Snapshot has {len(state)} positions but {len(self.rotors)} rotors are in use."
+        for rotor, position in zip(self.rotors, state):
+            assert 0 <= position < rotor.length, f"Invalid rotor position: {position}."
+            rotor.current = int(position)
+
+    def seek(self, offset: int):
+        """
+        Set rotors to where they are after `offset` characters have been processed from the
+        day's initial positions. Computed directly from the odometer counter, without stepping.
+        """
+        length: int = self.rotors[0].length
+        start: int = engine.odometer_value(self.initial_positions, length)
+        positions: np.ndarray = engine.odometer_positions(
+            start + offset, length, len(self.rotors)
+        )
+        self.restore(tuple(int(position) for position in positions))
+
+    @property
+    def alpha_only(self) -> bool:
+        """Whether this machine uses the classic A-Z alphabet."""
+        return self.base == 65 and self.length == 26
+
+    def input(
+        self, input_str: Union[str, bytes, bytearray, memoryview]
+    ) -> Union[str, bytes]:
+        """
+        Encode a message one character at a time. This is the reference implementation.
+        Strings give strings; bytes-like input gives bytes.
+        """
+        output_codes: List[int] = []
+        if isinstance(input_str, str):
+            if self.alpha_only:
+                input_str = input_str.upper()
+                assert (
+                    input_str.isalpha()
+                ), f"Only alpha strings accepted. Got {input_str}."
+            input_codes: Iterable[int] = map(ord, input_str)
+        else:
+            input_codes = memoryview(input_str).cast("B")
+
+        # Plugboard over 0-based indices.
+        plugs: bytes = self.plugboard_array().astype(np.uint8).tobytes()
+        # Only the rightmost rotor moves between carries, so everything to its left and the
+        # reflector are composed into one table, rebuilt when a carry moves another rotor.
+        fast_rotor: Rotor = self.rotors[-1]
+        forward: bytes = fast_rotor.forward
+        backward: bytes = fast_rotor.backward
+        inner: bytes = None
+
+        for input_code in input_codes:
             # Rotate rotors for each character.
             self.rotate_rotors()
+            if inner is None or fast_rotor.current == 0:
+                inner = self.inner_table()
+
+            input_index: int = input_code - self.base
+            assert (
+                0 <= input_index < self.length
+            ), f"Symbol {input_code} is outside the machine alphabet."
+
+            # Plugs, rightmost rotor, the rest and back, rightmost rotor again, plugs.
+            offset: int = fast_rotor.current << 8
+            output_index: int = plugs[
+                backward[offset | inner[forward[offset | plugs[input_index]]]]
+            ]
+            output_codes.append(output_index + self.base)
+
+        if isinstance(input_str, str):
+            return "".join(map(chr, output_codes))
+        return bytes(output_codes)
+
+    def to_indices(
+        self, input_str: Union[str, bytes, bytearray, memoryview]
+    ) -> np.ndarray:
+        """
+        Validate a message and convert it to 0-based uint8 symbol indices.
+        Bytes-like input is viewed without copying on alphabets starting at code 0.
+        """
+        return engine.to_indices(input_str, self.base, self.length)
+
+    def from_indices(
+        self, indices: np.ndarray, like: Union[str, bytes, bytearray, memoryview]
+    ) -> Union[str, bytes]:
+        """Convert 0-based symbol indices back to a string or bytes, matching `like`."""
+        return engine.from_indices(indices, self.base, like)
+
+    def plugboard_array(self) -> np.ndarray:
+        """Plugboard as an index array; unplugged characters map to themselves."""
+        return engine.plugboard_array(self.plugs, self.base, self.length)
+
+    def compile_keystream(self, cache_dir: Path = None) -> KeystreamTable:
+        """
+        Compile (or load from disk cache) the full-period keystream table for today's rotors and
+        plugs. Once compiled, self.input_vectorized() encodes with one table lookup per character.
+        """
+        self.keystream = KeystreamTable(
+            [rotor.arr[0] for rotor in self.rotors],
+            [rotor.arr[1] for rotor in self.rotors],
+            self.reflector.arr,
+            self.plugboard_array(),
+            self.length,
+            cache_dir=cache_dir,
+        )
+        return self.keystream
+
+    def encode_indices(
+        self, indices: np.ndarray, workers: int = 1, chunk_size: int = 1 << 22
+    ) -> np.ndarray:
+        """
+        Encode a 1-D array of 0-based symbol indices from the current rotor positions,
+        then advance rotors past the encoded characters.
+        Args:
+            workers: Number of processes to shard the message across. None means all cores.
+            chunk_size: Characters per shard when running in parallel.
+        """
+        length: int = self.length
+        start: int = engine.odometer_value(
+            [rotor.current for rotor in self.rotors], length
+        )
+        args: Tuple[Any, ...] = (
+            indices,
+            start,
+            [rotor.arr[0] for rotor in self.rotors],
+            [rotor.arr[1] for rotor in self.rotors],
+            self.reflector.arr,
+            self.plugboard_array(),
+            length,
+        )
+        if workers != 1:
+            output_arr: np.ndarray = engine.encode_parallel(
+                *args, workers=workers, chunk_size=chunk_size
+            )
+        elif self.keystream is not None:
+            output_arr = self.keystream.encode_from(indices, start)
+        else:
+            output_arr = engine.encode_from(*args)
+
+        # Leave rotors where the scalar path would have.
+        final_positions: np.ndarray = engine.odometer_positions(
+            start + indices.shape[0], length, len(self.rotors)
+        )
+        self.restore(tuple(int(position) for position in final_positions))
+        return output_arr
+
+    def input_vectorized(
+        self, input_str: Union[str, bytes, bytearray, memoryview]
+    ) -> Union[str, bytes]:
+        """
+        Vectorized equivalent of self.input().
+        Rotor positions for every character are computed up front, then the whole message goes
+        through plugs, rotors and reflector as array gathers (or a single lookup per character
+        if a keystream table is compiled). Output and final rotor positions are identical to the
+        scalar path.
+        """
+        output_arr: np.ndarray = self.encode_indices(self.to_indices(input_str))
+        return self.from_indices(output_arr, input_str)
+
+    def input_many(
+        self, messages: List[Union[str, bytes, bytearray, memoryview]]
+    ) -> List[Union[str, bytes]]:
+        """
+        Encode many independent messages, each from the current rotor positions, in one
+        vectorized call. Rotor positions are left unchanged.
+        The substitutions for the first max(len) steps are computed once, then every character of
+        every message is a single lookup by (position in its message, symbol).
+        """
+        if not messages:
+            return []
+        lengths: np.ndarray = np.array([len(m) for m in messages], dtype=np.int64)
+        joined: Union[str, bytes] = (
+            "".join(messages)
+            if isinstance(messages[0], str)
+            else b"".join(bytes(m) for m in messages)
+        )
+        if not joined:
+            # A-Z machines reject an empty string.
+            return [joined] * len(messages)
+        indices: np.ndarray = self.to_indices(joined)
+
+        start: int = engine.odometer_value(self.snapshot(), self.length)
+        n_steps: int = int(lengths.max())
+        if self.keystream is not None:
+            steps: np.ndarray = (
+                np.arange(1, n_steps + 1, dtype=np.int64) + start
+            ) % self.keystream.period
+            permutations: np.ndarray = self.keystream.table[steps]
+        else:
+            permutations = engine.step_permutations(
+                start,
+                n_steps,
+                [rotor.arr[0] for rotor in self.rotors],
+                [rotor.arr[1] for rotor in self.rotors],
+                self.reflector.arr,
+                self.plugboard_array(),
+                self.length,
+            )
 
-            # Before rerouting via plugs.
-            mapped_char: int = ord(input_char)
-            # After.
-            if self.plugs and mapped_char in self.plugs:
-                mapped_char = self.plugs[mapped_char]
+        # Position of every character within its own message.
+        offsets: np.ndarray = np.cumsum(lengths) - lengths
+        steps_in_message: np.ndarray = np.arange(
+            indices.shape[0], dtype=np.int64
+        ) - np.repeat(offsets, lengths)
+        output: Union[str, bytes] = self.from_indices(
+            permutations[steps_in_message, indices], joined
+        )
+        return [output[o : o + n] for o, n in zip(offsets.tolist(), lengths.tolist())]
 
-            # From right to left.
-            input_index: int = mapped_char - 65
+    def message_keys(self) -> Union[List[str], List[bytes]]:
+        """
+        The day's indicator groups, as message keys in the machine alphabet: strings on A-Z
+        machines and bytes on others, as self.input() returns for their text.
+        """
+        keys: List[bytes] = [bytes(group) for group in self.table["indicators"]]
+        if self.alpha_only:
+            # Indicators on A-Z tables are written in lowercase.
+            return [key.decode("ascii").upper() for key in keys]
+        return keys
+
+    def seat(self, key: Union[str, bytes, bytearray, memoryview]):
+        """Turn the rotors to a message key, one symbol per rotor from left to right."""
+        positions: np.ndarray = self.to_indices(key)
+        assert positions.shape[0] == len(
+            self.rotors
+        ), f"Message key needs {len(self.rotors)} symbols, got {positions.shape[0]}."
+        self.restore(tuple(positions.tolist()))
+
+    def message_permutations(self, n_steps: int) -> np.ndarray:
+        """
+        Substitutions for the next `n_steps` characters from the current rotor positions, shape
+        (n_steps, L), through self.key_cache. Rotors are left where they are.
+        """
 
-            for rotor in self.rotors[::-1]:
-                input_index = rotor.input(input_index, reverse=False)
+        def compute(start: int, n: int) -> np.ndarray:
+            return engine.step_permutations(
+                start,
+                n,
+                [rotor.arr[0] for rotor in self.rotors],
+                [rotor.arr[1] for rotor in self.rotors],
+                self.reflector.arr,
+                self.plugboard_array(),
+                self.length,
+            ).astype(np.uint8)
+
+        start: int = engine.odometer_value(self.snapshot(), self.length)
+        return self.key_cache.get(start, n_steps, compute)
+
+    def encode_message(
+        self,
+        message: Union[str, bytes, bytearray, memoryview],
+        key: Union[str, bytes, bytearray, memoryview],
+    ) -> Union[str, bytes]:
+        """
+        Encode a message body with the rotors seated at its message key. The substitutions from
+        a key are cached, unless a keystream table is compiled or the message is too long to
+        cache. Rotors are left after the last character, as with self.input().
+        """
+        self.seat(key)
+        indices: np.ndarray = self.to_indices(message)
+        n_steps: int = indices.shape[0]
+        if self.keystream is not None or n_steps > self.key_cache.max_steps:
+            return self.from_indices(self.encode_indices(indices), message)
+
+        start: int = engine.odometer_value(self.snapshot(), self.length)
+        output_arr: np.ndarray = self.message_permutations(n_steps)[
+            np.arange(n_steps), indices
+        ]
+        final_positions: np.ndarray = engine.odometer_positions(
+            start + n_steps, self.length, len(self.rotors)
+        )
+        self.restore(tuple(int(position) for position in final_positions))
+        return self.from_indices(output_arr, message)
 
-            # Reflector.
-            reflected_index: int = self.reflector.input(input_index)
+    def encipher_message(
+        self,
+        message: Union[str, bytes, bytearray, memoryview],
+        key: Union[str, bytes, bytearray, memoryview],
+        doubled: bool = False,
+    ) -> Tuple[Union[str, bytes], Union[str, bytes]]:
+        """
+        Message key procedure, sending side: encipher the key at the day's ground setting (the
+        table's initial positions), then the body from the key.
+        Args:
+            key: Message key, one symbol per rotor, e.g. from self.message_keys().
+            doubled: Encipher the key twice, as was done before May 1940.
+        Returns:
+            The enciphered key (the indicator) and body, both strings or both bytes as message.
+        """
+        self.reset()
+        key_indices: np.ndarray = self.to_indices(key)
+        if doubled:
+            key_indices = np.tile(key_indices, 2)
+        indicator: Union[str, bytes] = self.from_indices(
+            self.encode_indices(key_indices), message
+        )
+        return indicator, self.encode_message(message, key)
 
-            # From left to right.
-            output_index: int = reflected_index
-            for rotor in self.rotors:
-                output_index = rotor.input(output_index, reverse=True)
+    def decipher_message(
+        self,
+        indicator: Union[str, bytes, bytearray, memoryview],
+        body: Union[str, bytes, bytearray, memoryview],
+        doubled: bool = False,
+    ) -> Tuple[Union[str, bytes], Union[str, bytes]]:
+        """
+        Message key procedure, receiving side: decipher the indicator at the day's ground
+        setting to get the message key, then the body from the key.
+        Returns:
+            The message key and the deciphered body.
+        """
+        n_rotors: int = len(self.rotors)
+        assert len(indicator) == n_rotors * (
+            2 if doubled else 1
+        ), f"Indicator of {len(indicator)} symbols does not fit {n_rotors} rotors."
+        self.reset()
+        decoded: Union[str, bytes] = self.input(indicator)
+        key: Union[str, bytes] = decoded[:n_rotors]
+        assert (
+            not doubled or decoded[n_rotors:] == key
+        ), f"Doubled key does not repeat: {decoded!r}."
+        return key, self.encode_message(body, key)
+
+    def input_parallel(
+        self,
+        input_str: Union[str, bytes, bytearray, memoryview],
+        workers: int = None,
+        chunk_size: int = 1 << 22,
+    ) -> Union[str, bytes]:
+        """
+        Same as self.input(), with the message sharded across a process pool.
+        Each shard starts from its own rotor positions, computed in closed form. Workers read and
+        write their shards through memory-mapped temporary files, see engine.encode_parallel().
+        Args:
+            workers: Number of processes. None means all cores.
+            chunk_size: Characters per shard.
+        """
+        output_arr: np.ndarray = self.encode_indices(
+            self.to_indices(input_str), workers=workers, chunk_size=chunk_size
+        )
+        return self.from_indices(output_arr, input_str)
 
-            # Convert to character.
-            output_index += 65
-            output_char: str = chr(output_index)
-            if self.plugs and output_index in self.plugs:
-                output_char = chr(self.plugs[output_index])
-            output_str += output_char
+    def encode_buffer(
+        self,
+        buffer: np.ndarray,
+        out: np.ndarray = None,
+        block_size: int = engine.BLOCK_SIZE,
+    ) -> np.ndarray:
+        """
+        Encode a uint8 array of bytes.
+        Passthrough rule: bytes inside the machine alphabet are encoded (for A-Z machines,
+        lowercase letters are uppercased first); every other byte is copied through unchanged and
+        does not step the rotors. A 256-symbol machine encodes every byte.
+        Bytes are encoded `block_size` at a time. Temporaries take about 60 bytes per byte of a
+        block, so about 4 MiB with the default, besides the output array when `out` is None.
+        Args:
+            out: Array to write results into, may be `buffer` itself. A new array if None.
+            block_size: Bytes encoded per vectorized call.
+        """
+        if out is None:
+            out = buffer.copy()
+        elif out is not buffer:
+            out[:] = buffer
+        for i in range(0, out.shape[0], block_size):
+            block: np.ndarray = out[i : i + block_size]
+            in_alphabet, indices = engine.alphabet_indices(
+                block, self.base, self.length, self.alpha_only
+            )
+            block[in_alphabet] = self.encode_indices(indices) + self.base
+        return out
 
-        return output_str
+    def encode_file(
+        self,
+        src: Path,
+        dest: Path = None,
+        chunk_size: int = 1 << 20,
+        workers: int = 1,
+    ):
+        """
+        Encode a file through memory maps, without creating any Python strings.
+        Same passthrough rule as self.encode_buffer(). Only one chunk of each file is mapped at a
+        time, so memory stays within two chunks plus the block temporaries of
+        self.encode_buffer(), about 6 MiB with the defaults, whatever the file size.
+        Args:
+            src: File to encode.
+            dest: Output file, created or truncated to the size of src. None, or src itself,
+                means in place.
+            chunk_size: Bytes mapped at a time, or per task when running in parallel.
+            workers: Number of processes to shard the file across, each mapping its own
+                chunks. None means all cores.
+        """
+        src = Path(src)
+        assert src.is_file(), f"File at {src} not found."
+        size: int = src.stat().st_size
+        # Opening src itself for writing would truncate it before it is read.
+        if dest is not None and Path(dest).exists() and os.path.samefile(src, dest):
+            dest = None
+        if dest is not None:
+            with open(dest, "wb") as f:
+                f.truncate(size)
+
+        if workers != 1:
+            self.encode_mapped(
+                src,
+                src if dest is None else dest,
+                workers=workers,
+                chunk_size=chunk_size,
+            )
+            return
+
+        # Empty files cannot be mapped, and have no chunks.
+        for offset in range(0, size, chunk_size):
+            shape: Tuple[int] = (min(chunk_size, size - offset),)
+            if dest is None:
+                src_map: np.memmap = np.memmap(
+                    src, dtype=np.uint8, mode="r+", offset=offset, shape=shape
+                )
+                dest_map: np.memmap = src_map
+            else:
+                src_map = np.memmap(
+                    src, dtype=np.uint8, mode="r", offset=offset, shape=shape
+                )
+                dest_map = np.memmap(
+                    dest, dtype=np.uint8, mode="r+", offset=offset, shape=shape
+                )
+            self.encode_buffer(src_map, out=dest_map)
+            dest_map.flush()
+            del src_map, dest_map
+
+    def encode_mapped(
+        self, src: Path, dest: Path, workers: int = None, chunk_size: int = 1 << 20
+    ) -> int:
+        """
+        Parallel path of self.encode_file(): encode src into dest, an existing file of the same
+        size or src itself, across processes with engine.encode_mapped(). Rotors are left where
+        the sequential path would leave them.
+        Returns:
+            Number of symbols encoded.
+        """
+        start: int = engine.odometer_value(self.snapshot(), self.length)
+        n_symbols: int = engine.encode_mapped(
+            src,
+            dest,
+            start,
+            [rotor.arr[0] for rotor in self.rotors],
+            [rotor.arr[1] for rotor in self.rotors],
+            self.reflector.arr,
+            self.plugboard_array(),
+            self.length,
+            base=self.base,
+            fold_case=self.alpha_only,
+            workers=workers,
+            chunk_size=chunk_size,
+        )
+        final_positions: np.ndarray = engine.odometer_positions(
+            start + n_symbols, self.length, len(self.rotors)
+        )
+        self.restore(tuple(int(position) for position in final_positions))
+        return n_symbols
+
+    def stream(
+        self, chunks: Iterable[Union[str, bytes]]
+    ) -> Iterator[Union[str, bytes]]:
+        """
+        Encode an iterable of chunks, yielding one encoded chunk per input chunk.
+        Rotor positions carry across chunk boundaries, so the output is the same as encoding the
+        concatenated input at once. Non-letters pass through as in self.encode_buffer().
+        Machines whose alphabet goes beyond ASCII should be given bytes, not strings.
+        """
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                buffer: np.ndarray = np.frombuffer(
+                    chunk.encode("utf-8"), dtype=np.uint8
+                )
+                yield self.encode_buffer(buffer).tobytes().decode("utf-8")
+            else:
+                buffer = np.frombuffer(chunk, dtype=np.uint8)
+                yield self.encode_buffer(buffer).tobytes()
+
+    def stream_file(
+        self, file_obj: Union[BinaryIO, TextIO], chunk_size: int = 1 << 16
+    ) -> Iterator[Union[str, bytes]]:
+        """Read a text or binary file object in fixed-size chunks and yield encoded chunks."""
+
+        def read_chunks() -> Iterator[Union[str, bytes]]:
+            while True:
+                chunk: Union[str, bytes] = file_obj.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+        return self.stream(read_chunks())
 
 
 if __name__ == "__main__":
@@ -1,37 +1,83 @@
 """Rotor definitions."""
 
-from typing import Dict, List
+import ast
+import re
+from typing import Any, Dict, Tuple, Union
 
 import numpy as np
 
+# Older csv files hold numpy scalars written as e.g. "np.int64(72)".
+NUMPY_SCALAR: re.Pattern = re.compile(r"np\.\w+\(([^()]*)\)")
+
+
+def parse_literal(cell: str) -> Any:
+    """Safely parse a Python literal (int, list or dict) stored in a csv cell."""
+    return ast.literal_eval(NUMPY_SCALAR.sub(r"\1", cell))
+
+
+def parse_wiring(wiring: Union[str, Dict[int, int]]) -> Tuple[Dict[int, int], int]:
+    """
+    Parse a wiring dict of symbol codes (or its repr, as stored in csv) into 0-based indices.
+    The smallest code is the base of the alphabet, e.g. 65 for A-Z and 0 for ASCII or bytes.
+    """
+    raw_mapping: Dict[int, int] = (
+        parse_literal(wiring) if isinstance(wiring, str) else wiring
+    )
+    base: int = min(raw_mapping.keys())
+    mapping: Dict[int, int] = {k - base: v - base for k, v in raw_mapping.items()}
+    if sorted(mapping.keys()) != list(range(len(mapping))) or sorted(
+        mapping.values()
+    ) != list(range(len(mapping))):
+        raise ValueError("Wiring must be a permutation of a contiguous alphabet.")
+    if len(mapping) > 256:
+        raise NotImplementedError("Alphabets over 256 symbols are not supported.")
+    return mapping, base
+
+
+# Lookup tables hold one 256-byte row per rotor position, so a row doubles as a translation table
+# for bytes.translate() and the entry for (position, index) sits at (position << 8) | index.
+ROW: int = 256
+
+
+def position_tables(wiring: np.ndarray) -> bytes:
+    """
+    Rows of `wiring` as seen at every rotor position:
+    row c maps index x to (wiring[(x - c) % L] + c) % L. Entries past L are unused.
+    """
+    length: int = wiring.shape[0]
+    positions: np.ndarray = np.arange(length)[:, None]
+    tables: np.ndarray = np.zeros((length, ROW), dtype=np.uint8)
+    tables[:, :length] = (
+        wiring[(np.arange(length)[None, :] - positions) % length] + positions
+    ) % length
+    return tables.tobytes()
+
 
 class Rotor:
-    def __init__(self, wiring: str):
+    __slots__ = ("base", "length", "current", "arr", "forward", "backward")
+
+    def __init__(self, wiring: Union[str, Dict[int, int]]):
         # Mapping info.
-        mapping: Dict[int, int] = {k - 65: v - 65 for k, v in eval(wiring).items()}
-        if len(mapping) != 26:
-            raise NotImplementedError("Currently only support A-Z.")
+        mapping: Dict[int, int]
+        mapping, self.base = parse_wiring(wiring)
 
-        # Which character is at which location.
-        self.loc: Dict[int, int] = {}
         self.length: int = len(mapping)
         self.current: int = 0  # Controls whether to step the next rotor.
 
         # Index 0 to convert from right to left;
         # Index 1 to convert from left to right.
         self.arr: np.ndarray = np.zeros([2, len(mapping)], dtype=np.uint8)
+        for in_char, out_char in mapping.items():
+            self.arr[0][in_char] = out_char
+            self.arr[1][out_char] = in_char
 
-        sorted_keys: List[int] = sorted(mapping.keys())
-        assert sorted_keys[0] == 0
-
-        for i, in_char in enumerate(sorted_keys):
-            self.arr[0][i] = mapping[in_char]
-            self.arr[1][mapping[in_char]] = i
-
-            self.loc[in_char] = i
+        # Same wirings for every position, see position_tables().
+        self.forward: bytes = position_tables(self.arr[0])
+        self.backward: bytes = position_tables(self.arr[1])
 
     def tune(self, tunning_char: int):
-        self.current = self.loc[tunning_char]
+        assert 0 <= tunning_char < self.length, f"Invalid position: {tunning_char}."
+        self.current = tunning_char
 
     def rotate(self) -> bool:
         """
@@ -46,17 +92,29 @@ class Rotor:
 
     def input(self, input_index: int, reverse: bool) -> int:
         """Core function. Get output index."""
-        internal_index: int = self.arr[1 if reverse else 0][
-            ((26 - self.current) % 26 + input_index) % 26
+        return (self.backward if reverse else self.forward)[
+            (self.current << 8) | input_index
         ]
-        adjusted_index: int = abs(internal_index + self.current) % 26
-        return adjusted_index
+
+    def row(self, reverse: bool) -> bytes:
+        """Substitution at the current position, as a translation table for bytes.translate()."""
+        offset: int = self.current << 8
+        return (self.backward if reverse else self.forward)[offset : offset + ROW]
 
 
 class Reflector:
-    def __init__(self, wiring: str):
-        self.mapping: Dict[int, int] = {k - 65: v - 65 for k, v in eval(wiring).items()}
+    __slots__ = ("mapping", "base", "arr", "table")
+
+    def __init__(self, wiring: Union[str, Dict[int, int]]):
+        self.mapping: Dict[int, int]
+        self.mapping, self.base = parse_wiring(wiring)
+        # Same mapping as an index array, used by the vectorized engine.
+        self.arr: np.ndarray = np.array(
+            [self.mapping[i] for i in range(len(self.mapping))], dtype=np.uint8
+        )
+        # And as a translation table, used by the scalar path.
+        self.table: bytes = self.arr.tobytes().ljust(ROW, b"\0")
 
     def input(self, input_index: int) -> int:
         """Core function. Input index is the absolute position on the wheel-like structure."""
-        return self.mapping[input_index]
+        return self.table[input_index]
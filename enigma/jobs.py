@@ -0,0 +1,185 @@
+"""
+Batch encoding of many jobs read as JSON lines, spread over a pool of processes.
+Each input line is one job:
+    {"id": 7, "date": 3, "mode": "encrypt", "text": "HELLO WORLD"}
+    {"date": 3, "mode": "decrypt", "path": "msg.txt", "output": "msg.out"}
+    . date: 1-based date in table, defaults to 1;
+    . mode: "encrypt" or "decrypt". The machine is reciprocal, so both run the same operation;
+    . text: message to encode. Non-letters pass through as in Enigma.stream();
+    . path: file to encode through memory maps, into "output" or in place if not given.
+Every job starts from the date's initial rotor positions.
+
+Each output line holds the job's "id" (if given), "date", "mode" and either "text", "output" or
+"error". Lines are written in input order. Throughput and latency stats are printed at the end.
+
+Each worker keeps one machine per date it has seen, so configs and tables are loaded once per
+worker per date and every later job only resets the rotors.
+"""
+
+import json
+import os
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+import numpy as np
+
+from enigma.components.machine import Enigma
+
+MODES: Tuple[str, ...] = ("encrypt", "decrypt")
+
+# Per process state, set by init_worker().
+_config_path: Path = None
+_table_path: Path = None
+_machines: Dict[int, Enigma] = {}
+
+
+def init_worker(config_path: Path, table_path: Path):
+    """Record where machines are loaded from. Runs once in every worker process."""
+    global _config_path, _table_path
+    _config_path = config_path
+    _table_path = table_path
+    _machines.clear()
+
+
+def get_machine(date: int) -> Enigma:
+    """This process's machine for `date`, at its initial positions."""
+    machine: Enigma = _machines.get(date)
+    if machine is None:
+        machine = Enigma(config_path=_config_path, table_path=_table_path, date=date)
+        _machines[date] = machine
+    else:
+        machine.reset()
+    return machine
+
+
+def execute(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one parsed job and build its result."""
+    result: Dict[str, Any] = {}
+    if "id" in job:
+        result["id"] = job["id"]
+    result["date"] = date = int(job.get("date", 1))
+    result["mode"] = mode = job.get("mode", "encrypt")
+    assert mode in MODES, f"Unknown mode {mode!r}, expected one of {MODES}."
+    assert ("text" in job) != ("path" in job), "A job needs either text or path."
+
+    machine: Enigma = get_machine(date)
+    if "text" in job:
+        result["text"] = "".join(machine.stream([job["text"]]))
+    else:
+        # Without "output" the file is encoded in place; passing it as dest would truncate it.
+        machine.encode_file(job["path"], dest=job.get("output"))
+        result["output"] = job.get("output", job["path"])
+    return result
+
+
+def run_job(line: str) -> Tuple[str, float, int, bool]:
+    """
+    Run one JSON line. Errors are reported in the result instead of stopping the batch.
+    Returns:
+        Result as a JSON line, seconds spent on it, number of characters encoded, and whether
+        the job failed.
+    """
+    start: float = time.perf_counter()
+    job: Dict[str, Any] = {}
+    n_chars: int = 0
+    try:
+        job = json.loads(line)
+        result: Dict[str, Any] = execute(job)
+        n_chars = (
+            len(job["text"]) if "text" in job else Path(result["output"]).stat().st_size
+        )
+    except Exception as e:  # Bad jobs must not take the batch down.
+        result = {"id": job["id"]} if isinstance(job, dict) and "id" in job else {}
+        result["error"] = f"{type(e).__name__}: {e}"
+    return json.dumps(result), time.perf_counter() - start, n_chars, "error" in result
+
+
+def run_jobs(
+    lines: Iterable[str],
+    config_path: Path = None,
+    table_path: Path = None,
+    workers: int = 1,
+    window: int = 4096,
+) -> Iterator[Tuple[str, float, int, bool]]:
+    """
+    Run jobs and yield run_job() results in input order.
+    Args:
+        lines: JSON lines, one job each. Blank lines are skipped.
+        workers: Number of processes. None means all cores; 1 runs in this process.
+        window: Jobs submitted at a time, which bounds memory on long inputs.
+    """
+    lines = (line for line in lines if line.strip())
+    if workers == 1:
+        init_worker(config_path, table_path)
+        yield from map(run_job, lines)
+        return
+
+    # Imported here: process pools are costly to import and single-process runs never need one.
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count()
+    chunk_size: int = max(1, window // (4 * workers))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(config_path, table_path),
+    ) as executor:
+        while True:
+            batch: List[str] = list(islice(lines, window))
+            if not batch:
+                return
+            yield from executor.map(run_job, batch, chunksize=chunk_size)
+
+
+def run_batch(
+    src: TextIO,
+    dest: TextIO,
+    config_path: Path = None,
+    table_path: Path = None,
+    workers: int = 1,
+    window: int = 4096,
+) -> Dict[str, float]:
+    """
+    Read jobs from `src`, write results to `dest`, both as JSON lines.
+    Returns:
+        Stats: jobs, errors, seconds, jobs_per_sec, chars_per_sec, and latency_p50 / latency_p99
+        in seconds, measured per job inside the workers.
+    """
+    start: float = time.perf_counter()
+    latencies: List[float] = []
+    n_errors: int = 0
+    n_chars: int = 0
+    for result, latency, chars, failed in run_jobs(
+        src, config_path, table_path, workers=workers, window=window
+    ):
+        dest.write(result + "\n")
+        latencies.append(latency)
+        n_chars += chars
+        n_errors += failed
+    dest.flush()
+    elapsed: float = time.perf_counter() - start
+
+    p50, p99 = np.percentile(latencies, [50, 99]) if latencies else (0.0, 0.0)
+    return {
+        "jobs": len(latencies),
+        "errors": n_errors,
+        "seconds": elapsed,
+        "jobs_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "chars_per_sec": n_chars / elapsed if elapsed else 0.0,
+        "latency_p50": float(p50),
+        "latency_p99": float(p99),
+    }
+
+
+def print_stats(stats: Dict[str, float], file: TextIO = sys.stderr):
+    """Human readable summary of run_batch() stats."""
+    print(
+        f"{stats['jobs']} jobs ({stats['errors']} errors) in {stats['seconds']:.3f} s: "
+        f"{stats['jobs_per_sec']:.1f} jobs/s, {stats['chars_per_sec']:.0f} chars/s, "
+        f"latency p50 {stats['latency_p50'] * 1e3:.3f} ms, "
+        f"p99 {stats['latency_p99'] * 1e3:.3f} ms",
+        file=file,
+    )
@@ -1,24 +1,56 @@
+import argparse
 from pathlib import Path
 
 from enigma.components.machine import Enigma
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Encode and decode a message.")
+    parser.add_argument("--message", type=str, default="CHICKENMIZAIMAO")
+    parser.add_argument(
+        "--input", type=Path, default=None, help="File to encode instead of --message."
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Where to write the encoded --input file. Default in place.",
+    )
+    parser.add_argument("--config", type=Path, default=None, help="Config csv path.")
+    parser.add_argument("--table", type=Path, default=None, help="Table csv path.")
+    parser.add_argument("--date", type=int, default=1, help="1-based date in table.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Shard the message across this many processes. 0 means all cores.",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    input_message: str = "CHICKENMIZAIMAO"
-    config_path: Path = None
-    table_path: Path = None
-    date: int = 1
+    args: argparse.Namespace = parse_args()
+    input_message: str = args.message
+    config_path: Path = args.config
+    table_path: Path = args.table
+    date: int = args.date
+    workers: int = args.workers or None
 
     enigma_machine = Enigma(
         config_path=config_path, table_path=table_path, date=date, print_cfg=True
     )
-    encoded_message: str = enigma_machine.input(input_message)
-    enigma_machine = Enigma(
-        config_path=config_path,
-        table_path=table_path,
-        date=date,
-    )
-    decoded_message: str = enigma_machine.input(encoded_message)
+    if args.input is not None:
+        # Workers map their own chunks of both files; nothing is loaded into memory.
+        enigma_machine.encode_file(args.input, dest=args.output, workers=workers)
+        print(f"ENCODED {args.input} -> {args.output or args.input}")
+    else:
+        encoded_message: str = enigma_machine.input_parallel(
+            input_message, workers=workers
+        )
+        enigma_machine.reset()
+        decoded_message: str = enigma_machine.input_parallel(
+            encoded_message, workers=workers
+        )
 
-    print("INPUT -> ENCODED -> DECODED:")
-    print(f"{input_message} -> {encoded_message} -> {decoded_message}")
+        print("INPUT -> ENCODED -> DECODED:")
+        print(f"{input_message} -> {encoded_message} -> {decoded_message}")
@@ -0,0 +1,302 @@
+"""
+Asyncio server that keeps a machine for every day of a table warm and encodes messages on request.
+
+Protocol, over TCP or a Unix socket: every message in either direction is a frame made of a
+4-byte big-endian length followed by that many bytes of UTF-8 JSON.
+Requests:
+    {"id": 1, "date": 3, "mode": "encrypt", "text": "HELLO"}
+    {"id": 2, "op": "stats"}
+    . date: 1-based date in table, defaults to 1;
+    . mode: "encrypt" or "decrypt". The machine is reciprocal, so both run the same operation;
+    . text: message in the machine's alphabet, as accepted by Enigma.input().
+Responses carry the request's "id" and either "text", "stats" or "error". Requests on one
+connection may be pipelined; their responses come back as they complete, matched by "id".
+Every message is encoded from the date's initial rotor positions.
+
+Requests for the same date that arrive together are encoded in one Enigma.input_many() call.
+"""
+
+import asyncio
+import itertools
+import json
+import struct
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Mapping, Tuple, Union
+
+import numpy as np
+
+from enigma.components.cache import TABLE_CACHE
+from enigma.components.machine import Enigma
+
+LENGTH: struct.Struct = struct.Struct(">I")
+MAX_FRAME: int = 1 << 26
+MODES: Tuple[str, ...] = ("encrypt", "decrypt")
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    """Read one frame. Returns None once the other side has closed the connection."""
+    try:
+        header: bytes = await reader.readexactly(LENGTH.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (size,) = LENGTH.unpack(header)
+    assert size <= MAX_FRAME, f"Frame of {size} bytes is over the {MAX_FRAME} limit."
+    return json.loads(await reader.readexactly(size))
+
+
+def write_frame(writer: asyncio.StreamWriter, message: Dict[str, Any]):
+    """Queue one frame on the writer."""
+    body: bytes = json.dumps(message).encode("utf-8")
+    writer.write(LENGTH.pack(len(body)) + body)
+
+
+class EnigmaServer:
+    """Machines for every date of a table, shared by all connections."""
+
+    def __init__(
+        self,
+        config_path: Path = None,
+        table_path: Path = None,
+        batch_delay: float = 0.0,
+        batch_limit: int = 1 << 16,
+        history: int = 1 << 16,
+    ):
+        """
+        Args:
+            batch_delay: Seconds to wait for more requests before encoding a date's batch.
+                0 batches only requests that arrive in the same event loop iteration.
+            batch_limit: Messages longer than this are encoded on their own rather than batched,
+                since a batch computes one substitution per step of its longest message.
+            history: Number of most recent request latencies kept for stats.
+        """
+        if table_path is None:
+            table_path = Path(__file__).parent.joinpath("tables", "default.csv")
+        # Same cache as the machines, so the table is only parsed once.
+        dates: List[int] = sorted(TABLE_CACHE.get(table_path, Enigma.load_tables))
+        self.machines: Dict[int, Enigma] = {
+            date: Enigma(config_path=config_path, table_path=table_path, date=date)
+            for date in dates
+        }
+        self.batch_delay: float = batch_delay
+        self.batch_limit: int = batch_limit
+
+        # Per date, messages waiting for the next batch and their futures.
+        self.pending: Dict[int, List[Tuple[str, asyncio.Future]]] = {}
+        self.latencies: Deque[float] = deque(maxlen=history)
+        self.n_requests: int = 0
+        self.n_batches: int = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Request and batch counts, and p50 / p99 latency in seconds over recent requests."""
+        p50, p99 = (
+            np.percentile(self.latencies, [50, 99]) if self.latencies else (0.0, 0.0)
+        )
+        return {
+            "requests": self.n_requests,
+            "batches": self.n_batches,
+            "latency_p50": float(p50),
+            "latency_p99": float(p99),
+        }
+
+    def encode(self, date: int, text: str) -> "asyncio.Future[str]":
+        """Queue a message for its date's next batch."""
+        assert date in self.machines, f"No table entry for date {date}."
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        if len(text) > self.batch_limit:
+            machine: Enigma = self.machines[date]
+            future.set_result(machine.input_vectorized(text))
+            machine.reset()
+            return future
+
+        batch: List[Tuple[str, asyncio.Future]] = self.pending.setdefault(date, [])
+        if not batch:
+            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+            if self.batch_delay:
+                loop.call_later(self.batch_delay, self.flush, date)
+            else:
+                loop.call_soon(self.flush, date)
+        batch.append((text, future))
+        return future
+
+    def flush(self, date: int):
+        """Encode every pending message for `date` in one call."""
+        batch: List[Tuple[str, asyncio.Future]] = self.pending.pop(date, [])
+        if not batch:
+            return
+        self.n_batches += 1
+        machine: Enigma = self.machines[date]
+        try:
+            outputs: List[str] = machine.input_many([text for text, _ in batch])
+        except Exception:
+            # One bad message must not fail the others: retry them one by one.
+            for text, future in batch:
+                try:
+                    future.set_result(machine.input_many([text])[0])
+                except Exception as e:
+                    future.set_exception(e)
+            return
+        for (_, future), output in zip(batch, outputs):
+            future.set_result(output)
+
+    async def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one request."""
+        response: Dict[str, Any] = {"id": request.get("id")}
+        try:
+            if request.get("op") == "stats":
+                response["stats"] = self.stats()
+                return response
+            mode: str = request.get("mode", "encrypt")
+            assert mode in MODES, f"Unknown mode {mode!r}, expected one of {MODES}."
+            response["text"] = await self.encode(
+                int(request.get("date", 1)), request["text"]
+            )
+        except Exception as e:  # Reported to the client, the server keeps going.
+            response["error"] = f"{type(e).__name__}: {e}"
+        return response
+
+    async def respond(
+        self, request: Dict[str, Any], writer: asyncio.StreamWriter, start: float
+    ):
+        write_frame(writer, await self.handle(request))
+        self.n_requests += 1
+        self.latencies.append(time.perf_counter() - start)
+
+    async def serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """Read pipelined requests from one client until it disconnects."""
+        tasks: List[asyncio.Task] = []
+        try:
+            while True:
+                try:
+                    request: Dict[str, Any] = await read_frame(reader)
+                except (AssertionError, ValueError) as e:
+                    write_frame(
+                        writer, {"id": None, "error": f"{type(e).__name__}: {e}"}
+                    )
+                    break
+                if request is None:
+                    break
+                start: float = time.perf_counter()
+                tasks = [task for task in tasks if not task.done()]
+                tasks.append(asyncio.create_task(self.respond(request, writer, start)))
+            await asyncio.gather(*tasks)
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # Client gone or server shutting down. Returning normally keeps asyncio from
+            # logging the cancellation as an error.
+            pass
+        finally:
+            writer.close()
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 0, unix_path: Path = None
+    ) -> asyncio.AbstractServer:
+        """Start listening on a Unix socket if `unix_path` is given, else on TCP."""
+        if unix_path is not None:
+            return await asyncio.start_unix_server(
+                self.serve_connection, path=str(unix_path)
+            )
+        return await asyncio.start_server(self.serve_connection, host, port)
+
+
+class EnigmaClient:
+    """Asyncio client. Requests can be issued concurrently over one connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+        self.ids: Iterator[int] = itertools.count()
+        self.waiting: Dict[int, asyncio.Future] = {}
+        self.receiver: asyncio.Task = asyncio.create_task(self.receive())
+
+    @classmethod
+    async def connect(
+        cls, host: str = "127.0.0.1", port: int = None, unix_path: Path = None
+    ) -> "EnigmaClient":
+        if unix_path is not None:
+            return cls(*await asyncio.open_unix_connection(str(unix_path)))
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def receive(self):
+        """Hand every response to the request waiting for it."""
+        try:
+            while True:
+                response: Dict[str, Any] = await read_frame(self.reader)
+                if response is None:
+                    break
+                future: asyncio.Future = self.waiting.pop(response["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError("Server closed the connection.")
+                    )
+            self.waiting.clear()
+
+    async def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request and wait for its response."""
+        message = dict(message, id=next(self.ids))
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.waiting[message["id"]] = future
+        write_frame(self.writer, message)
+        await self.writer.drain()
+        return await future
+
+    async def encode(self, text: str, date: int = 1, mode: str = "encrypt") -> str:
+        """Encode a message on the server. Errors reported by the server are raised."""
+        response: Dict[str, Any] = await self.request(
+            {"date": date, "mode": mode, "text": text}
+        )
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response["text"]
+
+    async def stats(self) -> Dict[str, float]:
+        return (await self.request({"op": "stats"}))["stats"]
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.receiver.cancel()
+
+
+async def serve(
+    config_path: Path = None,
+    table_path: Path = None,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_path: Path = None,
+    batch_delay: float = 0.0,
+    stats_interval: float = 0.0,
+):
+    """Run a server until cancelled, printing stats to stderr every `stats_interval` seconds."""
+    server = EnigmaServer(config_path, table_path, batch_delay=batch_delay)
+    listener: asyncio.AbstractServer = await server.start(host, port, unix_path)
+    where: Union[str, Tuple] = (
+        str(unix_path) if unix_path is not None else listener.sockets[0].getsockname()
+    )
+    print(
+        f"Serving {len(server.machines)} dates on {where}.", file=sys.stderr, flush=True
+    )
+    try:
+        async with listener:
+            while True:
+                await asyncio.sleep(stats_interval or 3600)
+                if stats_interval:
+                    print(format_stats(server.stats()), file=sys.stderr, flush=True)
+    finally:
+        print(format_stats(server.stats()), file=sys.stderr, flush=True)
+
+
+def format_stats(stats: Mapping[str, float]) -> str:
+    return (
+        f"{stats['requests']} requests in {stats['batches']} batches, "
+        f"latency p50 {stats['latency_p50'] * 1e3:.3f} ms, "
+        f"p99 {stats['latency_p99'] * 1e3:.3f} ms"
+    )
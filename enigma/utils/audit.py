@@ -0,0 +1,454 @@
+"""
+Audit key sheets for reused settings across a fleet of networks.
+
+Every (network, day) entry of every sheet is encoded into 64-bit keys of four kinds, hashed
+when longer than 7 bytes (such keys are checked against their bytes before counting as reused):
+    . settings: rotor order and ring settings, which no two entries should share;
+    . plugboards: the whole plugboard, which no two entries should share;
+    . plug_pairs: every plug pair, whose uses are counted;
+    . indicators: every indicator trigram, which should not repeat.
+Sheets are streamed a chunk of days at a time (binary sheets through their memory map) and each
+key is spilled, with the (sheet, day) it came from, to the shard given by its hash. Each shard is
+then indexed on its own: keys are sorted into an inverted index of unique keys, offsets and
+postings, so reused keys and their uses fall out in one pass. Sheets and shards are spread over
+processes, and time and memory stay about linear in the number of entries.
+
+Usage:
+    python -m enigma.utils.audit SHEET [SHEET ...] [--workers 0] [--shards 16] [--json]
+audits csv or binary tables written by CodeGen or BulkGen.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from enigma.utils import binary_format
+
+KINDS: Tuple[str, ...] = ("settings", "plugboards", "plug_pairs", "indicators")
+# Keys of up to this many bytes are packed exactly, with their length in the top byte.
+EXACT_BYTES: int = 7
+HASHED: int = 0xFF
+FNV_OFFSET: np.uint64 = np.uint64(0xCBF29CE484222325)
+FNV_PRIME: np.uint64 = np.uint64(0x100000001B3)
+SHARD_MIX: np.uint64 = np.uint64(0x9E3779B97F4A7C15)
+
+
+def pack_keys(fields: np.ndarray) -> np.ndarray:
+    """
+    One uint64 key per row of a (N, k) uint8 array. Rows of up to EXACT_BYTES bytes are packed
+    exactly; longer rows are hashed (FNV-1a, top byte set to HASHED).
+    """
+    n, k = fields.shape
+    with np.errstate(over="ignore"):
+        if k <= EXACT_BYTES:
+            keys: np.ndarray = np.full(n, k, dtype=np.uint64) << np.uint64(56)
+            for i in range(k):
+                keys |= fields[:, i].astype(np.uint64) << np.uint64(8 * (k - 1 - i))
+            return keys
+        keys = np.full(n, FNV_OFFSET, dtype=np.uint64)
+        for i in range(k):
+            keys ^= fields[:, i].astype(np.uint64)
+            keys *= FNV_PRIME
+    return (keys & np.uint64((1 << 56) - 1)) | np.uint64(HASHED << 56)
+
+
+def key_bytes(fields: np.ndarray) -> np.ndarray:
+    """
+    The rows behind hashed keys, so reuse can be told from hash collisions: each row prefixed
+    with its length as 2 bytes, or None when pack_keys() packs the rows exactly.
+    """
+    n, k = fields.shape
+    if k <= EXACT_BYTES:
+        return None
+    length: np.ndarray = np.array([k >> 8, k & 0xFF], dtype=np.uint8)
+    return np.concatenate([np.broadcast_to(length, (n, 2)), fields], axis=1)
+
+
+def pad_rows(rows: List[np.ndarray]) -> np.ndarray:
+    """Stack key_bytes() of different widths, zero-padded to the widest. None if empty."""
+    if not rows:
+        return None
+    width: int = max(part.shape[1] for part in rows)
+    return np.concatenate(
+        [np.pad(part, ((0, 0), (0, width - part.shape[1]))) for part in rows]
+    )
+
+
+def unpack_key(key: int, row: np.ndarray = None) -> List[int]:
+    """Bytes of a key: unpacked if exact, else read from its key_bytes() row."""
+    k: int = key >> 56
+    if k == HASHED:
+        return row[2 : 2 + (int(row[0]) << 8 | int(row[1]))].tolist()
+    return [(key >> (8 * (k - 1 - i))) & 0xFF for i in range(k)]
+
+
+def shard_of(keys: np.ndarray, n_shards: int) -> np.ndarray:
+    """Shard of every key, from its mixed top bits, so exact keys spread evenly too."""
+    with np.errstate(over="ignore"):
+        mixed: np.ndarray = keys * SHARD_MIX
+    return ((mixed >> np.uint64(32)) % np.uint64(n_shards)).astype(np.int64)
+
+
+def read_sheet(path: Path, chunk_days: int) -> Iterator[np.ndarray]:
+    """Table records (see binary_format.table_dtype) of a csv or binary sheet, in chunks."""
+    path = Path(path)
+    if binary_format.read_magic(path) == binary_format.TABLE_MAGIC:
+        records: np.memmap = binary_format.TableFile(path).records
+        for first in range(0, records.shape[0], chunk_days):
+            yield np.asarray(records[first : first + chunk_days])
+        return
+
+    # Imported here, as in binary_format: the machine module imports binary_format.
+    from enigma.components.machine import Enigma
+
+    tables: Dict[int, Dict[str, Any]] = Enigma.load_tables(path)
+    entries: List[Dict[str, Any]] = [
+        dict(entry, day=day) for day, entry in sorted(tables.items())
+    ]
+    dtype: np.dtype = binary_format.table_dtype(
+        len(entries[0]["rotors"]),
+        max(len(entry["plugs"]) for entry in entries),
+        max(len(entry["indicators"]) for entry in entries),
+    )
+    for first in range(0, len(entries), chunk_days):
+        yield binary_format.pack_entries(entries[first : first + chunk_days], dtype)
+
+
+def encode_records(
+    records: np.ndarray, sheet: int
+) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Keys of every kind in a chunk of records, each with its posting: sheet << 32 | day, and
+    its key_bytes() row if the key is hashed.
+    """
+    n: int = records.shape[0]
+    postings: np.ndarray = (np.uint64(sheet) << np.uint64(32)) | records["day"].astype(
+        np.uint64
+    )
+    encoded: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    settings: np.ndarray = np.concatenate([records["rotors"], records["rings"]], axis=1)
+    encoded["settings"] = (pack_keys(settings), postings, key_bytes(settings))
+
+    # Plug pairs as (low, high) codes; unused slots are (0, 0) and are left out of pair counts.
+    plugs: np.ndarray = records["plugs"].astype(np.uint16)
+    pairs: np.ndarray = (plugs.min(axis=2) << 8) | plugs.max(axis=2)
+    used: np.ndarray = plugs[:, :, 0] != plugs[:, :, 1]
+    encoded["plug_pairs"] = (
+        pack_keys(
+            np.stack([pairs[used] >> 8, pairs[used] & 0xFF], axis=1).astype(np.uint8)
+        ),
+        np.broadcast_to(postings[:, None], pairs.shape)[used],
+        None,
+    )
+    # The same pairs in any order make the same plugboard.
+    board: np.ndarray = np.sort(np.where(used, pairs, 0), axis=1)
+    board_bytes: np.ndarray = board.astype(">u2").view(np.uint8).reshape(n, -1)
+    encoded["plugboards"] = (pack_keys(board_bytes), postings, key_bytes(board_bytes))
+
+    trigrams: np.ndarray = records["indicators"].reshape(-1, 3)
+    i_groups: int = records["indicators"].shape[1]
+    encoded["indicators"] = (pack_keys(trigrams), np.repeat(postings, i_groups), None)
+    return encoded
+
+
+def map_sheets(
+    task: int,
+    sheets: List[Tuple[int, Path]],
+    spill_dir: Path,
+    n_shards: int,
+    chunk_days: int,
+) -> int:
+    """
+    Encode sheets and spill their keys by shard, to {kind}_{shard}_{task}.npz. The bytes of
+    hashed keys are spilled too, as "rows" in the order of those keys. Runs in worker processes.
+    Returns:
+        Number of entries read.
+    """
+    parts: Dict[Tuple[str, int], List[Tuple[np.ndarray, ...]]] = {}
+    n_entries: int = 0
+    for sheet, path in sheets:
+        for records in read_sheet(path, chunk_days):
+            n_entries += records.shape[0]
+            for kind, (keys, postings, rows) in encode_records(records, sheet).items():
+                shards: np.ndarray = shard_of(keys, n_shards)
+                for shard in np.unique(shards).tolist():
+                    mask: np.ndarray = shards == shard
+                    parts.setdefault((kind, shard), []).append(
+                        (
+                            keys[mask],
+                            postings[mask],
+                            None if rows is None else rows[mask],
+                        )
+                    )
+    for (kind, shard), chunks in parts.items():
+        rows: np.ndarray = pad_rows([rows for _, _, rows in chunks if rows is not None])
+        np.savez(
+            Path(spill_dir).joinpath(f"{kind}_{shard:04d}_{task:04d}.npz"),
+            keys=np.concatenate([keys for keys, _, _ in chunks]),
+            postings=np.concatenate([postings for _, postings, _ in chunks]),
+            **({} if rows is None else {"rows": rows}),
+        )
+    return n_entries
+
+
+def inverted_index(
+    keys: np.ndarray, postings: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Group postings by key.
+    Returns:
+        Unique keys, offsets (postings of unique key i are [offsets[i], offsets[i + 1])) and
+        the postings in key order.
+    """
+    order: np.ndarray = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts: np.ndarray = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    starts = starts[starts < keys.shape[0]]
+    offsets: np.ndarray = np.r_[starts, keys.shape[0]]
+    return keys[starts], offsets, postings[order]
+
+
+def split_collisions(
+    unique: np.ndarray,
+    offsets: np.ndarray,
+    entries: np.ndarray,
+    rows: np.ndarray,
+    rank: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split the groups of hashed keys whose entries have different bytes: those keys collided,
+    they were not reused.
+    Args:
+        unique, offsets, entries: inverted_index() of keys, with entry numbers as postings.
+        rows: key_bytes() rows of the hashed keys.
+        rank: Row of every entry in rows; only read for hashed keys.
+    Returns:
+        The index with one group per distinct value. A split key appears once per value.
+    """
+    uses: np.ndarray = np.diff(offsets)
+    suspect: np.ndarray = (uses > 1) & ((unique >> np.uint64(56)) == HASHED)
+    if not suspect.any():
+        return unique, offsets, entries
+    group: np.ndarray = np.repeat(np.arange(unique.shape[0]), uses)
+    members: np.ndarray = np.flatnonzero(suspect[group])
+    member_rows: np.ndarray = rows[rank[entries[members]]]
+    # Group first, so every group keeps its place in entries, then bytes within the group.
+    order: np.ndarray = np.lexsort(tuple(member_rows.T[::-1]) + (group[members],))
+    entries = entries.copy()
+    entries[members] = entries[members][order]
+    member_rows = member_rows[order]
+    changed: np.ndarray = np.zeros(entries.shape[0], dtype=bool)
+    changed[members[1:]] = (group[members[1:]] == group[members[:-1]]) & (
+        member_rows[1:] != member_rows[:-1]
+    ).any(axis=1)
+    starts: np.ndarray = np.sort(
+        np.concatenate([offsets[:-1], np.flatnonzero(changed)])
+    )
+    return unique[group[starts]], np.r_[starts, entries.shape[0]], entries
+
+
+def reduce_shard(
+    shard: int, spill_dir: Path, max_examples: int, max_pair_uses: int
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Reuse counts and the most reused keys of every kind in one shard. Hashed keys count as
+    reused only if their bytes match too. Runs in workers.
+    """
+    report: Dict[str, Dict[str, Any]] = {}
+    for kind in KINDS:
+        files: List[Path] = sorted(Path(spill_dir).glob(f"{kind}_{shard:04d}_*.npz"))
+        loaded: List[Any] = [np.load(f) for f in files]
+        keys: np.ndarray = np.concatenate(
+            [np.zeros(0, dtype=np.uint64)] + [data["keys"] for data in loaded]
+        )
+        postings: np.ndarray = np.concatenate(
+            [np.zeros(0, dtype=np.uint64)] + [data["postings"] for data in loaded]
+        )
+        unique, offsets, entries = inverted_index(keys, np.arange(keys.shape[0]))
+        # Spilled rows belong to the hashed keys, in order.
+        rows: np.ndarray = pad_rows(
+            [data["rows"] for data in loaded if "rows" in data.files]
+        )
+        if rows is not None:
+            hashed: np.ndarray = (keys >> np.uint64(56)) == HASHED
+            assert rows.shape[0] == np.count_nonzero(hashed)
+            rank: np.ndarray = np.cumsum(hashed) - 1
+            unique, offsets, entries = split_collisions(
+                unique, offsets, entries, rows, rank
+            )
+        postings = postings[entries]
+        uses: np.ndarray = np.diff(offsets)
+        limit: int = max_pair_uses if kind == "plug_pairs" else 1
+        flagged: np.ndarray = (
+            np.flatnonzero(uses > limit)
+            if limit is not None
+            else np.zeros(0, dtype=np.int64)
+        )
+        top: np.ndarray = np.argsort(uses, kind="stable")[::-1][:max_examples]
+        if kind != "plug_pairs":
+            top = top[uses[top] > 1]
+        report[kind] = {
+            "uses": int(keys.shape[0]),
+            "distinct": int(unique.shape[0]),
+            "flagged": int(flagged.shape[0]),
+            "flagged_uses": int(uses[flagged].sum()),
+            "max_uses": int(uses.max()) if uses.shape[0] else 0,
+            "examples": [
+                {
+                    "value": unpack_key(
+                        int(unique[i]),
+                        None if rows is None else rows[rank[entries[offsets[i]]]],
+                    ),
+                    "uses": int(uses[i]),
+                    "postings": postings[offsets[i] : offsets[i + 1]][
+                        :max_examples
+                    ].tolist(),
+                }
+                for i in top.tolist()
+            ],
+        }
+    return report
+
+
+def audit(
+    paths: Sequence[Path],
+    n_shards: int = 16,
+    workers: int = 1,
+    max_examples: int = 10,
+    max_pair_uses: int = None,
+    chunk_days: int = 1 << 16,
+    spill_dir: Path = None,
+) -> Dict[str, Any]:
+    """
+    Audit key sheets for reused settings.
+    Args:
+        paths: Csv or binary tables, one per network.
+        n_shards: Number of hash shards the keys are indexed in.
+        workers: Number of processes. None means all cores.
+        max_examples: Most reused keys reported per kind, and postings listed per key.
+        max_pair_uses: Plug pairs used more often than this are flagged. None flags nothing.
+        chunk_days: Days read from a sheet at a time; bounds memory.
+        spill_dir: Where shard files go. A temporary directory if None.
+    Returns:
+        "sheets", "entries" and, for every kind, "uses", "distinct", "flagged" (keys used more
+        than once, or more than max_pair_uses for plug pairs), "flagged_uses", "max_uses" and
+        "examples": the most reused keys, as "value", "uses" and (sheet path, day) "postings".
+    """
+    paths = [Path(path) for path in paths]
+    # A few map tasks per process keeps them balanced when sheet sizes differ.
+    n_tasks: int = max(1, min(len(paths), 4 * (workers or os.cpu_count())))
+    tasks: List[List[Tuple[int, Path]]] = [
+        list(enumerate(paths))[i::n_tasks] for i in range(n_tasks)
+    ]
+
+    with tempfile.TemporaryDirectory(dir=spill_dir) as tmp_dir:
+        map_args: Tuple[List, ...] = (
+            list(range(n_tasks)),
+            tasks,
+            [tmp_dir] * n_tasks,
+            [n_shards] * n_tasks,
+            [chunk_days] * n_tasks,
+        )
+        reduce_args: Tuple[List, ...] = (
+            list(range(n_shards)),
+            [tmp_dir] * n_shards,
+            [max_examples] * n_shards,
+            [max_pair_uses] * n_shards,
+        )
+        if workers == 1:
+            n_entries: int = sum(map(map_sheets, *map_args))
+            shards: List[Dict[str, Dict[str, Any]]] = list(
+                map(reduce_shard, *reduce_args)
+            )
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                n_entries = sum(executor.map(map_sheets, *map_args))
+                shards = list(executor.map(reduce_shard, *reduce_args))
+
+    report: Dict[str, Any] = {"sheets": len(paths), "entries": n_entries}
+    for kind in KINDS:
+        parts: List[Dict[str, Any]] = [shard[kind] for shard in shards]
+        examples: List[Dict[str, Any]] = sorted(
+            (example for part in parts for example in part["examples"]),
+            key=lambda example: example["uses"],
+            reverse=True,
+        )[:max_examples]
+        report[kind] = {
+            "uses": sum(part["uses"] for part in parts),
+            "distinct": sum(part["distinct"] for part in parts),
+            "flagged": sum(part["flagged"] for part in parts),
+            "flagged_uses": sum(part["flagged_uses"] for part in parts),
+            "max_uses": max(part["max_uses"] for part in parts),
+            "examples": [
+                {
+                    "value": example["value"],
+                    "uses": example["uses"],
+                    "postings": [
+                        (str(paths[posting >> 32]), posting & 0xFFFFFFFF)
+                        for posting in example["postings"]
+                    ],
+                }
+                for example in examples
+            ],
+        }
+    return report
+
+
+def describe(kind: str, value: List[int]) -> str:
+    """A key's bytes as text: printable symbols as characters, anything else as codes."""
+    if kind == "settings":
+        half: int = len(value) // 2
+        return f"rotors {' '.join(map(str, value[:half]))} rings {describe('', value[half:])}"
+    if all(33 <= v <= 126 for v in value):
+        return "".join(map(chr, value))
+    return " ".join(map(str, value))
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable summary of audit()."""
+    lines: List[str] = [f"{report['sheets']} sheets, {report['entries']:,} entries"]
+    for kind in KINDS:
+        part: Dict[str, Any] = report[kind]
+        lines.append(
+            f"{kind:<12} {part['uses']:>12,} uses {part['distinct']:>12,} distinct "
+            f"{part['flagged']:>10,} flagged ({part['flagged_uses']:,} uses), "
+            f"max {part['max_uses']:,} uses"
+        )
+        for example in part["examples"]:
+            value: str = describe(kind, example["value"])
+            where: str = ", ".join(
+                f"{Path(path).name}:{day}" for path, day in example["postings"]
+            )
+            lines.append(f"    {value:<24} x{example['uses']:<6} {where}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("sheets", type=Path, nargs="+", help="Csv or binary tables.")
+    parser.add_argument("--workers", type=int, default=1, help="0 means all cores.")
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--examples", type=int, default=10)
+    parser.add_argument(
+        "--max-pair-uses", type=int, default=None, help="Flag plug pairs used more."
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args: argparse.Namespace = parser.parse_args()
+
+    result: Dict[str, Any] = audit(
+        args.sheets,
+        n_shards=args.shards,
+        workers=args.workers or None,
+        max_examples=args.examples,
+        max_pair_uses=args.max_pair_uses,
+    )
+    print(json.dumps(result, indent=2) if args.json else format_report(result))
@@ -0,0 +1,221 @@
+"""
+Compact fixed-layout binary formats for machine configs and code tables.
+
+Config file:
+    16-byte header: magic b"ENGC", version, number of symbols, alphabet base, number of rotors.
+    Then one row of n_symbols uint8 per rotor (0-based wiring, right to left), then the reflector.
+
+Table file:
+    32-byte header: magic b"ENGT", version, number of days, rotor slots, plugs, indicator groups.
+    Then one fixed-size record per day, ordered by date, so date d sits at a known offset and can
+    be read through a memory map without parsing anything else. All values are symbol codes (or
+    rotor indices) stored as uint8; unused plug slots are (0, 0).
+
+Usage:
+    python -m enigma.utils.binary_format SRC.csv DEST.bin
+converts a csv written by ConfigGen or CodeGen into the matching binary file.
+"""
+
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from enigma.components.rotors import Rotor, Reflector
+
+VERSION: int = 1
+
+CONFIG_MAGIC: bytes = b"ENGC"
+CONFIG_HEADER: struct.Struct = struct.Struct("<4sHHHH")
+CONFIG_HEADER_SIZE: int = 16
+
+TABLE_MAGIC: bytes = b"ENGT"
+TABLE_HEADER: struct.Struct = struct.Struct("<4sHIHHH")
+TABLE_HEADER_SIZE: int = 32
+
+
+def read_magic(path: Path) -> bytes:
+    """First four bytes of a file, used to tell binary files from csv."""
+    with open(path, "rb") as f:
+        return f.read(4)
+
+
+def write_config(dest: Path, rotors: List[Dict[int, int]], reflector: Dict[int, int]):
+    """Save rotor and reflector wirings, given as dicts of symbol codes."""
+    base: int = min(reflector.keys())
+    n_symbols: int = len(reflector)
+    assert n_symbols <= 256, "Binary format stores symbols as uint8."
+    wirings: np.ndarray = np.zeros((len(rotors) + 1, n_symbols), dtype=np.uint8)
+    for row, wiring in zip(wirings, rotors + [reflector]):
+        for k, v in wiring.items():
+            row[int(k) - base] = int(v) - base
+
+    with open(dest, "wb") as f:
+        header: bytes = CONFIG_HEADER.pack(
+            CONFIG_MAGIC, VERSION, n_symbols, base, len(rotors)
+        )
+        f.write(header.ljust(CONFIG_HEADER_SIZE, b"\0"))
+        f.write(wirings.tobytes())
+
+
+def read_config(config_path: Path) -> Tuple[List[Rotor], Reflector]:
+    """Load rotors and reflector from a binary config."""
+    with open(config_path, "rb") as f:
+        header: bytes = f.read(CONFIG_HEADER_SIZE)
+        magic, version, n_symbols, base, n_rotors = CONFIG_HEADER.unpack(
+            header[: CONFIG_HEADER.size]
+        )
+        assert magic == CONFIG_MAGIC, f"{config_path} is not a binary config."
+        assert version == VERSION, f"Unsupported config version {version}."
+        wirings: np.ndarray = np.frombuffer(
+            f.read((n_rotors + 1) * n_symbols), dtype=np.uint8
+        ).reshape(n_rotors + 1, n_symbols)
+
+    def to_mapping(wiring: np.ndarray) -> Dict[int, int]:
+        return {base + i: base + int(v) for i, v in enumerate(wiring)}
+
+    rotors: List[Rotor] = [Rotor(to_mapping(wiring)) for wiring in wirings[:-1]]
+    return rotors, Reflector(to_mapping(wirings[-1]))
+
+
+def table_dtype(rotor_slots: int, n_plugs: int, i_groups: int) -> np.dtype:
+    """Layout of one day's record."""
+    return np.dtype(
+        [
+            ("day", "<u4"),
+            ("rotors", "u1", (rotor_slots,)),
+            ("rings", "u1", (rotor_slots,)),
+            ("plugs", "u1", (n_plugs, 2)),
+            ("indicators", "u1", (i_groups, 3)),
+        ]
+    )
+
+
+def write_table_header(f, n_days: int, rotor_slots: int, n_plugs: int, i_groups: int):
+    header: bytes = TABLE_HEADER.pack(
+        TABLE_MAGIC, VERSION, n_days, rotor_slots, n_plugs, i_groups
+    )
+    f.write(header.ljust(TABLE_HEADER_SIZE, b"\0"))
+
+
+def pack_entries(entries: List[Dict[str, Any]], dtype: np.dtype) -> np.ndarray:
+    """Convert table entries (as produced by Enigma.load_table) to records."""
+    records: np.ndarray = np.zeros(len(entries), dtype=dtype)
+    for record, entry in zip(records, entries):
+        record["day"] = entry["day"]
+        record["rotors"] = [int(r) for r in entry["rotors"]]
+        record["rings"] = [int(r) for r in entry["rings"]]
+        for plug_i, (p1, p2) in enumerate(entry["plugs"].items()):
+            record["plugs"][plug_i] = (int(p1), int(p2))
+        record["indicators"] = [
+            [int(i) for i in group] for group in entry["indicators"]
+        ]
+    return records
+
+
+def write_table(dest: Path, entries: List[Dict[str, Any]]):
+    """
+    Save table entries, one per day. Each entry holds "rotors", "rings", "plugs" and
+    "indicators" as in Enigma.load_table(), plus its 1-based "day". Days must be 1 .. N.
+    """
+    entries = sorted(entries, key=lambda entry: entry["day"])
+    assert [entry["day"] for entry in entries] == list(
+        range(1, len(entries) + 1)
+    ), "Table must hold every day from 1 to N exactly once."
+    rotor_slots: int = len(entries[0]["rotors"])
+    n_plugs: int = max(len(entry["plugs"]) for entry in entries)
+    i_groups: int = max(len(entry["indicators"]) for entry in entries)
+
+    with open(dest, "wb") as f:
+        write_table_header(f, len(entries), rotor_slots, n_plugs, i_groups)
+        f.write(
+            pack_entries(entries, table_dtype(rotor_slots, n_plugs, i_groups)).tobytes()
+        )
+
+
+class TableFile(Mapping):
+    """
+    Memory-mapped binary table. Behaves like the dict returned by Enigma.load_tables():
+    keys are 1-based dates and values are table entries, decoded on access.
+    """
+
+    def __init__(self, table_path: Path):
+        self.path: Path = Path(table_path)
+        with open(self.path, "rb") as f:
+            header: bytes = f.read(TABLE_HEADER_SIZE)
+        magic, version, n_days, rotor_slots, n_plugs, i_groups = TABLE_HEADER.unpack(
+            header[: TABLE_HEADER.size]
+        )
+        assert magic == TABLE_MAGIC, f"{self.path} is not a binary table."
+        assert version == VERSION, f"Unsupported table version {version}."
+
+        self.n_days: int = n_days
+        self.records: np.memmap = np.memmap(
+            self.path,
+            dtype=table_dtype(rotor_slots, n_plugs, i_groups),
+            mode="r",
+            offset=TABLE_HEADER_SIZE,
+            shape=(n_days,),
+        )
+
+    def __getitem__(self, date: int) -> Dict[str, Any]:
+        if not 1 <= date <= self.n_days:
+            raise KeyError(date)
+        record: np.void = self.records[date - 1]
+        assert record["day"] == date, f"Corrupted record for date {date}."
+        return {
+            "rotors": record["rotors"].tolist(),
+            "rings": record["rings"].tolist(),
+            "plugs": {int(p1): int(p2) for p1, p2 in record["plugs"] if p1 != p2},
+            "indicators": record["indicators"].tolist(),
+        }
+
+    def __contains__(self, date: Any) -> bool:
+        return isinstance(date, (int, np.integer)) and 1 <= date <= self.n_days
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(1, self.n_days + 1))
+
+    def __len__(self) -> int:
+        return self.n_days
+
+
+def convert_csv(src: Path, dest: Path):
+    """Convert a config or table csv into the matching binary file."""
+    # Imported here: the machine itself imports this module to read binary files.
+    from enigma.components.machine import Enigma
+
+    with open(src) as f:
+        columns: List[str] = f.readline().strip().split(",")
+    if "wiring" in columns:
+        rotors: List[Rotor]
+        reflector: Reflector
+        rotors, reflector = Enigma.load_config(src)
+
+        def to_codes(mapping: Dict[int, int], base: int) -> Dict[int, int]:
+            return {base + k: base + v for k, v in mapping.items()}
+
+        write_config(
+            dest,
+            [
+                to_codes({i: int(v) for i, v in enumerate(r.arr[0])}, r.base)
+                for r in rotors
+            ],
+            to_codes(reflector.mapping, reflector.base),
+        )
+    else:
+        tables: Mapping = Enigma.load_tables(src)
+        write_table(dest, [dict(tables[day], day=day) for day in tables])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a csv into binary format.")
+    parser.add_argument("src", type=Path, help="Config or table csv.")
+    parser.add_argument("dest", type=Path, help="Binary file to write.")
+    args: argparse.Namespace = parser.parse_args()
+    convert_csv(args.src, args.dest)
+    print(f"Saved binary file to {args.dest}.")
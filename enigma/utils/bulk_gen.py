@@ -0,0 +1,197 @@
+"""
+Bulk generation of machine configs and code tables for many networks.
+Same content as ConfigGen and CodeGen, but every permutation and plug pairing is drawn as a row of
+a 2-D array with Generator.permuted(), days are produced and written in chunks, and networks can be
+spread over processes. Each network draws from its own child of one SeedSequence, and each field
+from its own stream within that network, so the output only depends on the seed, never on the
+number of workers or the chunk size.
+
+For every network i, two binary files are written (see binary_format):
+    network_{i:05d}_config.bin
+    network_{i:05d}_table.bin
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from enigma.utils import binary_format
+from enigma.utils.code_gen import DAYS
+
+
+def child_seed(
+    seed_sequence: np.random.SeedSequence, index: int
+) -> np.random.SeedSequence:
+    """
+    The index-th child of a SeedSequence, same as its index-th spawn() result, but without
+    mutating it, so repeated runs give the same children.
+    """
+    return np.random.SeedSequence(
+        seed_sequence.entropy, spawn_key=seed_sequence.spawn_key + (index,)
+    )
+
+
+class BulkGen:
+    """Generate configs and tables for a fleet of networks."""
+
+    def __init__(
+        self,
+        seed: int = None,
+        n_networks: int = 1,
+        n_days: int = DAYS,
+        n_rotors: int = 5,
+        rotor_slots: int = 3,
+        n_plugs: int = 6,
+        i_groups: int = 4,
+        extended: bool = False,
+        byte_mode: bool = False,
+        chunk_days: int = 1 << 16,
+    ):
+        """
+        Args:
+            seed: Root seed. The same seed always gives the same files.
+            n_networks: Number of networks, each with its own config and table.
+            n_days: Number of days in each table.
+            n_rotors: Number of rotors (excluding reflector).
+            rotor_slots: How many rotors are actually used.
+            n_plugs: Number of used switches on the plugboard.
+            i_groups: Number of indicator groups per day.
+            extended: Whether to use the entire ASCII space. False means only capital A-Z.
+            byte_mode: Whether to use all 256 byte values. Overrides `extended`.
+            chunk_days: Days generated and written at a time; bounds memory.
+        """
+        assert rotor_slots <= n_rotors
+        self.ranges: np.ndarray = np.arange(
+            *((0, 256) if byte_mode else (0, 128) if extended else (65, 91))
+        )
+        assert 2 * n_plugs <= len(self.ranges)
+
+        self.seed_sequence: np.random.SeedSequence = np.random.SeedSequence(seed)
+        self.n_networks: int = n_networks
+        self.n_days: int = n_days
+        self.n_rotors: int = n_rotors
+        self.rotor_slots: int = rotor_slots
+        self.n_plugs: int = n_plugs
+        self.i_groups: int = i_groups
+        self.chunk_days: int = chunk_days
+
+    def _permutations(
+        self, rng: np.random.Generator, n: int, symbols: np.ndarray
+    ) -> np.ndarray:
+        """n independent shuffles of `symbols`, one per row."""
+        return rng.permuted(np.broadcast_to(symbols, (n, len(symbols))), axis=1)
+
+    def _gen_config(self, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """Rotor wirings (n_rotors, L) and a reflector (L,) without fixed points."""
+        rotors: np.ndarray = self._permutations(rng, self.n_rotors, self.ranges)
+        pairs: np.ndarray = self._permutations(rng, 1, self.ranges)[0].reshape(-1, 2)
+        reflector: np.ndarray = np.empty(len(self.ranges), dtype=np.int64)
+        reflector[pairs[:, 0] - self.ranges[0]] = pairs[:, 1]
+        reflector[pairs[:, 1] - self.ranges[0]] = pairs[:, 0]
+        return rotors, reflector
+
+    def _gen_days(
+        self,
+        rngs: List[np.random.Generator],
+        first_day: int,
+        n: int,
+        dtype: np.dtype,
+    ) -> np.ndarray:
+        """
+        Table records for days first_day .. first_day + n - 1.
+        `rngs` holds one generator per field: rotors, rings, plugs and indicators.
+        """
+        rotor_rng, ring_rng, plug_rng, indicator_rng = rngs
+        records: np.ndarray = np.zeros(n, dtype=dtype)
+        records["day"] = np.arange(first_day, first_day + n)
+        records["rotors"] = self._permutations(rotor_rng, n, np.arange(self.n_rotors))[
+            :, : self.rotor_slots
+        ]
+        records["rings"] = ring_rng.choice(self.ranges, (n, self.rotor_slots))
+        records["plugs"] = self._permutations(plug_rng, n, self.ranges)[
+            :, : 2 * self.n_plugs
+        ].reshape(n, self.n_plugs, 2)
+        # Lowercase indicators for A-Z, as in CodeGen.
+        offset: int = 32 if len(self.ranges) == 26 else 0
+        records["indicators"] = (
+            self._permutations(indicator_rng, n * self.i_groups, self.ranges)[
+                :, :3
+            ].reshape(n, self.i_groups, 3)
+            + offset
+        )
+        return records
+
+    def generate_network(
+        self, index: int, seed_sequence: np.random.SeedSequence, dest: Path
+    ) -> Tuple[Path, Path]:
+        """Write config and table files for one network."""
+        config_rng, *day_rngs = [
+            np.random.default_rng(child_seed(seed_sequence, i)) for i in range(5)
+        ]
+        config_path: Path = Path(dest).joinpath(f"network_{index:05d}_config.bin")
+        table_path: Path = Path(dest).joinpath(f"network_{index:05d}_table.bin")
+
+        rotors, reflector = self._gen_config(config_rng)
+        binary_format.write_config(
+            config_path,
+            [dict(zip(self.ranges.tolist(), rotor.tolist())) for rotor in rotors],
+            dict(zip(self.ranges.tolist(), reflector.tolist())),
+        )
+
+        dtype: np.dtype = binary_format.table_dtype(
+            self.rotor_slots, self.n_plugs, self.i_groups
+        )
+        with open(table_path, "wb") as f:
+            binary_format.write_table_header(
+                f, self.n_days, self.rotor_slots, self.n_plugs, self.i_groups
+            )
+            for first_day in range(1, self.n_days + 1, self.chunk_days):
+                n: int = min(self.chunk_days, self.n_days - first_day + 1)
+                f.write(self._gen_days(day_rngs, first_day, n, dtype).tobytes())
+        return config_path, table_path
+
+    def generate(self, dest: Path, workers: int = 1) -> List[Tuple[Path, Path]]:
+        """
+        Write files for every network into `dest`.
+        Args:
+            workers: Number of processes. None means all cores.
+        Returns:
+            (config path, table path) for each network, in order.
+        """
+        dest = Path(dest)
+        dest.mkdir(parents=True, exist_ok=True)
+        indices: List[int] = list(range(self.n_networks))
+        children: List[np.random.SeedSequence] = [
+            child_seed(self.seed_sequence, i) for i in indices
+        ]
+        if workers == 1:
+            return [
+                self.generate_network(i, child, dest)
+                for i, child in zip(indices, children)
+            ]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    self.generate_network, indices, children, [dest] * len(indices)
+                )
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate configs and tables in bulk.")
+    parser.add_argument("dest", type=Path, help="Output directory.")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--networks", type=int, default=1)
+    parser.add_argument("--days", type=int, default=DAYS)
+    parser.add_argument("--workers", type=int, default=1, help="0 means all cores.")
+    args: argparse.Namespace = parser.parse_args()
+
+    gen = BulkGen(seed=args.seed, n_networks=args.networks, n_days=args.days)
+    paths: List[Tuple[Path, Path]] = gen.generate(
+        args.dest, workers=args.workers or None
+    )
+    print(f"Saved {len(paths)} configs and tables to {args.dest}.")
@@ -1,20 +1,24 @@
 """
 Use a single seed to generate a code page.
 A code page would contain:
-    1. dates (ranges from 1 to 31, inclusively);
+    1. dates (ranges from 1 to 31 by default, inclusively);
     2. rotors;
     3. ring settings;
     4. plugboard settings;
     5. indicators (no idea what this is and it not seems to be used).
 """
+
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 
 import numpy as np
-import pandas as pd
 
+from enigma.utils import binary_format
 from enigma.utils.constants import ROTOR_NAMES
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 DAYS: int = 31
 
 
@@ -29,6 +33,8 @@ class CodeGen:
         n_plugs: int = 6,
         i_groups: int = 4,
         extended: bool = False,
+        byte_mode: bool = False,
+        n_days: int = DAYS,
     ):
         """
         Args:
@@ -37,13 +43,17 @@ class CodeGen:
             rotor_slots: How many rotors are actually used.
             n_plugs: Number of used switches on the plugboard.
             extended: Whether to use the entire ASCII space. False means only capital A-Z.
+            byte_mode: Whether to use all 256 byte values. Overrides `extended`.
+            n_days: Number of days in the table. Multi-year tables need the binary export.
         """
         assert rotor_slots <= n_rotors
         assert n_plugs <= 13  # 26 characters.
 
         self.rng: np.random._generator.Generator = np.random.default_rng(seed)
-        self.n_dates: int = DAYS  # Normally 31 days.
-        self.ranges: List[int] = list(range(128) if extended else range(65, 91))
+        self.n_dates: int = n_days  # Normally 31 days.
+        self.ranges: List[int] = list(
+            range(256) if byte_mode else range(128) if extended else range(65, 91)
+        )
 
         # Call each generation functions and get corresponding codes.
         self.rotors: List[List[int]] = self._gen_rotors(n_rotors, rotor_slots)
@@ -51,8 +61,8 @@ class CodeGen:
         self.plugs: Dict[int, int] = self._gen_plugs(n_plugs)
         self.indicators: List[List[int]] = self._gen_indicators(i_groups)
 
-        # DataFrame to keep the record.
-        self.df: pd.DataFrame = self.build_csv()
+        # DataFrame to keep the record. Built on csv export, so pandas is only imported then.
+        self.df: pd.DataFrame = None
 
     def _gen_rotors(self, n_rotors: int, rotor_slots: int) -> List[List[int]]:
         """Generate a list for what rotors to use each day."""
@@ -69,7 +79,7 @@ class CodeGen:
         available_keys: List[int] = self.ranges.copy()
 
         for _ in range(self.n_dates):
-            alignments.append(self.rng.choice(available_keys, rotor_slots))
+            alignments.append(self.rng.choice(available_keys, rotor_slots).tolist())
         return alignments
 
     def _gen_plugs(self, n_plugs: int) -> List[Dict[int, int]]:
@@ -157,6 +167,8 @@ class CodeGen:
 
     def build_csv(self):
         """Make a table version of generated info."""
+        import pandas as pd
+
         rows: List[Dict[str, Any]] = []
         for day in range(self.n_dates):
             row: Dict[str, Any] = {
@@ -179,6 +191,24 @@ class CodeGen:
         print(f"Saving csv to {dest}...")
         self.df.to_csv(dest)
 
+    def export_binary(self, dest: Path = None):
+        """Save table to disk in the binary format, which loads any single day directly."""
+        if dest is None:
+            dest = Path(__file__).parent.parent.joinpath("tables", "default.bin")
+        dest = Path(dest)
+        entries: List[Dict[str, Any]] = [
+            {
+                "day": self.n_dates - day,
+                "rotors": self.rotors[day],
+                "rings": self.alignments[day],
+                "plugs": self.plugs[day],
+                "indicators": self.indicators[day],
+            }
+            for day in range(self.n_dates)
+        ]
+        print(f"Saving binary table to {dest}...")
+        binary_format.write_table(dest, entries)
+
 
 if __name__ == "__main__":
     gen = CodeGen(seed=42, n_rotors=5, rotor_slots=3, extended=False)
@@ -5,32 +5,46 @@ Will generate the following components:
     . reflector wiring;
 """
 
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 from pathlib import Path
 
-import pandas as pd
 import numpy as np
 
+from enigma.utils import binary_format
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class ConfigGen:
     """Generate random Enigma configurations."""
 
-    def __init__(self, seed: int = None, n_rotors: int = 5, extended: bool = False):
+    def __init__(
+        self,
+        seed: int = None,
+        n_rotors: int = 5,
+        extended: bool = False,
+        byte_mode: bool = False,
+    ):
         """
         Args:
             seed: RNG seed.
             n_rotors: How many rotors to generate.
             extended: Whether to use the entire ASCII space (128 chars vs 26 chars).
+            byte_mode: Whether to use all 256 byte values. Overrides `extended`.
         """
         self.rng: np.random._generator.Generator = np.random.default_rng(seed)
-        self.ranges: List[int] = list(range(128) if extended else range(65, 91))
+        self.ranges: List[int] = list(
+            range(256) if byte_mode else range(128) if extended else range(65, 91)
+        )
 
         self.rotors: List[Dict[int, int]] = [
             self._gen_rotors() for _ in range(n_rotors)
         ]
         self.reflector: Dict[int, int] = self._gen_reflector()
 
-        self.df: pd.DataFrame = self.build_csv()
+        # Built on csv export, so pandas is only imported then.
+        self.df: pd.DataFrame = None
 
     def _gen_rotors(self) -> Dict[int, int]:
         """Generate a rotor wiring mapping. A character may be mapped to itself."""
@@ -59,8 +73,10 @@ class ConfigGen:
 
         return reflector
 
-    def build_csv(self) -> pd.DataFrame:
+    def build_csv(self) -> "pd.DataFrame":
         """Build a csv version of generated config."""
+        import pandas as pd
+
         rows: List[Dict[str, Dict[int, Any]]] = []
         for rotor in self.rotors:
             rows.append({"type": "rotor", "wiring": rotor})
@@ -70,13 +86,21 @@ class ConfigGen:
     def export_csv(self, dest: Path = None):
         """Save table to disk."""
         if self.df is None:
-            self.build_csv()
+            self.df = self.build_csv()
         if dest is None:
             dest = Path(__file__).parent.parent.joinpath("configs", "default.csv")
         dest = Path(dest)
         print(f"Saving csv to {dest}...")
         self.df.to_csv(dest)
 
+    def export_binary(self, dest: Path = None):
+        """Save config to disk in the binary format."""
+        if dest is None:
+            dest = Path(__file__).parent.parent.joinpath("configs", "default.bin")
+        dest = Path(dest)
+        print(f"Saving binary config to {dest}...")
+        binary_format.write_config(dest, self.rotors, self.reflector)
+
 
 if __name__ == "__main__":
     c = ConfigGen(extended=False)
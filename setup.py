@@ -1,10 +1,12 @@
 #!/usr/bin/env python
-from setuptools import setup, find_packages
+from setuptools import setup, find_namespace_packages
 
 setup(
     name="enigma",
     version="0.1",
     description="Python emulation of Enigma M3.",
     author="Mizaimao",
-    packages=find_packages(include=["enigma", "enigma.*"]),
+    # Packages have no __init__.py, so only the namespace finder picks them up.
+    packages=find_namespace_packages(include=["enigma", "enigma.*"]),
+    entry_points={"console_scripts": ["enigma=enigma.__main__:main"]},
 )
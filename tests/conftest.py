@@ -0,0 +1,80 @@
+"""Seeded machines over the A-Z, 128-symbol and 256-symbol alphabets, built once per session."""
+
+import contextlib
+import io
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pytest
+
+from enigma.components.machine import Enigma
+from enigma.utils.code_gen import CodeGen
+from enigma.utils.config_gen import ConfigGen
+
+# Generator options of each alphabet.
+ALPHABETS: Dict[str, Dict[str, bool]] = {
+    "az": {},
+    "ascii": {"extended": True},
+    "bytes": {"byte_mode": True},
+}
+
+
+@pytest.fixture(scope="session")
+def machine_files(tmp_path_factory) -> Callable[[str, int], Tuple[Path, Path]]:
+    """Config and table csv paths of an alphabet and number of rotor slots."""
+    paths: Dict[Tuple[str, int], Tuple[Path, Path]] = {}
+
+    def make(alphabet: str, rotor_slots: int = 3) -> Tuple[Path, Path]:
+        if (alphabet, rotor_slots) not in paths:
+            dest: Path = tmp_path_factory.mktemp(f"{alphabet}_{rotor_slots}")
+            with contextlib.redirect_stdout(io.StringIO()):
+                ConfigGen(seed=0, **ALPHABETS[alphabet]).export_csv(
+                    dest.joinpath("config.csv")
+                )
+                code_gen = CodeGen(
+                    seed=1, rotor_slots=rotor_slots, **ALPHABETS[alphabet]
+                )
+                code_gen.export_csv(dest.joinpath("table.csv"))
+            paths[alphabet, rotor_slots] = (
+                dest.joinpath("config.csv"),
+                dest.joinpath("table.csv"),
+            )
+        return paths[alphabet, rotor_slots]
+
+    return make
+
+
+@pytest.fixture(params=list(ALPHABETS))
+def alphabet(request) -> str:
+    return request.param
+
+
+@pytest.fixture
+def machine(machine_files, alphabet) -> Enigma:
+    """A 3-rotor machine on day 2 of a seeded table."""
+    config_path, table_path = machine_files(alphabet)
+    return Enigma(config_path=config_path, table_path=table_path, date=2)
+
+
+def random_message(machine: Enigma, n: int, seed: int = 0) -> bytes:
+    """n random symbols of the machine alphabet."""
+    rng: np.random.Generator = np.random.default_rng(seed)
+    codes: np.ndarray = rng.integers(0, machine.length, n) + machine.base
+    return codes.astype(np.uint8).tobytes()
+
+
+def passthrough_reference(machine: Enigma, data: bytes) -> bytes:
+    """
+    The passthrough rule of Enigma.encode_buffer() through the scalar Enigma.input(): symbols
+    of the alphabet are encoded one at a time, lowercase first uppercased on A-Z machines, and
+    everything else is copied without stepping.
+    """
+    output: bytearray = bytearray()
+    for code in data:
+        symbol: int = code & 0xDF if machine.alpha_only and 97 <= code <= 122 else code
+        if machine.base <= symbol < machine.base + machine.length:
+            output += machine.input(bytes([symbol]))
+        else:
+            output.append(code)
+    return bytes(output)
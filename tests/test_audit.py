@@ -0,0 +1,80 @@
+"""Audit reports against counting every value in Python."""
+
+import collections
+from pathlib import Path
+from typing import Any, Counter, Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from enigma.components.machine import Enigma
+from enigma.utils import audit
+
+
+def brute_force(paths: List[Path]) -> Dict[str, Counter]:
+    """Uses of every value of every kind, as audit() defines them."""
+    counts: Dict[str, Counter] = {kind: collections.Counter() for kind in audit.KINDS}
+    for path in paths:
+        for entry in Enigma.load_tables(path).values():
+            counts["settings"][tuple(entry["rotors"]) + tuple(entry["rings"])] += 1
+            pairs: List[Tuple[int, int]] = sorted(
+                {tuple(sorted((a, b))) for a, b in entry["plugs"].items()}
+            )
+            counts["plugboards"][tuple(pairs)] += 1
+            counts["plug_pairs"].update(pairs)
+            counts["indicators"].update(tuple(group) for group in entry["indicators"])
+    return counts
+
+
+@pytest.fixture
+def sheets(machine_files) -> List[Path]:
+    """
+    Tables with 3 and 4 rotor slots, the second one twice: its settings and plugboards are
+    hashed keys, and every one of them is reused once.
+    """
+    _, table_3 = machine_files("az", 3)
+    _, table_4 = machine_files("az", 4)
+    return [table_3, table_4, table_4]
+
+
+@pytest.mark.parametrize("hash_bits", [56, 2])
+def test_audit_matches_brute_force(sheets, monkeypatch, hash_bits: int):
+    """With a 2-bit hash nearly every hashed key collides, and the counts must not change."""
+    pack_keys = audit.pack_keys
+
+    def weak_keys(fields: np.ndarray) -> np.ndarray:
+        keys: np.ndarray = pack_keys(fields)
+        if fields.shape[1] <= audit.EXACT_BYTES:
+            return keys
+        return keys & np.uint64(audit.HASHED << 56 | (1 << hash_bits) - 1)
+
+    monkeypatch.setattr(audit, "pack_keys", weak_keys)
+    report: Dict[str, Any] = audit.audit(
+        sheets, n_shards=3, workers=1, max_examples=3, max_pair_uses=10
+    )
+    counts: Dict[str, Counter] = brute_force(sheets)
+
+    for kind in audit.KINDS:
+        uses: List[int] = list(counts[kind].values())
+        limit: int = 10 if kind == "plug_pairs" else 1
+        part: Dict[str, Any] = report[kind]
+        assert part["uses"] == sum(uses), kind
+        assert part["distinct"] == len(uses), kind
+        assert part["flagged"] == sum(1 for n in uses if n > limit), kind
+        assert part["flagged_uses"] == sum(n for n in uses if n > limit), kind
+        assert part["max_uses"] == max(uses), kind
+
+    # Reused hashed values are reported by their bytes, not by their hash.
+    for example in report["settings"]["examples"]:
+        assert example["uses"] == 2
+        assert counts["settings"][tuple(example["value"])] == 2
+        assert [Path(path) for path, _ in example["postings"]] == sheets[1:]
+    for example in report["plugboards"]["examples"]:
+        value: List[int] = example["value"]
+        # Sorted (low, high) pairs, after (0, 0) for unused plugs.
+        pairs: Tuple[Tuple[int, int], ...] = tuple(
+            (value[i], value[i + 1])
+            for i in range(0, len(value), 2)
+            if value[i] != value[i + 1]
+        )
+        assert counts["plugboards"][pairs] == example["uses"]
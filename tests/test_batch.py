@@ -0,0 +1,46 @@
+"""Configuration-batched encoding against one machine per date."""
+
+from typing import List, Union
+
+import numpy as np
+import pytest
+
+from conftest import random_message
+from enigma.components.batch import BatchEnigma
+from enigma.components.machine import Enigma
+
+
+@pytest.mark.parametrize("block_size", [256, 7])
+@pytest.mark.parametrize("rotor_slots", [3, 2])
+def test_batch_matches_machines(
+    machine_files, alphabet: str, rotor_slots: int, block_size: int
+):
+    config_path, table_path = machine_files(alphabet, rotor_slots)
+    batch = BatchEnigma(config_path, table_path, block_size=block_size)
+    machine = Enigma(config_path=config_path, table_path=table_path)
+    # Long enough for the middle rotor to carry.
+    message: bytes = random_message(machine, 1000)
+
+    output: np.ndarray = batch.input(message)
+    assert output.shape == (len(batch.dates), len(message))
+    for date, row in zip(batch.dates, output):
+        machine = Enigma(config_path=config_path, table_path=table_path, date=date)
+        assert row.tobytes() == machine.input(message), f"Date {date} differs."
+
+
+def test_dates_and_strings(machine_files):
+    config_path, table_path = machine_files("az")
+    dates: List[int] = [5, 1, 5, 30]
+    batch = BatchEnigma(config_path, table_path, dates=dates)
+    outputs: List[Union[str, bytes]] = batch.input_strings("ATTACKATDAWN")
+    assert outputs == [
+        Enigma(config_path=config_path, table_path=table_path, date=date).input(
+            "ATTACKATDAWN"
+        )
+        for date in dates
+    ]
+    assert batch.input_strings(b"ATTACKATDAWN") == [
+        output.encode("ascii") for output in outputs
+    ]
+    with pytest.raises(AssertionError, match="not found"):
+        BatchEnigma(config_path, table_path, dates=[10**6])
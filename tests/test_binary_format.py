@@ -0,0 +1,85 @@
+"""CSV to binary conversion of configs and tables."""
+
+import contextlib
+import io
+from pathlib import Path
+from typing import Any, Dict, Mapping
+
+import pytest
+
+from conftest import random_message
+from enigma.components.machine import Enigma
+from enigma.utils import binary_format
+from enigma.utils.code_gen import CodeGen
+
+
+@pytest.fixture
+def binary_files(machine_files, alphabet, tmp_path: Path):
+    """The seeded csv files of an alphabet, and their binary conversions."""
+    config_csv, table_csv = machine_files(alphabet)
+    config_bin: Path = tmp_path.joinpath("config.bin")
+    table_bin: Path = tmp_path.joinpath("table.bin")
+    binary_format.convert_csv(config_csv, config_bin)
+    binary_format.convert_csv(table_csv, table_bin)
+    return config_csv, table_csv, config_bin, table_bin
+
+
+def test_magic(binary_files):
+    config_csv, table_csv, config_bin, table_bin = binary_files
+    assert binary_format.read_magic(config_bin) == binary_format.CONFIG_MAGIC
+    assert binary_format.read_magic(table_bin) == binary_format.TABLE_MAGIC
+    assert binary_format.read_magic(config_csv) != binary_format.CONFIG_MAGIC
+
+
+def test_config_round_trip(binary_files):
+    config_csv, _, config_bin, _ = binary_files
+    csv_rotors, csv_reflector = Enigma.load_config(config_csv)
+    bin_rotors, bin_reflector = Enigma.load_config(config_bin)
+    assert len(bin_rotors) == len(csv_rotors)
+    for csv_rotor, bin_rotor in zip(csv_rotors, bin_rotors):
+        assert bin_rotor.base == csv_rotor.base
+        assert (bin_rotor.arr == csv_rotor.arr).all()
+    assert bin_reflector.base == csv_reflector.base
+    assert (bin_reflector.arr == csv_reflector.arr).all()
+
+
+def test_table_round_trip(binary_files):
+    _, table_csv, _, table_bin = binary_files
+    csv_tables: Mapping[int, Dict[str, Any]] = Enigma.load_tables(table_csv)
+    bin_tables: Mapping[int, Dict[str, Any]] = Enigma.load_tables(table_bin)
+    assert isinstance(bin_tables, binary_format.TableFile)
+    assert len(bin_tables) == len(csv_tables)
+    assert sorted(bin_tables) == sorted(csv_tables)
+    for date in csv_tables:
+        for field in ("rotors", "rings", "plugs", "indicators"):
+            assert list(bin_tables[date][field]) == list(
+                csv_tables[date][field]
+            ), f"{field} differs on date {date}."
+    assert 0 not in bin_tables
+    assert len(csv_tables) + 1 not in bin_tables
+
+
+@pytest.mark.parametrize("date", [1, 17, 31])
+def test_machines_agree(binary_files, date: int):
+    config_csv, table_csv, config_bin, table_bin = binary_files
+    from_csv = Enigma(config_path=config_csv, table_path=table_csv, date=date)
+    from_bin = Enigma(config_path=config_bin, table_path=table_bin, date=date)
+    assert from_bin.snapshot() == from_csv.snapshot()
+    assert from_bin.plugs == from_csv.plugs
+    message: bytes = random_message(from_csv, 1000)
+    assert from_bin.input(message) == from_csv.input(message)
+
+
+def test_export_binary_matches_conversion(tmp_path: Path):
+    """CodeGen.export_binary() writes what converting its csv gives."""
+    code_gen = CodeGen(seed=5)
+    with contextlib.redirect_stdout(io.StringIO()):
+        code_gen.export_csv(tmp_path.joinpath("table.csv"))
+        code_gen.export_binary(tmp_path.joinpath("direct.bin"))
+    binary_format.convert_csv(
+        tmp_path.joinpath("table.csv"), tmp_path.joinpath("converted.bin")
+    )
+    assert (
+        tmp_path.joinpath("direct.bin").read_bytes()
+        == tmp_path.joinpath("converted.bin").read_bytes()
+    )
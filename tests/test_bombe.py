@@ -0,0 +1,82 @@
+"""Crib search on a seeded, plugged machine."""
+
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from enigma.analysis import bombe, corpus
+from enigma.analysis.bombe import scan_order
+from enigma.components.machine import Enigma
+
+SLOW: float = 6.0
+TRUE_ORDER: Tuple[int, ...] = ()
+PLAINTEXT: str = "".join(chr(65 + i) for i in corpus.letters()[:200].tolist())
+
+
+def setup(machine_files) -> Tuple[Any, Dict[str, Any], str]:
+    config_path, table_path = machine_files("az")
+    machine = Enigma(config_path=config_path, table_path=table_path, date=1)
+    return config_path, dict(machine.table), machine.input(PLAINTEXT)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_bombe_finds_setting(machine_files, workers: int):
+    config_path, truth, ciphertext = setup(machine_files)
+    order: List[int] = list(truth["rotors"])
+    orders: List[List[int]] = [order, order[::-1]]
+    stops: List[Dict[str, Any]] = bombe.bombe_search(
+        ciphertext,
+        PLAINTEXT[:25],
+        config_path,
+        orders=orders,
+        offsets=[0],
+        workers=workers,
+    )
+    found: List[Dict[str, Any]] = [
+        stop
+        for stop in stops
+        if stop["rotors"] == order and stop["rings"] == truth["rings"]
+    ]
+    assert len(found) == 1
+    # Plugs implied by the menu agree with the day's plugboard.
+    plugged: Dict[int, int] = dict(truth["plugs"])
+    plugged.update({b: a for a, b in truth["plugs"].items()})
+    for a, u in found[0]["plugs"].items():
+        assert plugged.get(a, a) == u
+    assert found[0]["offset"] == 0
+
+
+def slow_scan(order: Tuple[int, ...], *args) -> List[Tuple]:
+    """scan_order, taking SLOW seconds longer for every order but TRUE_ORDER."""
+    if order != TRUE_ORDER:
+        time.sleep(SLOW)
+    return scan_order(order, *args)
+
+
+def test_max_stops_returns_early(machine_files, monkeypatch):
+    """Once max_stops are found, orders still running are not waited for."""
+    config_path, truth, ciphertext = setup(machine_files)
+    # Worker processes are forked after these are set.
+    monkeypatch.setattr(sys.modules[__name__], "TRUE_ORDER", tuple(truth["rotors"]))
+    monkeypatch.setattr(bombe, "scan_order", slow_scan)
+    others: List[Tuple[int, ...]] = [(4, 3, 2), (3, 4, 0), (2, 0, 4), (1, 2, 3)]
+    orders: List[Tuple[int, ...]] = [TRUE_ORDER] + [
+        order for order in others if order != TRUE_ORDER
+    ][:3]
+
+    start: float = time.perf_counter()
+    stops: List[Dict[str, Any]] = bombe.bombe_search(
+        ciphertext,
+        PLAINTEXT[:25],
+        config_path,
+        orders=orders,
+        offsets=[0],
+        workers=2,
+        max_stops=1,
+    )
+    assert time.perf_counter() - start < SLOW / 2
+    assert [(stop["rotors"], stop["rings"]) for stop in stops] == [
+        (list(TRUE_ORDER), truth["rings"])
+    ]
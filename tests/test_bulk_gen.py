@@ -0,0 +1,55 @@
+"""Bulk generation: output depends on the seed only, and the files load as machines."""
+
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from enigma.components.machine import Enigma
+from enigma.utils import binary_format
+from enigma.utils.bulk_gen import BulkGen
+
+N_NETWORKS: int = 3
+N_DAYS: int = 50
+
+
+def generate(dest: Path, chunk_days: int, workers: int, **options) -> List[bytes]:
+    """Contents of every file written, in network order."""
+    paths: List[Tuple[Path, Path]] = BulkGen(
+        seed=7,
+        n_networks=N_NETWORKS,
+        n_days=N_DAYS,
+        chunk_days=chunk_days,
+        **options,
+    ).generate(dest, workers=workers)
+    return [path.read_bytes() for pair in paths for path in pair]
+
+
+@pytest.mark.parametrize("options", [{}, {"extended": True}, {"byte_mode": True}])
+def test_same_output_for_any_chunks_and_workers(tmp_path: Path, options):
+    reference: List[bytes] = generate(
+        tmp_path.joinpath("reference"), N_DAYS, 1, **options
+    )
+    for chunk_days, workers in [(1, 1), (7, 1), (16, 2), (N_DAYS + 1, 2)]:
+        dest: Path = tmp_path.joinpath(f"{chunk_days}_{workers}")
+        assert generate(dest, chunk_days, workers, **options) == reference, (
+            chunk_days,
+            workers,
+        )
+    assert generate(tmp_path.joinpath("other"), N_DAYS, 1, **options) == reference
+
+
+def test_files_load(tmp_path: Path):
+    (config_path, table_path), *_ = BulkGen(
+        seed=7, n_networks=1, n_days=N_DAYS, chunk_days=7
+    ).generate(tmp_path)
+    tables = binary_format.TableFile(table_path)
+    assert sorted(tables) == list(range(1, N_DAYS + 1))
+    for date in (1, 8, N_DAYS):
+        entry = tables[date]
+        assert len(entry["rotors"]) == len(set(entry["rotors"])) == 3
+        assert len(entry["plugs"]) == 6
+        machine = Enigma(config_path=config_path, table_path=table_path, date=date)
+        encoded: str = machine.input("HELLOWORLD")
+        machine.reset()
+        assert machine.input(encoded) == "HELLOWORLD"
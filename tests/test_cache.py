@@ -0,0 +1,121 @@
+"""Config and table caches: invalidation on file changes, LRU eviction and stats."""
+
+import contextlib
+import io
+import os
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+
+from enigma.components.cache import CONFIG_CACHE, LoaderCache, PermutationCache
+from enigma.components.machine import Enigma
+from enigma.utils.config_gen import ConfigGen
+
+
+def write(path: Path, text: str, mtime_ns: int):
+    """Write a file with a given mtime, so changes do not depend on clock resolution."""
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_loader_reloads_changed_files(tmp_path: Path):
+    cache = LoaderCache()
+    loads: List[Path] = []
+
+    def loader(path: Path) -> str:
+        loads.append(path)
+        return path.read_text()
+
+    path: Path = tmp_path.joinpath("a.txt")
+    write(path, "one", 10**18)
+    assert cache.get(path, loader) == "one"
+    # Same file through another path: a hit.
+    tmp_path.joinpath("sub").mkdir()
+    assert cache.get(tmp_path.joinpath("sub", "..", "a.txt"), loader) == "one"
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+    # Same size, new mtime.
+    write(path, "two", 2 * 10**18)
+    assert cache.get(path, loader) == "two"
+    # Same mtime, new size.
+    write(path, "three", 2 * 10**18)
+    assert cache.get(path, loader) == "three"
+    assert len(loads) == 3
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 3}
+
+    # Missing files go straight to the loader, which reports them.
+    with pytest.raises(FileNotFoundError):
+        cache.get(tmp_path.joinpath("missing.txt"), loader)
+    cache.clear()
+    assert cache.stats() == {"size": 0, "hits": 0, "misses": 0}
+
+
+def test_loader_eviction(tmp_path: Path):
+    cache = LoaderCache(max_size=2)
+    paths: List[Path] = [tmp_path.joinpath(f"{name}.txt") for name in "abc"]
+    for path in paths:
+        write(path, path.stem, 10**18)
+
+    cache.get(paths[0], Path.read_text)
+    cache.get(paths[1], Path.read_text)
+    cache.get(paths[0], Path.read_text)  # b is now the least recently used.
+    cache.get(paths[2], Path.read_text)
+    assert cache.stats() == {"size": 2, "hits": 1, "misses": 3}
+    cache.get(paths[0], Path.read_text)
+    cache.get(paths[2], Path.read_text)
+    assert cache.stats()["misses"] == 3
+    cache.get(paths[1], Path.read_text)
+    assert cache.stats() == {"size": 2, "hits": 3, "misses": 4}
+
+
+def test_rewritten_config_is_reloaded(machine_files, tmp_path: Path):
+    _, table_path = machine_files("az")
+    config_path: Path = tmp_path.joinpath("config.csv")
+
+    def generate(seed: int, mtime_ns: int):
+        with contextlib.redirect_stdout(io.StringIO()):
+            ConfigGen(seed=seed).export_csv(config_path)
+        os.utime(config_path, ns=(mtime_ns, mtime_ns))
+
+    generate(0, 10**18)
+    before: str = Enigma(config_path=config_path, table_path=table_path).input("HELLO")
+    misses: int = CONFIG_CACHE.misses
+    assert (
+        Enigma(config_path=config_path, table_path=table_path).input("HELLO") == before
+    )
+    assert CONFIG_CACHE.misses == misses
+
+    generate(1, 2 * 10**18)
+    machine = Enigma(config_path=config_path, table_path=table_path)
+    assert CONFIG_CACHE.misses == misses + 1
+    rotors, _ = Enigma.load_config(config_path)
+    assert all(
+        (rotor.arr == expected.arr).all()
+        for rotor, expected in zip(machine.all_rotors, rotors)
+    )
+    assert machine.input("HELLO") != before
+
+
+def test_permutation_cache():
+    cache = PermutationCache(max_size=2, max_steps=8)
+    computed: List[int] = []
+
+    def compute(start: int, n_steps: int) -> np.ndarray:
+        computed.append(start)
+        return np.full((n_steps, 4), start)
+
+    assert cache.get(1, 5, compute).shape == (5, 4)
+    assert cache.get(1, 3, compute).shape == (3, 4)  # Prefix of the cached entry.
+    assert cache.get(1, 8, compute).shape == (8, 4)  # Longer: recomputed.
+    cache.get(2, 4, compute)
+    cache.get(1, 4, compute)  # 2 is now the least recently used.
+    cache.get(3, 4, compute)
+    assert computed == [1, 1, 2, 3]
+    assert list(cache.entries) == [1, 3]
+    assert cache.stats() == {"size": 2, "hits": 2, "misses": 4, "evictions": 1}
+    with pytest.raises(AssertionError):
+        cache.get(1, 9, compute)
+    cache.clear()
+    assert cache.stats() == {"size": 0, "hits": 0, "misses": 0, "evictions": 0}
@@ -0,0 +1,111 @@
+"""Characteristic catalogue: building, lookups and searches from enciphered indicators."""
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pytest
+
+from enigma.analysis import catalogue
+from enigma.components import engine
+from enigma.components.machine import Enigma
+
+ORDERS: List[Tuple[int, ...]] = [(0, 1, 2), (3, 1, 0), (4, 2, 3)]
+PERIOD: int = 26**3
+
+
+@pytest.fixture(scope="module")
+def built(machine_files, tmp_path_factory) -> Tuple[Path, catalogue.Catalogue]:
+    config_path, _ = machine_files("az")
+    dest: Path = tmp_path_factory.mktemp("catalogue")
+    return config_path, catalogue.build_catalogue(dest, config_path, orders=ORDERS)
+
+
+def machine_at(config_path: Path, order: Tuple[int, ...], start: int) -> Enigma:
+    """A plugged machine whose ground setting is the start counter `start` of `order`."""
+    positions: np.ndarray = engine.odometer_positions(start, 26, len(order))
+    entry: Dict[str, Any] = {
+        "rotors": list(order),
+        "rings": [65 + int(position) for position in positions],
+        "plugs": {65: 90, 66: 81, 67: 75, 70: 88},
+        "indicators": [],
+    }
+    return Enigma(config_path=config_path, entry=entry)
+
+
+def test_build(built):
+    _, index = built
+    assert len(index) == len(ORDERS) * PERIOD
+    assert index.period == PERIOD
+    assert index.orders == ORDERS
+    assert (index.keys[1:] >= index.keys[:-1]).all()
+    assert sorted(index.entries.tolist()) == list(range(len(index)))
+    assert index.buckets[-1] == len(index)
+    assert (index.distinct == np.unique(index.keys)).all()
+    assert index.characteristics.shape == (index.distinct.shape[0], 3 * 27)
+
+
+def test_lookup(built):
+    """Every position is found under the key computed from its own products."""
+    config_path, index = built
+    rng: np.random.Generator = np.random.default_rng(0)
+    for order_index, start in zip(
+        rng.integers(0, len(ORDERS), 20), rng.integers(0, PERIOD, 20)
+    ):
+        machine: Enigma = machine_at(config_path, ORDERS[order_index], int(start))
+        steps: np.ndarray = machine.message_permutations(6)
+        products: np.ndarray = np.stack([steps[j + 3][steps[j]] for j in range(3)])
+        key: int = int(catalogue.characteristic_keys(products[:, None, :])[0])
+        order_indices, starts = index.lookup(key)
+        assert ((order_indices == order_index) & (starts == start)).any()
+
+
+@pytest.mark.parametrize("order_index, start", [(0, 0), (1, 12345), (2, PERIOD - 1)])
+def test_search(built, order_index: int, start: int):
+    """The ground setting is among the candidates, despite the plugboard."""
+    config_path, index = built
+    machine: Enigma = machine_at(config_path, ORDERS[order_index], start)
+    # Every letter at each of the three places.
+    keys: List[str] = [
+        "".join(chr(65 + (i + shift) % 26) for shift in (0, 7, 11)) for i in range(26)
+    ]
+    indicators: List[str] = catalogue.encipher_indicators(machine, keys)
+    products: np.ndarray = catalogue.indicator_products(indicators, 65, 26)
+
+    order_indices, starts = index.search(products)
+    assert ((order_indices == order_index) & (starts == start)).any()
+    candidates: List[Dict[str, Any]] = index.candidates(order_indices, starts)
+    assert {"rotors": list(ORDERS[order_index]), "rings": machine.table["rings"]} in [
+        {"rotors": entry["rotors"], "rings": entry["rings"]} for entry in candidates
+    ]
+
+    # Too few indicators to cover every letter.
+    incomplete: np.ndarray = catalogue.indicator_products(indicators[:5], 65, 26)
+    with pytest.raises(AssertionError, match="cover every letter"):
+        index.search(incomplete)
+
+
+def test_search_unknown(built, monkeypatch):
+    """Products whose characteristic is not catalogued give no candidates."""
+    _, index = built
+    identity: np.ndarray = np.tile(np.arange(26), (3, 1))
+    order_indices, starts = index.search(identity)
+    assert order_indices.shape == starts.shape == (0,)
+
+    # Not even when their key collides with a catalogued one.
+    monkeypatch.setattr(
+        catalogue, "hash_columns", lambda columns: index.distinct[:1].copy()
+    )
+    assert index.lookup(int(index.distinct[0]))[0].shape[0] > 0
+    order_indices, starts = index.search(identity)
+    assert order_indices.shape == starts.shape == (0,)
+
+
+def test_colliding_keys(machine_files, tmp_path: Path, monkeypatch):
+    """Building refuses keys shared by different characteristics."""
+    config_path, _ = machine_files("az")
+    monkeypatch.setattr(
+        catalogue, "hash_weights", lambda n: np.zeros(n, dtype=np.uint64)
+    )
+    with pytest.raises(AssertionError, match="share a key"):
+        catalogue.build_catalogue(tmp_path, config_path, orders=ORDERS[:1])
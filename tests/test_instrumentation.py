@@ -0,0 +1,71 @@
+"""Instrumentation counters agree across encode paths."""
+
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import numpy as np
+import pytest
+
+from conftest import random_message
+from enigma.components import instrumentation
+from enigma.components.machine import Enigma
+
+N_SYMBOLS: int = 20000
+
+# Every path encodes the same N_SYMBOLS symbols from the machine's current positions.
+PATHS: Dict[str, Callable[[Enigma, bytes, Path], Any]] = {
+    "input_vectorized": lambda machine, message, _: machine.input_vectorized(message),
+    "input_parallel": lambda machine, message, _: machine.input_parallel(
+        message, workers=2, chunk_size=5000
+    ),
+    "input_many": lambda machine, message, _: machine.input_many([message]),
+    "encode_buffer": lambda machine, message, _: machine.encode_buffer(
+        np.frombuffer(message, dtype=np.uint8)
+    ),
+    "stream": lambda machine, message, _: list(
+        machine.stream([message[:7000], message[7000:]])
+    ),
+    "encode_file": lambda machine, _, path: machine.encode_file(path),
+    "encode_file_parallel": lambda machine, _, path: machine.encode_file(
+        path, workers=2, chunk_size=5000
+    ),
+}
+
+
+def counted(func: Callable[[], Any]) -> Dict[str, Any]:
+    instrumentation.reset()
+    with instrumentation.profile() as stats:
+        func()
+    assert not instrumentation.is_enabled()
+    return stats.snapshot()
+
+
+@pytest.mark.parametrize("path", list(PATHS))
+def test_counters_match_scalar(machine: Enigma, tmp_path: Path, path: str):
+    message: bytes = random_message(machine, N_SYMBOLS)
+    tmp_path.joinpath("message").write_bytes(message)
+    scalar: Dict[str, Any] = counted(lambda: machine.clone().input(message))
+    assert scalar["chars"] == N_SYMBOLS
+    assert scalar["rotor_steps"][0] == N_SYMBOLS
+    assert sum(scalar["carries"]) > 0
+
+    fast: Dict[str, Any] = counted(
+        lambda: PATHS[path](machine.clone(), message, tmp_path.joinpath("message"))
+    )
+    for counter in ("chars", "rotor_steps", "carries"):
+        assert fast[counter] == scalar[counter], counter
+
+
+def test_timings(machine_files):
+    config_path, table_path = machine_files("az")
+    stats: Dict[str, Any] = counted(
+        lambda: [
+            Enigma(config_path=config_path, table_path=table_path).input("HELLO")
+            for _ in range(3)
+        ]
+    )
+    timings: Dict[str, Dict[str, float]] = stats["timings"]
+    # The table is looked up for every machine, though parsed at most once.
+    assert timings["load_table"]["calls"] == 3
+    assert timings["input"]["calls"] == 3
+    assert timings["input"]["seconds"] > 0
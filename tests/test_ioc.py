@@ -0,0 +1,59 @@
+"""Index of coincidence search on a seeded machine."""
+
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+from enigma.analysis import corpus, ioc
+from enigma.components.keystream import compile_table
+from enigma.components.machine import Enigma
+
+
+def test_score_starts_matches_decryption(machine_files):
+    """Scores from the wrapped table are those of actual decryptions, including wrap-around."""
+    config_path, table_path = machine_files("az")
+    machine = Enigma(config_path=config_path, table_path=table_path)
+    table: np.ndarray = compile_table(
+        [rotor.arr[0] for rotor in machine.rotors],
+        [rotor.arr[1] for rotor in machine.rotors],
+        machine.reflector.arr,
+        np.arange(26),
+        26,
+    )
+    cipher: np.ndarray = np.random.default_rng(0).integers(0, 26, 300)
+    starts: np.ndarray = np.array(
+        [0, 1, 5000, table.shape[0] - 100, table.shape[0] - 1]
+    )
+    scores: np.ndarray = ioc.score_starts(
+        cipher, ioc.wrap_table(table, cipher.shape[0]), 26, starts
+    )
+    for start, score in zip(starts.tolist(), scores.tolist()):
+        rows: np.ndarray = (start + np.arange(1, cipher.shape[0] + 1)) % table.shape[0]
+        plain: np.ndarray = table[rows, cipher]
+        assert np.isclose(
+            score, ioc.index_of_coincidence(np.bincount(plain, minlength=26))
+        )
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ioc_search(machine_files, workers: int):
+    """The day's order and start positions rank first on plugless English."""
+    config_path, table_path = machine_files("az")
+    truth: Dict[str, Any] = Enigma(
+        config_path=config_path, table_path=table_path, date=4
+    ).table
+    machine = Enigma(config_path=config_path, entry=dict(truth, plugs={}))
+    plaintext: str = "".join(chr(65 + i) for i in corpus.letters()[:400].tolist())
+    ciphertext: str = machine.input(plaintext)
+
+    order: List[int] = list(truth["rotors"])
+    orders: List[List[int]] = [order, order[::-1], [order[1], order[0], order[2]]]
+    results: List[Dict[str, Any]] = ioc.ioc_search(
+        ciphertext, config_path, orders=orders, top_k=3, workers=workers
+    )
+    assert len(results) == 3
+    assert results[0]["rotors"] == order
+    assert results[0]["rings"] == truth["rings"]
+    assert results[0]["score"] > results[1]["score"]
+    assert results[0]["plugs"] == {}
@@ -0,0 +1,76 @@
+"""JSON line jobs against machines run directly."""
+
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from conftest import passthrough_reference, random_message
+from enigma import jobs
+from enigma.components.machine import Enigma
+
+
+def run(
+    lines: List[Dict[str, Any]], machine_files, workers: int
+) -> List[Dict[str, Any]]:
+    """Results of a batch of jobs on the seeded A-Z machine."""
+    config_path, table_path = machine_files("az")
+    dest = io.StringIO()
+    jobs.run_batch(
+        io.StringIO("\n".join(map(json.dumps, lines)) + "\nnot json\n"),
+        dest,
+        config_path=config_path,
+        table_path=table_path,
+        workers=workers,
+    )
+    results: List[Dict[str, Any]] = [
+        json.loads(line) for line in dest.getvalue().splitlines()
+    ]
+    assert "error" in results.pop()
+    return results
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch(machine_files, tmp_path: Path, workers: int):
+    config_path, table_path = machine_files("az")
+    machine = Enigma(config_path=config_path, table_path=table_path, date=3)
+    message: bytes = random_message(machine, 5000)
+    in_place: Path = tmp_path.joinpath("in_place.txt")
+    in_place.write_bytes(message)
+    source: Path = tmp_path.joinpath("source.txt")
+    source.write_bytes(message)
+    copy: Path = tmp_path.joinpath("copy.txt")
+
+    path_jobs: List[Dict[str, Any]] = [
+        {"id": 2, "date": 3, "path": str(in_place)},
+        {"id": 3, "date": 3, "path": str(source), "output": str(copy)},
+    ]
+    results: List[Dict[str, Any]] = run(
+        [{"id": 1, "date": 3, "text": "HELLO WORLD"}]
+        + path_jobs
+        + [{"id": 4, "text": "HELLO", "path": str(source)}],
+        machine_files,
+        workers,
+    )
+    assert results[0]["text"] == passthrough_reference(
+        machine.clone(), b"HELLO WORLD"
+    ).decode("ascii")
+    assert results[1] == {
+        "id": 2,
+        "date": 3,
+        "mode": "encrypt",
+        "output": str(in_place),
+    }
+    assert results[2]["output"] == str(copy)
+    assert "error" in results[3]
+
+    encoded: bytes = machine.clone().input(message)
+    assert in_place.read_bytes() == encoded
+    assert copy.read_bytes() == encoded
+    assert source.read_bytes() == message
+
+    # Encoding in place again gives the message back.
+    run([dict(path_jobs[0], mode="decrypt")], machine_files, workers)
+    assert in_place.read_bytes() == message
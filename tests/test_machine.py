@@ -0,0 +1,280 @@
+"""Every encoding path against the scalar reference, Enigma.input()."""
+
+from pathlib import Path
+from typing import List, Union
+
+import numpy as np
+import pytest
+
+from conftest import passthrough_reference, random_message
+from enigma.components.machine import Enigma
+
+# Long enough for the middle rotor to carry on every alphabet, and the left one on A-Z.
+N_SYMBOLS: int = 2000
+
+
+def as_input(machine: Enigma, message: bytes, kind: str) -> Union[str, bytes]:
+    """Message as a str (latin-1 code points) or as bytes."""
+    return message.decode("latin-1") if kind == "str" else message
+
+
+@pytest.mark.parametrize("kind", ["str", "bytes"])
+def test_input_vectorized(machine: Enigma, kind: str):
+    message: Union[str, bytes] = as_input(
+        machine, random_message(machine, N_SYMBOLS), kind
+    )
+    reference: Enigma = machine.clone()
+    expected: Union[str, bytes] = reference.input(message)
+    assert type(expected) is type(message)
+    assert machine.input_vectorized(message) == expected
+    assert machine.snapshot() == reference.snapshot()
+
+
+def test_input_from_mid_message(machine: Enigma):
+    """Vectorized encoding picks up from wherever the rotors are."""
+    machine.input(random_message(machine, 123, seed=1))
+    message: bytes = random_message(machine, N_SYMBOLS)
+    reference: Enigma = machine.clone()
+    assert machine.input_vectorized(message) == reference.input(message)
+    assert machine.snapshot() == reference.snapshot()
+
+
+def test_lowercase_on_az(machine_files):
+    config_path, table_path = machine_files("az")
+    machine = Enigma(config_path=config_path, table_path=table_path)
+    reference: Enigma = machine.clone()
+    assert machine.input_vectorized("helloWorld") == reference.input("HELLOWORLD")
+
+
+def test_reciprocal(machine: Enigma):
+    message: bytes = random_message(machine, N_SYMBOLS)
+    encoded: bytes = machine.input_vectorized(message)
+    machine.reset()
+    assert machine.input_vectorized(encoded) == message
+
+
+@pytest.mark.parametrize(
+    "alphabet, rotor_slots", [("az", 3), ("ascii", 2), ("bytes", 2)]
+)
+def test_keystream(machine_files, tmp_path: Path, alphabet: str, rotor_slots: int):
+    """Full-period tables are only small enough to build for 3 rotors on A-Z."""
+    config_path, table_path = machine_files(alphabet, rotor_slots)
+    machine = Enigma(config_path=config_path, table_path=table_path, date=3)
+    reference: Enigma = machine.clone()
+    machine.compile_keystream(cache_dir=tmp_path)
+    # Past a full period, so the table wraps around.
+    n: int = machine.keystream.period + N_SYMBOLS if alphabet == "az" else N_SYMBOLS
+    message: bytes = random_message(machine, n)
+    assert machine.input_vectorized(message) == reference.input(message)
+    assert machine.snapshot() == reference.snapshot()
+
+    # A second machine loads the cached table.
+    cached = Enigma(config_path=config_path, table_path=table_path, date=3)
+    assert cached.compile_keystream(cache_dir=tmp_path).path == machine.keystream.path
+    reference.reset()
+    assert cached.input_vectorized(message) == reference.input(message)
+
+
+def test_keystream_cache_dir(machine_files, tmp_path: Path, monkeypatch):
+    """Tables are cached under $XDG_CACHE_HOME, and kept in memory if it cannot be written."""
+    config_path, table_path = machine_files("az")
+    machine = Enigma(config_path=config_path, table_path=table_path, date=3)
+    message: bytes = random_message(machine, N_SYMBOLS)
+    expected: bytes = machine.clone().input(message)
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    cached: Path = machine.clone().compile_keystream().path
+    assert cached.parent == tmp_path.joinpath("enigma", "keystreams")
+    assert cached.is_file()
+
+    # A file where the cache directory should be.
+    unwritable: Path = tmp_path.joinpath("file")
+    unwritable.write_bytes(b"")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(unwritable))
+    uncached: Enigma = machine.clone()
+    assert not uncached.compile_keystream().path.exists()
+    assert uncached.input_vectorized(message) == expected
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["enigma", "file"]
+
+
+@pytest.mark.parametrize("keystream", [False, True])
+def test_input_many(machine_files, tmp_path: Path, alphabet: str, keystream: bool):
+    config_path, table_path = machine_files(alphabet, 2 if keystream else 3)
+    machine = Enigma(config_path=config_path, table_path=table_path, date=4)
+    if keystream:
+        machine.compile_keystream(cache_dir=tmp_path)
+    machine.seek(50)
+    state = machine.snapshot()
+    messages: List[bytes] = [
+        random_message(machine, n, seed=n) for n in (0, 1, 7, 300, 40)
+    ]
+
+    expected: List[bytes] = []
+    for message in messages:
+        reference: Enigma = machine.clone()
+        expected.append(reference.input(message))
+    assert machine.input_many(messages) == expected
+    assert machine.input_many([m.decode("latin-1") for m in messages]) == [
+        e.decode("latin-1") for e in expected
+    ]
+    # Every message empty.
+    assert machine.input_many(["", ""]) == ["", ""]
+    assert machine.input_many([b"", b"", b""]) == [machine.clone().input(b"")] * 3
+    # Rotors do not move.
+    assert machine.snapshot() == state
+
+
+def test_input_parallel(machine: Enigma):
+    message: bytes = random_message(machine, N_SYMBOLS)
+    reference: Enigma = machine.clone()
+    expected: bytes = reference.input(message)
+    assert machine.input_parallel(message, workers=2, chunk_size=300) == expected
+    assert machine.snapshot() == reference.snapshot()
+    # A single chunk runs in process.
+    machine.reset()
+    assert machine.input_parallel(message, workers=2, chunk_size=N_SYMBOLS) == expected
+
+
+def mixed_bytes(n: int, seed: int = 0) -> bytes:
+    """Any bytes, so some fall outside the 26- and 128-symbol alphabets."""
+    return np.random.default_rng(seed).integers(0, 256, n, dtype=np.uint8).tobytes()
+
+
+@pytest.mark.parametrize("block_size", [1 << 16, 97])
+def test_encode_buffer(machine: Enigma, block_size: int):
+    data: bytes = mixed_bytes(N_SYMBOLS) + b"hello, World!\n"
+    reference: Enigma = machine.clone()
+    expected: bytes = passthrough_reference(reference, data)
+
+    buffer: np.ndarray = np.frombuffer(data, dtype=np.uint8).copy()
+    encoded: np.ndarray = machine.encode_buffer(buffer, block_size=block_size)
+    assert encoded.tobytes() == expected
+    assert buffer.tobytes() == data
+    assert machine.snapshot() == reference.snapshot()
+
+    # In place.
+    machine.reset()
+    assert machine.encode_buffer(buffer, out=buffer, block_size=block_size) is buffer
+    assert buffer.tobytes() == expected
+
+
+def test_stream(machine: Enigma):
+    data: bytes = mixed_bytes(N_SYMBOLS, seed=2)
+    reference: Enigma = machine.clone()
+    expected: bytes = passthrough_reference(reference, data)
+    chunks: List[bytes] = [data[i : i + 333] for i in range(0, len(data), 333)]
+    assert b"".join(machine.stream(chunks)) == expected
+    assert machine.snapshot() == reference.snapshot()
+
+
+def test_stream_text(machine_files):
+    config_path, table_path = machine_files("az")
+    machine = Enigma(config_path=config_path, table_path=table_path)
+    text: str = "Attack at dawn.\nHold the bridge, then retreat!\n" * 20
+    reference: Enigma = machine.clone()
+    expected: str = passthrough_reference(reference, text.encode()).decode()
+    chunks: List[str] = [text[i : i + 17] for i in range(0, len(text), 17)]
+    assert "".join(machine.stream(chunks)) == expected
+
+
+@pytest.mark.parametrize("in_place", [False, True])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_encode_file(machine: Enigma, tmp_path: Path, in_place: bool, workers: int):
+    data: bytes = mixed_bytes(N_SYMBOLS, seed=3)
+    src: Path = tmp_path.joinpath("plain.bin")
+    src.write_bytes(data)
+    dest: Path = None if in_place else tmp_path.joinpath("cipher.bin")
+    reference: Enigma = machine.clone()
+    expected: bytes = passthrough_reference(reference, data)
+
+    machine.encode_file(src, dest, chunk_size=500, workers=workers)
+    assert (src if in_place else dest).read_bytes() == expected
+    if not in_place:
+        assert src.read_bytes() == data
+    assert machine.snapshot() == reference.snapshot()
+
+
+@pytest.mark.parametrize("same", ["path", "relative", "symlink", "hardlink"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_encode_file_onto_itself(
+    machine: Enigma, tmp_path: Path, same: str, workers: int
+):
+    """A dest that is src under another name is encoded in place, not truncated first."""
+    data: bytes = mixed_bytes(N_SYMBOLS, seed=4)
+    src: Path = tmp_path.joinpath("plain.bin")
+    src.write_bytes(data)
+    dest: Path = {
+        "path": src,
+        "relative": tmp_path.joinpath("sub", "..", "plain.bin"),
+        "symlink": tmp_path.joinpath("link.bin"),
+        "hardlink": tmp_path.joinpath("hard.bin"),
+    }[same]
+    tmp_path.joinpath("sub").mkdir()
+    if same == "symlink":
+        dest.symlink_to(src)
+    elif same == "hardlink":
+        dest.hardlink_to(src)
+    expected: bytes = passthrough_reference(machine.clone(), data)
+
+    machine.encode_file(src, dest, chunk_size=500, workers=workers)
+    assert src.read_bytes() == expected
+
+
+def test_encode_empty_file(machine: Enigma, tmp_path: Path):
+    src: Path = tmp_path.joinpath("empty")
+    src.write_bytes(b"")
+    machine.encode_file(src, tmp_path.joinpath("out"))
+    assert tmp_path.joinpath("out").read_bytes() == b""
+
+
+def test_bytes_on_az(machine_files):
+    """Bytes input on an A-Z machine uses the codes of the capital letters."""
+    config_path, table_path = machine_files("az")
+    machine = Enigma(config_path=config_path, table_path=table_path)
+    reference: Enigma = machine.clone()
+    encoded: bytes = machine.input_vectorized(b"ENIGMA")
+    assert encoded == reference.input("ENIGMA").encode("ascii")
+    with pytest.raises(AssertionError):
+        machine.input_vectorized(b"enigma")
+
+
+def test_outside_alphabet(machine_files):
+    config_path, table_path = machine_files("ascii")
+    machine = Enigma(config_path=config_path, table_path=table_path)
+    with pytest.raises(AssertionError):
+        machine.input(b"\x80")
+    with pytest.raises(AssertionError):
+        machine.input_vectorized(b"ok\xff")
+
+
+def test_to_indices(machine: Enigma):
+    message: bytes = random_message(machine, 100)
+    indices: np.ndarray = machine.to_indices(message)
+    assert indices.dtype == np.uint8
+    assert (indices.astype(np.int64) + machine.base == list(message)).all()
+    # Bytes are used in place when symbol codes are already indices.
+    assert np.shares_memory(indices, np.frombuffer(message, dtype=np.uint8)) == (
+        machine.base == 0
+    )
+
+
+@pytest.mark.parametrize("doubled", [False, True])
+@pytest.mark.parametrize("kind", ["str", "bytes"])
+def test_message_keys(machine: Enigma, doubled: bool, kind: str):
+    """Keys are strings on A-Z and bytes elsewhere; indicators follow the message type."""
+    keys: List[Union[str, bytes]] = machine.message_keys()
+    assert all(isinstance(key, str if machine.alpha_only else bytes) for key in keys)
+    assert all(len(key) == len(machine.rotors) for key in keys)
+
+    message: Union[str, bytes] = as_input(machine, random_message(machine, 50), kind)
+    reference: Enigma = machine.clone()
+    indicator, body = machine.encipher_message(message, keys[0], doubled=doubled)
+    assert type(indicator) is type(message)
+    assert type(body) is type(message)
+    reference.reset()
+    expected: Union[str, bytes] = reference.input(keys[0] * (1 + doubled))
+    assert (machine.to_indices(indicator) == machine.to_indices(expected)).all()
+
+    key, plaintext = machine.clone().decipher_message(indicator, body, doubled=doubled)
+    assert plaintext == message
+    assert machine.to_indices(key).tolist() == machine.to_indices(keys[0]).tolist()
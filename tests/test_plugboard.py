@@ -0,0 +1,49 @@
+"""Incremental plugboard trials against full recomputation, and plugboard recovery."""
+
+from typing import Dict
+
+import numpy as np
+
+from enigma.analysis import corpus
+from enigma.analysis.ngrams import default_models
+from enigma.analysis.plugboard import Decryption, pair_changes, solve_plugboard
+from enigma.components.machine import Enigma
+
+
+def test_incremental_matches_full():
+    rng: np.random.Generator = np.random.default_rng(0)
+    n_steps: int = 500
+    substitutions: np.ndarray = np.stack([rng.permutation(26) for _ in range(n_steps)])
+    cipher: np.ndarray = rng.integers(0, 26, n_steps)
+    model = default_models()[1]
+    state = Decryption(substitutions, cipher, np.arange(26), model)
+
+    for _ in range(200):
+        i, j = rng.choice(26, 2, replace=False)
+        for plugboard, changed in pair_changes(state.plugboard, i, j, 13):
+            delta, update = state.try_plugboard(plugboard, changed)
+            full = Decryption(substitutions, cipher, plugboard, model)
+            assert np.isclose(state.score + delta, full.score)
+            if rng.random() < 0.5:
+                state.apply(delta, update)
+                assert (state.plain == full.plain).all()
+                assert (state.middle == full.middle).all()
+                for k in range(26):
+                    assert (state.middle_positions[k] == full.middle_positions[k]).all()
+                break
+    assert (state.slots == -1).all()
+
+
+def test_solve_plugboard(machine_files):
+    config_path, table_path = machine_files("az")
+    machine = Enigma(config_path=config_path, table_path=table_path, date=5)
+    text: str = "".join(c for c in corpus.TEXT.upper() if c.isalpha())[:600]
+    ciphertext: str = machine.input(text)
+
+    probe = Enigma(config_path=config_path, entry=dict(machine.table, plugs={}))
+    plugs, _ = solve_plugboard(probe, ciphertext, max_plugs=6, restarts=2, seed=1)
+
+    def pairs(plugs: Dict[int, int]):
+        return sorted(tuple(sorted(pair)) for pair in plugs.items())
+
+    assert pairs(plugs) == pairs(machine.table["plugs"])
@@ -0,0 +1,97 @@
+"""EnigmaServer and EnigmaClient over a loopback socket."""
+
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from enigma.components.machine import Enigma
+from enigma.server import EnigmaClient, EnigmaServer
+
+MESSAGES: List[Tuple[int, str]] = [
+    (1, "HELLO"),
+    (1, "ATTACKATDAWN"),
+    (2, "WEATHERREPORT"),
+    (1, "HELLO"),
+    (3, "X"),
+    (2, "NOTHINGTOREPORT"),
+]
+
+
+async def session(
+    config_path: Path, table_path: Path
+) -> Tuple[List[str], Dict[str, Any], str, List[str], Dict[str, float]]:
+    server = EnigmaServer(config_path, table_path)
+    listener: asyncio.AbstractServer = await server.start(port=0)
+    port: int = listener.sockets[0].getsockname()[1]
+    client: EnigmaClient = await EnigmaClient.connect(port=port)
+    try:
+        # Sent together, so requests for the same date are encoded in one batch. The bad
+        # message shares a batch with good ones and must not fail them.
+        outputs: List[Any] = await asyncio.gather(
+            *(client.encode(text, date=date) for date, text in MESSAGES),
+            client.request({"date": 1, "text": "NOT ALPHA"}),
+        )
+        bad: Dict[str, Any] = outputs.pop()
+        with pytest.raises(RuntimeError, match="No table entry"):
+            await client.encode("HELLO", date=999)
+        decrypted: str = await client.encode(outputs[0], date=1, mode="decrypt")
+        pipelined: List[str] = await asyncio.gather(
+            *(client.encode("SAMEMESSAGE", date=4) for _ in range(20))
+        )
+        stats: Dict[str, float] = await client.stats()
+    finally:
+        await client.close()
+        listener.close()
+        await listener.wait_closed()
+    return outputs, bad, decrypted, pipelined, stats
+
+
+def test_server(machine_files):
+    config_path, table_path = machine_files("az")
+    outputs, bad, decrypted, pipelined, stats = asyncio.run(
+        session(config_path, table_path)
+    )
+
+    # Every message is encoded from its date's initial positions.
+    for (date, text), output in zip(MESSAGES, outputs):
+        machine = Enigma(config_path=config_path, table_path=table_path, date=date)
+        assert output == machine.input(text)
+    assert decrypted == MESSAGES[0][1]
+    machine = Enigma(config_path=config_path, table_path=table_path, date=4)
+    assert pipelined == [machine.input("SAMEMESSAGE")] * 20
+
+    assert "AssertionError" in bad["error"]
+    assert "text" not in bad
+
+    # Everything before the stats request itself.
+    n_requests: int = len(MESSAGES) + 1 + 1 + 1 + 20
+    assert stats["requests"] == n_requests
+    assert 0 < stats["batches"] < n_requests
+    assert 0 <= stats["latency_p50"] <= stats["latency_p99"]
+
+
+def test_bad_frame(machine_files):
+    """A frame that is not JSON gets an error response, then the connection is closed."""
+    config_path, table_path = machine_files("az")
+
+    async def send_garbage() -> Dict[str, Any]:
+        server = EnigmaServer(config_path, table_path)
+        listener: asyncio.AbstractServer = await server.start(port=0)
+        port: int = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            writer.write(len(b"not json").to_bytes(4, "big") + b"not json")
+            await writer.drain()
+            length: int = int.from_bytes(await reader.readexactly(4), "big")
+            response: bytes = await reader.readexactly(length)
+            assert await reader.read() == b""
+        finally:
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+        return response
+
+    response: bytes = asyncio.run(send_garbage())
+    assert b"error" in response
@@ -0,0 +1,66 @@
+"""Snapshot, restore, seek, reset and clone."""
+
+from typing import Tuple
+
+import pytest
+
+from conftest import random_message
+from enigma.components.machine import Enigma
+
+
+def test_snapshot_restore(machine: Enigma):
+    machine.input(random_message(machine, 500, seed=1))
+    state: Tuple[int, ...] = machine.snapshot()
+    message: bytes = random_message(machine, 300)
+    first: bytes = machine.input(message)
+    assert machine.snapshot() != state
+
+    machine.restore(state)
+    assert machine.snapshot() == state
+    assert machine.input(message) == first
+
+
+def test_restore_validates(machine: Enigma):
+    with pytest.raises(AssertionError):
+        machine.restore(machine.snapshot()[:-1])
+    with pytest.raises(AssertionError):
+        machine.restore((machine.length,) * len(machine.rotors))
+
+
+@pytest.mark.parametrize("offset", [0, 1, 25, 26, 677, 70_000])
+def test_seek(machine: Enigma, offset: int):
+    """seek(n) leaves the rotors where encoding n symbols from the day's start does."""
+    reference: Enigma = machine.clone()
+    reference.input(random_message(machine, offset))
+    machine.input(random_message(machine, 10))
+    machine.seek(offset)
+    assert machine.snapshot() == reference.snapshot()
+
+    message: bytes = random_message(machine, 200, seed=1)
+    assert machine.input_vectorized(message) == reference.input(message)
+
+
+def test_seek_wraps(machine: Enigma):
+    period: int = machine.length ** len(machine.rotors)
+    machine.seek(period + 5)
+    state: Tuple[int, ...] = machine.snapshot()
+    machine.seek(5)
+    assert machine.snapshot() == state
+
+
+def test_reset(machine: Enigma):
+    initial: Tuple[int, ...] = machine.snapshot()
+    message: bytes = random_message(machine, 400)
+    encoded: bytes = machine.input(message)
+    machine.reset()
+    assert machine.snapshot() == initial
+    assert machine.input(message) == encoded
+
+
+def test_clone_is_independent(machine: Enigma):
+    machine.input(random_message(machine, 50))
+    copy: Enigma = machine.clone()
+    assert copy.snapshot() == machine.snapshot()
+    copy.input(random_message(machine, 50))
+    assert copy.snapshot() != machine.snapshot()
+    assert copy.initial_positions == machine.initial_positions